@@ -0,0 +1,105 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+
+@dataclass
+class Amostra:
+    """Estado do processo e do navegador após `ordem` ordens do soak."""
+    ordem: int
+    python_rss_mb: Optional[float] = None
+    chromium_rss_mb: Optional[float] = None
+    js_heap_mb: Optional[float] = None
+    nos_dom: Optional[int] = None
+    frames: Optional[int] = None
+    listeners: Optional[int] = None
+    # Duração média por ordem e latência média de cada fase desde a amostra anterior
+    segundos_por_ordem: Optional[float] = None
+    latencias: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class LimitesDeriva:
+    """Critérios de aprovação do soak (crescimento por 1000 ordens e razão final/inicial)."""
+    python_rss_mb_por_mil: float = 30.0
+    chromium_rss_mb_por_mil: float = 150.0
+    js_heap_mb_por_mil: float = 20.0
+    nos_dom_por_mil: float = 2000.0
+    frames_por_mil: float = 1.0
+    razao_latencia: float = 1.5
+
+
+# Métrica da amostra → atributo do limite de crescimento
+METRICAS_CRESCIMENTO = {
+    "python_rss_mb": "python_rss_mb_por_mil",
+    "chromium_rss_mb": "chromium_rss_mb_por_mil",
+    "js_heap_mb": "js_heap_mb_por_mil",
+    "nos_dom": "nos_dom_por_mil",
+    "frames": "frames_por_mil",
+}
+
+
+def inclinacao(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Inclinação da reta de mínimos quadrados (0 com menos de dois pontos)."""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    media_x, media_y = sum(xs) / n, sum(ys) / n
+    variancia = sum((x - media_x) ** 2 for x in xs)
+    if not variancia:
+        return 0.0
+    return sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys)) / variancia
+
+
+def _razao(inicial: Optional[float], final: Optional[float]) -> Optional[float]:
+    if not inicial or final is None:
+        return None
+    return final / inicial
+
+
+def relatorio_deriva(amostras: Sequence[Amostra], limites: LimitesDeriva) -> dict:
+    """
+    Compara o começo e o fim do soak. Memória, DOM e frames: inclinação por 1000 ordens
+    sobre todas as amostras. Latências: janela final contra a primeira janela após o
+    aquecimento (a amostra 0 cobre o aquecimento e só serve de base para a memória).
+    """
+    violacoes: List[str] = []
+    crescimento: Dict[str, dict] = {}
+
+    for metrica, limite_attr in METRICAS_CRESCIMENTO.items():
+        pontos = [(a.ordem, getattr(a, metrica)) for a in amostras if getattr(a, metrica) is not None]
+        if len(pontos) < 2:
+            continue
+        por_mil = inclinacao([x for x, _ in pontos], [y for _, y in pontos]) * 1000
+        limite = getattr(limites, limite_attr)
+        crescimento[metrica] = {
+            "inicial": pontos[0][1],
+            "final": pontos[-1][1],
+            "por_mil_ordens": round(por_mil, 3),
+            "limite": limite,
+        }
+        if por_mil > limite:
+            violacoes.append(f"{metrica} cresce {por_mil:.1f} por 1000 ordens (limite {limite})")
+
+    latencias: Dict[str, dict] = {}
+    janelas = [a for a in amostras[1:] if a.segundos_por_ordem is not None]
+    if len(janelas) >= 2:
+        primeira, ultima = janelas[0], janelas[-1]
+        series = {"ordem": (primeira.segundos_por_ordem, ultima.segundos_por_ordem)}
+        series.update({fase: (primeira.latencias.get(fase), ultima.latencias.get(fase)) for fase in ultima.latencias})
+        for nome, (inicial, final) in series.items():
+            razao = _razao(inicial, final)
+            if razao is None:
+                continue
+            latencias[nome] = {"inicial_s": round(inicial, 4), "final_s": round(final, 4), "razao": round(razao, 3)}
+            if razao > limites.razao_latencia:
+                violacoes.append(f"latência de '{nome}' {razao:.2f}x maior no fim (limite {limites.razao_latencia}x)")
+
+    return {
+        "aprovado": not violacoes,
+        "violacoes": violacoes,
+        "ordens": amostras[-1].ordem if amostras else 0,
+        "crescimento": crescimento,
+        "latencias": latencias,
+        "limites": asdict(limites),
+        "amostras": [asdict(a) for a in amostras],
+    }
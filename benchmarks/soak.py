@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date, time as hora
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+# Permite `python benchmarks/soak.py` além de `python -m benchmarks.soak`
+sys.path.append(os.getcwd())
+
+from playwright.async_api import async_playwright
+from benchmarks.drift import Amostra, LimitesDeriva, relatorio_deriva
+from benchmarks.stub_neovero import OPCOES, ServidorStubNeovero
+from src.config.settings import settings
+from src.core.animations import estabilizacao
+from src.core.credentials import Credencial
+from src.core.profiler import caminho_perfil
+from src.core.roundtrips import contador_ida_volta
+from src.core.selector_registry import registro_seletores
+from src.pages.login_page import LoginPage
+from src.services.metrics import MetricasExecucao
+from src.services.order_batch import OrdemBatch
+from src.services.order_processor import OrderProcessor, criar_aba
+from src.services.planner import GrupoTag
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """RSS de um processo em MB (psutil, se instalado; senão /proc no Linux)."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 2**20
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def ordens_sinteticas(total: int, tags: int, desativacao_cada: int = 25) -> OrdemBatch:
+    """Ordens com valores existentes nos dropdowns do stub; TAGs em rodízio (histórico cresce)."""
+    registros = []
+    for i in range(total):
+        desativacao = desativacao_cada and (i + 1) % desativacao_cada == 0
+        registros.append({
+            "tag": f"SOAK-{i % tags:04d}",
+            "padrao": "PREV",
+            "data_inicio": date.today(),
+            "hora_inicio": hora(8, 0),
+            "data_fechamento": "NOW" if i % 2 else date.today(),
+            "hora_fechamento": "18:00",
+            "tipo_oficina": OPCOES["cboOficina"][i % 3],
+            "tipo_ordem": "DESATIVACAO" if desativacao else OPCOES["cbotipomanutencao"][i % 3],
+            "complexidade": OPCOES["cbocomplexidadeos"][i % 3],
+            "reclamante": "JOAO",
+            "tipo_ocorrencia": "FALHA",
+            "causa_ocorrencia": "USO",
+            "observacoes": f"soak {i + 1}",
+            "mao_de_obra_finalizada": bool(i % 2),
+            "tecnico": "TEC1",
+            "servico_executado": "TROCA",
+        })
+    return OrdemBatch.de_registros(registros)
+
+
+class AmostradorSoak:
+    """
+    Coleta, a cada amostra: RSS do Python e dos processos do Chromium
+    (CDP `SystemInfo.getProcessInfo`), heap JS, nós do DOM e listeners
+    (`Performance.getMetrics`, após um GC forçado), frames e latências por fase.
+    """
+
+    def __init__(self, browser, page, metricas: MetricasExecucao):
+        self.browser = browser
+        self.page = page
+        self.metricas = metricas
+        self._cdp = None
+        self._cdp_browser = None
+        self._anterior: Tuple[float, int, Dict[str, Tuple[float, int]]] = (0.0, 0, {})
+
+    def _latencias(self) -> Dict[str, Tuple[float, int]]:
+        return {nome: (h.soma, h.total) for nome, h in self.metricas.latencias.items()}
+
+    async def iniciar(self):
+        self._cdp = await self.page.context.new_cdp_session(self.page)
+        await self._cdp.send("Performance.enable")
+        try:
+            self._cdp_browser = await self.browser.new_browser_cdp_session()
+        except Exception as e:
+            logger.warning(f"⚠️ Sessão CDP do browser indisponível (sem RSS do Chromium): {e}")
+        self._anterior = (time.monotonic(), 0, self._latencias())
+
+    async def _rss_chromium(self) -> Optional[float]:
+        if self._cdp_browser is None:
+            return None
+        try:
+            processos = (await self._cdp_browser.send("SystemInfo.getProcessInfo"))["processInfo"]
+        except Exception as e:
+            logger.debug(f"SystemInfo.getProcessInfo falhou: {e}")
+            return None
+        valores = [v for v in (rss_mb(p["id"]) for p in processos) if v is not None]
+        return sum(valores) if valores else None
+
+    async def amostrar(self, ordem: int) -> Amostra:
+        await self._cdp.send("HeapProfiler.collectGarbage")
+        desempenho = {m["name"]: m["value"] for m in (await self._cdp.send("Performance.getMetrics"))["metrics"]}
+
+        agora, latencias = time.monotonic(), self._latencias()
+        instante, ordem_anterior, latencias_anteriores = self._anterior
+        janela = {}
+        for nome, (soma, total) in latencias.items():
+            soma_antes, total_antes = latencias_anteriores.get(nome, (0.0, 0))
+            if total > total_antes:
+                janela[nome] = round((soma - soma_antes) / (total - total_antes), 4)
+        self._anterior = (agora, ordem, latencias)
+
+        return Amostra(
+            ordem=ordem,
+            python_rss_mb=rss_mb(os.getpid()),
+            chromium_rss_mb=await self._rss_chromium(),
+            js_heap_mb=desempenho.get("JSHeapUsedSize", 0) / 2**20,
+            nos_dom=int(desempenho.get("Nodes", 0)),
+            frames=len(self.page.frames),
+            listeners=int(desempenho.get("JSEventListeners", 0)),
+            segundos_por_ordem=round((agora - instante) / (ordem - ordem_anterior), 4) if ordem > ordem_anterior else None,
+            latencias=janela,
+        )
+
+
+async def executar_soak(
+    ordens: int = 2000,
+    intervalo: int = 100,
+    tags: int = 50,
+    aquecimento: Optional[int] = None,
+    latencia_ms: int = 0,
+    vazamento: bool = False,
+    headless: bool = True,
+    limites: Optional[LimitesDeriva] = None,
+    orcamentos: Optional[Dict[str, int]] = None,
+) -> dict:
+    """
+    Roda `ordens` ordens sintéticas pelos page objects reais (OrderProcessor →
+    MenuPage/EquipmentPage/OsPage) contra o stub local e amostra a cada `intervalo`.
+    A primeira amostra é tirada após `aquecimento` ordens (padrão: um intervalo).
+    As chamadas ao Playwright são sempre contadas; um passo acima do orçamento
+    (IDA_VOLTA_ORCAMENTOS + `orcamentos`) reprova o soak.
+    """
+    limites = limites or LimitesDeriva()
+    aquecimento = aquecimento or intervalo
+    grupos = [GrupoTag(ordem.tag, [ordem]) for ordem in ordens_sinteticas(ordens, tags)]
+
+    contador_ida_volta.instalar({**settings.IDA_VOLTA_ORCAMENTOS, **(orcamentos or {})})
+
+    stub = ServidorStubNeovero(latencia_ms=latencia_ms, vazamento=vazamento)
+    await stub.iniciar()
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(headless=headless)
+    amostras: List[Amostra] = []
+    try:
+        page = await (await browser.new_context()).new_page()
+        aba = await criar_aba(page, "A")
+        await page.goto(stub.url)
+        login = LoginPage(page)
+        await login.realizar_login(Credencial("soak", "soak"))
+        if not await login.confirmar_login():
+            raise RuntimeError("Login no stub do Neovero não confirmou")
+
+        processador = OrderProcessor(total_ordens=ordens)
+        amostrador = AmostradorSoak(browser, page, processador.metricas)
+        await amostrador.iniciar()
+
+        feitas = 0
+        while feitas < ordens:
+            proxima = min(aquecimento if not amostras else feitas + intervalo, ordens)
+            await processador.executar_sequencial(aba, grupos[feitas:proxima])
+            feitas = proxima
+            amostra = await amostrador.amostrar(feitas)
+            amostras.append(amostra)
+            logger.info(
+                f"🧪 Soak {feitas}/{ordens}: {amostra.segundos_por_ordem}s/ordem | heap {amostra.js_heap_mb:.1f}MB | "
+                f"{amostra.nos_dom} nós | {amostra.frames} frame(s) | Chromium {amostra.chromium_rss_mb or 0:.0f}MB | "
+                f"Python {amostra.python_rss_mb or 0:.0f}MB"
+            )
+        processador.relatorio_final(ordens)
+    finally:
+        await browser.close()
+        await playwright.stop()
+        await stub.parar()
+
+    relatorio = relatorio_deriva(amostras, limites)
+    relatorio["configuracao"] = {
+        "ordens": ordens, "intervalo": intervalo, "tags": tags, "aquecimento": aquecimento,
+        "latencia_ms": latencia_ms, "vazamento": vazamento, "sem_animacao": settings.MODO_SEM_ANIMACAO,
+    }
+    relatorio["estabilizacao"] = estabilizacao.como_dict()
+    relatorio["seletores"] = registro_seletores.como_dict()
+    relatorio["ida_volta"] = contador_ida_volta.como_dict()
+    for passo, estouros in relatorio["ida_volta"]["estouros"].items():
+        relatorio["violacoes"].append(
+            f"passo '{passo}' passou do orçamento de {contador_ida_volta.orcamentos[passo]} chamadas em {estouros} execução(ões)"
+        )
+    relatorio["aprovado"] = not relatorio["violacoes"]
+    return relatorio
+
+
+def log_relatorio(relatorio: dict, caminho: str):
+    logger.info(f"\n{'=' * 80}")
+    logger.info(f"🧪 RELATÓRIO DE DERIVA DO SOAK ({relatorio['ordens']} ordens)")
+    logger.info(f"{'=' * 80}")
+    for metrica, dados in relatorio["crescimento"].items():
+        logger.info(
+            f"   {metrica:<16} {dados['inicial']:>10.1f} → {dados['final']:>10.1f} "
+            f"({dados['por_mil_ordens']:+.1f} por 1000 ordens, limite {dados['limite']})"
+        )
+    for nome, dados in relatorio["latencias"].items():
+        logger.info(f"   latência {nome:<22} {dados['inicial_s']:.3f}s → {dados['final_s']:.3f}s ({dados['razao']:.2f}x)")
+    for passo, dados in relatorio["ida_volta"]["passos"].items():
+        logger.info(f"   chamadas {passo:<22} {dados['media']} em média, máx. {dados['maximo']} ({dados['execucoes']} execuções)")
+    if relatorio["estabilizacao"]["ativo"]:
+        logger.info(f"   estabilização: economia de {relatorio['estabilizacao']['economia_s']:.1f}s (modo sem animação)")
+    logger.info(f"📄 Relatório completo: {caminho}")
+
+    if relatorio["aprovado"]:
+        logger.success("✅ Soak APROVADO: sem deriva acima dos limites")
+    else:
+        for violacao in relatorio["violacoes"]:
+            logger.error(f"❌ {violacao}")
+        logger.error("❌ Soak REPROVADO")
+
+
+def _parse_orcamento(valor: str) -> Tuple[str, int]:
+    passo, _, limite = valor.partition("=")
+    if not passo or not limite.isdigit():
+        raise argparse.ArgumentTypeError(f"orçamento inválido: {valor!r} (use PASSO=N)")
+    return passo.strip(), int(limite)
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    padrao = LimitesDeriva()
+    parser = argparse.ArgumentParser(description="Soak: deriva de memória e latência em milhares de ordens (stub local do Neovero)")
+    parser.add_argument("--ordens", type=int, default=2000)
+    parser.add_argument("--intervalo", type=int, default=100, help="Ordens entre amostras")
+    parser.add_argument("--aquecimento", type=int, help="Ordens antes da primeira amostra (padrão: um intervalo)")
+    parser.add_argument("--tags", type=int, default=50, help="TAGs distintas em rodízio")
+    parser.add_argument("--latencia-ms", type=int, default=0, help="Latência artificial das chamadas /api do stub")
+    parser.add_argument("--vazamento", action="store_true", help="Stub retém as janelas fechadas (valida a detecção)")
+    parser.add_argument("--sem-animacao", action="store_true", help="Ativa o modo sem animação (MODO_SEM_ANIMACAO)")
+    parser.add_argument("--janela", action="store_true", help="Mostra o navegador (padrão: headless)")
+    parser.add_argument(
+        "--orcamento", action="append", type=_parse_orcamento, default=[], metavar="PASSO=N",
+        help="Máx. de chamadas ao Playwright por execução do passo (repetível; soma-se a IDA_VOLTA_ORCAMENTOS)",
+    )
+    parser.add_argument("--nivel-log", default="WARNING", help="Nível do log dos page objects no terminal")
+    limites = parser.add_argument_group("limites de aprovação")
+    limites.add_argument("--limite-latencia", type=float, default=padrao.razao_latencia, help="Razão máxima latência final/inicial")
+    limites.add_argument("--limite-python-mb", type=float, default=padrao.python_rss_mb_por_mil, help="MB por 1000 ordens")
+    limites.add_argument("--limite-chromium-mb", type=float, default=padrao.chromium_rss_mb_por_mil, help="MB por 1000 ordens")
+    limites.add_argument("--limite-heap-mb", type=float, default=padrao.js_heap_mb_por_mil, help="MB por 1000 ordens")
+    limites.add_argument("--limite-nos", type=float, default=padrao.nos_dom_por_mil, help="Nós do DOM por 1000 ordens")
+    return parser
+
+
+if __name__ == "__main__":
+    args = criar_parser().parse_args()
+
+    # Page objects no nível escolhido; o progresso e o relatório do soak sempre aparecem
+    logger.remove()
+    logger.add(sys.stderr, level=args.nivel_log, filter=lambda r: r["name"] != "__main__")
+    logger.add(sys.stderr, level="INFO", filter=lambda r: r["name"] == "__main__")
+    if args.sem_animacao:
+        settings.MODO_SEM_ANIMACAO = True
+
+    limites_soak = LimitesDeriva(
+        python_rss_mb_por_mil=args.limite_python_mb,
+        chromium_rss_mb_por_mil=args.limite_chromium_mb,
+        js_heap_mb_por_mil=args.limite_heap_mb,
+        nos_dom_por_mil=args.limite_nos,
+        razao_latencia=args.limite_latencia,
+    )
+    resultado = asyncio.run(executar_soak(
+        ordens=args.ordens,
+        intervalo=args.intervalo,
+        tags=args.tags,
+        aquecimento=args.aquecimento,
+        latencia_ms=args.latencia_ms,
+        vazamento=args.vazamento,
+        headless=not args.janela,
+        limites=limites_soak,
+        orcamentos=dict(args.orcamento),
+    ))
+
+    caminho_relatorio = caminho_perfil(settings.LOGS_DIR, "soak", "json")
+    with open(caminho_relatorio, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=1, default=str)
+    log_relatorio(resultado, caminho_relatorio)
+    sys.exit(0 if resultado["aprovado"] else 1)
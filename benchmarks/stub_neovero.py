@@ -0,0 +1,218 @@
+import asyncio
+import json
+import zlib
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+from loguru import logger
+
+# Réplica mínima do Neovero para o soak: os mesmos ids/XPaths usados pelos page objects
+# (login, busca da barra lateral, janelas nv-window, iframe do formulário de OS).
+# Cada nv-window tem o cabeçalho div/div[1]/div[1]/div[3]/a[4] (botão X) e a janela
+# de OS entra logo após a principal, como nv-window[2].
+
+PAGINA_LOGIN = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Neovero (stub)</title></head>
+<body>
+<form id="formusuario" onsubmit="return false">
+    <div><input id="login"></div>
+    <div><input id="senha" type="password"></div>
+    <div onclick="location.href='/app'" style="cursor:pointer">Entrar</div>
+</form>
+</body></html>
+"""
+
+PAGINA_APP = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Neovero (stub)</title>
+<style>
+    nv-window { display: block; border: 1px solid #999; margin: 4px; transition: opacity .3s; }
+    .toast { position: fixed; top: 8px; right: 8px; background: #dfd; }
+</style></head>
+<body><nv-root><nv-desktop><div>
+    <div id="side-menu">
+        <div>Menu</div>
+        <div><nv-atalhos><div><div>Atalhos</div><div><form><input placeholder="TAG"></form></div></div></nv-atalhos></div>
+    </div>
+    <div id="area"><nv-window>Menu principal</nv-window></div>
+</div></nv-desktop></nv-root>
+<script>
+const VAZAMENTO = %(vazamento)s;
+const retidas = [];
+const area = document.getElementById('area');
+
+function janela(titulo, corpo) {
+    const w = document.createElement('nv-window');
+    w.className = 'nv-window';
+    w.innerHTML = '<div><div><div><div class="titulo"></div><div></div><div class="acoes">'
+        + '<a>_</a><a>[]</a><a>?</a><a class="close" title="Fechar">x</a></div></div></div>'
+        + '<div class="corpo"></div></div>';
+    w.querySelector('.titulo').textContent = titulo;
+    w.querySelector('.corpo').innerHTML = corpo;
+    w.querySelector('a.close').onclick = () => fecharJanela(w);
+    return w;
+}
+
+function fecharJanela(w) {
+    w.remove();
+    if (VAZAMENTO) retidas.push(w);
+}
+
+function mostrarMensagem(texto) {
+    const t = document.createElement('div');
+    t.className = 'toast';
+    t.textContent = texto;
+    document.body.appendChild(t);
+    setTimeout(() => t.remove(), 1500);
+}
+
+function abrirEquipamento(dados) {
+    const linhas = dados.historico.map(h => '<tr><td>' + h.numero + '</td><td>' + h.tipo + '</td></tr>').join('');
+    const w = janela('Equipamento ' + dados.tag,
+        '<table><tr><th>OS</th><th>Tipo</th></tr>' + linhas + '</table>'
+        + '<span id="btnAbrirOS_text" style="cursor:pointer">Abrir OS</span> '
+        + '<span id="btnFechar_text" style="cursor:pointer">Fechar</span>');
+    w.dataset.tag = dados.tag;
+    w.querySelector('#btnFechar_text').onclick = () => fecharJanela(w);
+    w.querySelector('#btnAbrirOS_text').onclick = () => abrirOS(dados.tag);
+    area.appendChild(w);
+}
+
+function abrirOS(tag) {
+    const w = janela('Nova OS', '<iframe name="frmOS" src="/os?tag=' + encodeURIComponent(tag) + '" width="800" height="400"></iframe>');
+    area.insertBefore(w, area.children[1] || null);
+}
+
+function osSalva(texto) {
+    mostrarMensagem(texto);
+}
+
+document.querySelector('#side-menu form').addEventListener('submit', ev => {
+    ev.preventDefault();
+    const tag = ev.target.querySelector('input').value.trim();
+    fetch('/api/equipamento?tag=' + encodeURIComponent(tag)).then(r => r.json()).then(abrirEquipamento);
+});
+</script>
+</body></html>
+"""
+
+PAGINA_OS = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body>
+    <input id="txtdataabertura"> <input id="txthoraabertura">
+    <button id="btnDataFechamentoHoje" type="button">Agora</button>
+    %(selects)s
+    <input id="chkOcorrenciaResolvidaMaoDeObra" type="checkbox">
+    <textarea id="txtObservacaoOcorrencia"></textarea>
+    <div id="btnsalvar_container"><button id="btnsalvar" type="button">Salvar</button></div>
+<script>
+document.getElementById('btnsalvar').onclick = () => {
+    fetch('/api/salvar?tag=' + encodeURIComponent(%(tag)s)).then(r => r.json()).then(d => parent.osSalva('Registro ' + d.numero + ' salvo com sucesso'));
+};
+</script>
+</body></html>
+"""
+
+# Opções dos dropdowns do formulário (o soak gera ordens com estes valores)
+OPCOES = {
+    "cboOficina": ["ELETRICA", "MECANICA", "REFRIGERACAO"],
+    "cbotipomanutencao": ["ROTINA", "PREVENTIVA", "CORRETIVA"],
+    "cbocomplexidadeos": ["BAIXA", "MEDIA", "ALTA"],
+    "cboUsuario": ["JOAO", "MARIA"],
+    "cboOcorrencia": ["FALHA", "QUEBRA"],
+    "cboCausa": ["USO", "ACIDENTE"],
+    "cbofuncionario": ["TEC1", "TEC2"],
+    "ddlservico": ["TROCA", "REPARO"],
+}
+
+
+def _selects() -> str:
+    return "\n    ".join(
+        f'<select id="{ident}"><option></option>{"".join(f"<option>{o}</option>" for o in opcoes)}</select>'
+        for ident, opcoes in OPCOES.items()
+    )
+
+
+class ServidorStubNeovero:
+    """
+    Servidor HTTP local (asyncio.start_server) que imita as telas do Neovero usadas
+    pela automação. O histórico de cada TAG cresce a cada OS salva, como no sistema
+    real; `vazamento=True` retém as janelas fechadas em memória (para validar o soak).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", porta: int = 0, latencia_ms: int = 0, vazamento: bool = False):
+        self.host = host
+        self.porta = porta
+        self.latencia_ms = latencia_ms
+        self.vazamento = vazamento
+        self.historico: Dict[str, List[dict]] = {}
+        self.salvas = 0
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}/"
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        logger.info(f"🧪 Stub do Neovero em {self.url}")
+
+    async def parar(self):
+        if self._servidor:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    def _equipamento(self, tag: str) -> dict:
+        return {
+            "tag": tag,
+            "id": str(zlib.crc32(tag.encode("utf-8"))),
+            "historico": self.historico.get(tag, []),
+        }
+
+    def _salvar(self, tag: str) -> dict:
+        self.salvas += 1
+        registro = {"numero": self.salvas, "tipo": "ROTINA"}
+        self.historico.setdefault(tag, []).append(registro)
+        return registro
+
+    def responder(self, caminho: str) -> tuple:
+        """(status, content-type, corpo) para um GET."""
+        partes = urlsplit(caminho)
+        parametros = {k: v[0] for k, v in parse_qs(partes.query).items()}
+        tag = parametros.get("tag", "").strip().upper()
+        html, js = "text/html; charset=utf-8", "application/json; charset=utf-8"
+
+        if partes.path == "/":
+            return "200 OK", html, PAGINA_LOGIN
+        if partes.path == "/app":
+            return "200 OK", html, PAGINA_APP % {"vazamento": json.dumps(self.vazamento)}
+        if partes.path == "/os":
+            return "200 OK", html, PAGINA_OS % {"selects": _selects(), "tag": json.dumps(tag)}
+        if partes.path == "/api/equipamento":
+            return "200 OK", js, json.dumps(self._equipamento(tag))
+        if partes.path == "/api/salvar":
+            return "200 OK", js, json.dumps(self._salvar(tag))
+        return "404 Not Found", "text/plain; charset=utf-8", "não encontrado\n"
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            requisicao = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            partes = requisicao.decode("latin-1").split()
+            caminho = partes[1] if len(partes) > 1 else "/"
+            if self.latencia_ms and caminho.startswith("/api/"):
+                await asyncio.sleep(self.latencia_ms / 1000)
+            status, tipo, corpo = self.responder(caminho)
+
+            dados = corpo.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {tipo}\r\nContent-Length: {len(dados)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + dados
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Requisição ao stub descartada: {e}")
+        finally:
+            writer.close()
@@ -3,9 +3,95 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     NEOVERO_URL: str
-    NEOVERO_USER: str
-    NEOVERO_PASS: str
+    # Credencial principal (opcional quando o pool vem de NEOVERO_CREDENCIAIS ou do arquivo)
+    NEOVERO_USER: str = ""
+    NEOVERO_PASS: str = ""
 
+    # Pool de credenciais: lista JSON [{"usuario": ..., "senha": ...}] no .env
+    # e/ou no arquivo de segredos (padrão: data/secrets/credenciais.json)
+    NEOVERO_CREDENCIAIS: list[dict[str, str]] = []
+    NEOVERO_CREDENCIAIS_ARQUIVO: str = ""
+    SESSOES_POR_CREDENCIAL: int = 1
+
+    # HAR: "" (desligado) | "gravar" | "reproduzir"
+    HAR_MODO: str = ""
+    HAR_ARQUIVO: str = ""
+    HAR_LATENCIA_MS: int = 0
+
+    # Modo sem animação: CSS sem transições + reduced motion; esperas fixas viram condições do DOM
+    MODO_SEM_ANIMACAO: bool = False
+
+    # Índice TAG → equipamento (data/cache): aprendido das respostas da busca ou importado
+    INDICE_ATIVO: bool = True
+    INDICE_URL_RESPOSTA: str = "equipamento"
+    INDICE_CAMPO_TAG: str = "tag"
+    INDICE_CAMPO_ID: str = "id"
+    # Caminho da lista de equipamentos na resposta (ex.: "dados.itens"); vazio = raiz ou única lista
+    INDICE_CAMINHO_ITENS: str = ""
+    # Buscas seguidas sem resposta conclusiva até a TAG ser dada como inexistente
+    INDICE_FALHAS_INEXISTENTE: int = 3
+    EQUIPAMENTO_URL_MODELO: str = ""
+
+    # Pipeline: segunda aba prepara o equipamento da próxima ordem
+    MODO_PIPELINE: bool = False
+
+    # Daemon de browser aquecido (connect_over_cdp). Opt-in: só conecta ao daemon do bot (marcador)
+    CDP_ATIVO: bool = False
+    CDP_PORTA: int = 9222
+    DAEMON_KEEPALIVE_S: int = 300
+
+    # Modo serviço (pasta vigiada)
+    VIGIA_INTERVALO_S: float = 5.0
+
+    # Planejador: chave de duplicidade e ordenação dos grupos
+    PLANO_CHAVE_DUPLICIDADE: list[str] = ["tag", "tipo_ordem", "data_inicio", "hora_inicio"]
+    PLANO_ORDENAR_POR: list[str] = ["tipo_oficina", "tipo_ordem"]
+
+    # Entradas CSV (separador de colunas)
+    CSV_SEPARADOR: str = ";"
+
+    # Cache das abas de Excel já normalizadas (Parquet em data/cache/entrada, pelo hash do arquivo)
+    CACHE_ENTRADA_ATIVO: bool = True
+
+    # Cache em disco dos recursos estáticos do Neovero (GETs que casam com os padrões glob)
+    CACHE_RECURSOS_ATIVO: bool = False
+    CACHE_RECURSOS_PADROES: list[str] = ["**/*.js", "**/*.css", "**/*.woff", "**/*.woff2", "**/*.png", "**/*.svg"]
+    CACHE_RECURSOS_REVALIDAR_S: int = 3600
+
+    # Cache de desativação por TAG: positivos são permanentes; negativos valem por DESATIVACAO_TTL_NEGATIVO_S
+    CACHE_DESATIVACAO_ATIVO: bool = True
+    DESATIVACAO_TTL_NEGATIVO_S: int = 600
+
+    # Prazo total (s) de cada ordem e do preparo de cada grupo; ao estourar, o passo é cancelado.
+    # Desligado por padrão (0): ative com um valor folgado acima da ordem mais lenta já medida
+    PRAZO_ORDEM_S: float = 0
+
+    # Diário de ordens + reconciliação das OS com salvamento incerto (queda após clicar em Salvar)
+    RECONCILIACAO_ATIVA: bool = True
+    RECONCILIACAO_ABAS: int = 2
+
+    # Contagem de chamadas ao Playwright por ordem/passo; orçamento = máx. de chamadas por execução do passo
+    IDA_VOLTA_ATIVA: bool = False
+    IDA_VOLTA_ORCAMENTOS: dict[str, int] = {}
+
+    # Endpoint local de métricas (Prometheus/JSON); 0 = desligado
+    METRICAS_PORTA: int = 0
+    METRICAS_HOST: str = "127.0.0.1"
+
+    # Controle de admissão (busca, Abrir OS, salvar): token bucket + AIMD
+    ADMISSAO_ATIVA: bool = False
+    ADMISSAO_RPS: float = 2.0
+    ADMISSAO_RAJADA: int = 4
+    ADMISSAO_LIMITE_MIN: int = 1
+    ADMISSAO_LIMITE_MAX: int = 4
+    ADMISSAO_TOLERANCIA_LATENCIA: float = 2.0
+    ADMISSAO_TAXA_ERRO_MAX: float = 0.2
+
+    # --profile: callbacks lentos, amostragem do Python e captura do navegador
+    PROFILE_CALLBACK_LENTO_S: float = 0.1
+    PROFILE_INTERVALO_AMOSTRA_S: float = 0.005
+    PROFILE_ORDEM_INICIO: int = 1
+    PROFILE_ORDENS: int = 3
 
     # Paths
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,10 +108,66 @@ class Settings(BaseSettings):
     def OUTPUT_DIR(self) -> str:
         return os.path.join(self.DATA_DIR, "output")
         
+    @property
+    def ARQUIVO_DIR(self) -> str:
+        return os.path.join(self.INPUT_DIR, "processados")
+
+    @property
+    def PROCESSANDO_DIR(self) -> str:
+        return os.path.join(self.INPUT_DIR, "processando")
+
+    @property
+    def CACHE_DIR(self) -> str:
+        return os.path.join(self.DATA_DIR, "cache")
+
+    @property
+    def INDICE_EQUIPAMENTOS_PATH(self) -> str:
+        return os.path.join(self.CACHE_DIR, "indice_equipamentos.json")
+
+    @property
+    def DESATIVACAO_CACHE_PATH(self) -> str:
+        return os.path.join(self.CACHE_DIR, "desativacoes.json")
+
+    @property
+    def ENTRADA_CACHE_DIR(self) -> str:
+        return os.path.join(self.CACHE_DIR, "entrada")
+
+    @property
+    def RECURSOS_CACHE_DIR(self) -> str:
+        return os.path.join(self.CACHE_DIR, "recursos")
+
+    @property
+    def SELETORES_STATS_PATH(self) -> str:
+        return os.path.join(self.CACHE_DIR, "seletores.json")
+
+    @property
+    def HISTORICO_TEMPOS_PATH(self) -> str:
+        return os.path.join(self.CACHE_DIR, "historico_tempos.jsonl")
+
+    @property
+    def DIARIO_ORDENS_PATH(self) -> str:
+        return os.path.join(self.OUTPUT_DIR, "diario_ordens.jsonl")
+
     @property
     def LOGS_DIR(self) -> str:
         return os.path.join(self.DATA_DIR, "logs")
 
+    @property
+    def BROWSER_PROFILE_DIR(self) -> str:
+        return os.path.join(self.DATA_DIR, "browser_profile")
+
+    @property
+    def DAEMON_MARCADOR_PATH(self) -> str:
+        return os.path.join(self.BROWSER_PROFILE_DIR, "daemon_cdp.json")
+
+    @property
+    def CREDENCIAIS_PATH(self) -> str:
+        return self.NEOVERO_CREDENCIAIS_ARQUIVO or os.path.join(self.DATA_DIR, "secrets", "credenciais.json")
+
+    @property
+    def HAR_PATH(self) -> str:
+        return self.HAR_ARQUIVO or os.path.join(self.DATA_DIR, "har", "sessao.har")
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
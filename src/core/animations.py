@@ -0,0 +1,123 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+from playwright.async_api import Page
+from loguru import logger
+
+# Zera transições/animações do Neovero: janelas nv-window e modais aparecem e somem no ato
+CSS_SEM_ANIMACAO = """
+*, *::before, *::after {
+    transition: none !important;
+    transition-duration: 0s !important;
+    transition-delay: 0s !important;
+    animation: none !important;
+    animation-duration: 0s !important;
+    animation-delay: 0s !important;
+    scroll-behavior: auto !important;
+}
+"""
+
+# Injetado em todos os frames (inclusive iframes do formulário de OS)
+SCRIPT_SEM_ANIMACAO = """
+(() => {
+    const aplicar = () => {
+        if (document.getElementById('__nvSemAnimacao')) return;
+        const estilo = document.createElement('style');
+        estilo.id = '__nvSemAnimacao';
+        estilo.textContent = %s;
+        (document.head || document.documentElement).appendChild(estilo);
+    };
+    if (document.documentElement) aplicar();
+    else document.addEventListener('DOMContentLoaded', aplicar);
+})();
+"""
+
+# Condições do DOM que substituem as esperas fixas de estabilização
+_DOCUMENTOS = """[document, ...Array.from(document.querySelectorAll('iframe')).map(f => {
+    try { return f.contentDocument; } catch (e) { return null; }
+})].filter(Boolean)"""
+
+CONDICAO_FORM_OS_ABERTO = f"() => {_DOCUMENTOS}.some(d => d.getElementById('txtdataabertura'))"
+CONDICAO_FORM_OS_FECHADO = f"() => !{_DOCUMENTOS}.some(d => d.getElementById('txtdataabertura'))"
+CONDICAO_JANELA_EQUIPAMENTO = "() => document.querySelectorAll('nv-window').length > 1"
+CONDICAO_JANELAS_LIMPAS = "() => document.querySelectorAll('nv-window').length <= 1"
+CONDICAO_MENOS_JANELAS = "n => document.querySelectorAll('nv-window').length < n"
+CONDICAO_SEM_FOCO = "() => !document.activeElement || document.activeElement === document.body"
+
+
+@dataclass
+class Estabilizacao:
+    """
+    Estado do modo sem animação e contabilidade das esperas de estabilização:
+    quanto tempo fixo teria sido gasto e quanto as condições do DOM levaram.
+    """
+    ativo: bool = False
+    esperas: int = 0
+    fixo_s: float = 0.0
+    condicao_s: float = 0.0
+    timeouts: int = 0
+
+    @property
+    def economia_s(self) -> float:
+        return self.fixo_s - self.condicao_s
+
+    def como_dict(self) -> dict:
+        return {
+            "ativo": self.ativo,
+            "esperas": self.esperas,
+            "fixo_s": round(self.fixo_s, 2),
+            "condicao_s": round(self.condicao_s, 2),
+            "economia_s": round(self.economia_s, 2),
+            "timeouts": self.timeouts,
+        }
+
+    def log_resumo(self):
+        if self.ativo and self.esperas:
+            logger.info(
+                f"🎞️ Modo sem animação: {self.esperas} espera(s) de estabilização, "
+                f"{self.condicao_s:.1f}s em condições do DOM contra {self.fixo_s:.1f}s fixos "
+                f"(economia de {self.economia_s:.1f}s)"
+            )
+
+
+estabilizacao = Estabilizacao()
+
+
+async def desativar_animacoes(page: Page):
+    """Injeta o CSS sem animação em todos os frames (atuais e futuros) e emula `reduced motion`."""
+    script = SCRIPT_SEM_ANIMACAO % json.dumps(CSS_SEM_ANIMACAO)
+    await page.add_init_script(script)
+    await page.emulate_media(reduced_motion="reduce")
+    for frame in page.frames:
+        try:
+            await frame.evaluate(script)
+        except Exception as e:
+            logger.debug(f"CSS sem animação não injetado no frame {frame.name or frame.url[:60]}: {e}")
+    estabilizacao.ativo = True
+    logger.info("🎞️ Modo sem animação: transições CSS desligadas e reduced motion emulado")
+
+
+async def estabilizar(page: Page, segundos: float, condicao: Optional[str] = None, arg: Any = None, timeout: int = 5000):
+    """
+    Espera de estabilização. No modo normal, pausa fixa de `segundos`; no modo sem
+    animação, aguarda uma única condição verificada do DOM (ou nada, sem condição).
+    Se a condição não se confirmar no prazo, segue em frente (como as esperas por evento).
+    Polling por intervalo, não por rAF: a aba de preparo do pipeline fica em segundo plano.
+    """
+    if not estabilizacao.ativo:
+        await asyncio.sleep(segundos)
+        return
+
+    inicio = time.monotonic()
+    if condicao:
+        try:
+            await page.wait_for_function(condicao, arg=arg, timeout=timeout, polling=50)
+        except Exception as e:
+            estabilizacao.timeouts += 1
+            logger.debug(f"Condição de estabilização não confirmada em {timeout}ms: {e}")
+
+    estabilizacao.esperas += 1
+    estabilizacao.fixo_s += segundos
+    estabilizacao.condicao_s += time.monotonic() - inicio
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional, Sequence
+from playwright.async_api import BrowserContext, Route
+from loguru import logger
+
+# Cabeçalhos que não fazem sentido numa resposta servida do disco (corpo já decodificado)
+CABECALHOS_DESCARTADOS = {"set-cookie", "content-encoding", "content-length", "transfer-encoding", "connection", "date"}
+
+
+def cacheavel(status: int, cabecalhos: dict) -> bool:
+    """Só 200 sem `no-store`/`private` e sem cookie de sessão na resposta."""
+    controle = cabecalhos.get("cache-control", "").lower()
+    return status == 200 and "no-store" not in controle and "private" not in controle and "set-cookie" not in cabecalhos
+
+
+class CacheRecursos:
+    """
+    Cache em disco dos recursos estáticos do Neovero (bundles do SPA, CSS, fontes,
+    respostas de lookup), compartilhado entre contextos e execuções. Intercepta os GETs
+    que casam com os padrões (`context.route`), serve do disco enquanto a entrada for
+    recente e, depois de `revalidar_s`, revalida com If-None-Match/If-Modified-Since.
+    A chave é a URL; os validadores (ETag, Last-Modified) ficam nos metadados.
+    """
+
+    def __init__(self, pasta: str, padroes: Sequence[str], revalidar_s: float = 3600):
+        self.pasta = pasta
+        self.padroes = list(padroes)
+        self.revalidar_s = revalidar_s
+        self.acertos = 0
+        self.revalidados = 0
+        self.faltas = 0
+        self.bytes_economizados = 0
+        self.bytes_baixados = 0
+
+    @classmethod
+    def de_settings(cls) -> "CacheRecursos":
+        from src.config.settings import settings
+        return cls(settings.RECURSOS_CACHE_DIR, settings.CACHE_RECURSOS_PADROES, settings.CACHE_RECURSOS_REVALIDAR_S)
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.acertos + self.revalidados + self.faltas
+        return (self.acertos + self.revalidados) / total if total else 0.0
+
+    async def instalar(self, context: BrowserContext):
+        for padrao in self.padroes:
+            await context.route(padrao, self._interceptar)
+        logger.info(f"🗄️ Cache de recursos ativo ({len(self.padroes)} padrão(ões), revalidação a cada {self.revalidar_s:.0f}s)")
+
+    def _caminhos(self, url: str):
+        chave = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.pasta, chave[:2], chave)
+        return f"{base}.json", f"{base}.bin"
+
+    def ler(self, url: str):
+        """(metadados, corpo) da entrada da URL, ou None."""
+        caminho_meta, caminho_corpo = self._caminhos(url)
+        try:
+            with open(caminho_meta, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(caminho_corpo, "rb") as f:
+                corpo = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return meta, corpo
+
+    def gravar(self, url: str, status: int, cabecalhos: dict, corpo: bytes) -> dict:
+        caminho_meta, caminho_corpo = self._caminhos(url)
+        os.makedirs(os.path.dirname(caminho_meta), exist_ok=True)
+        meta = {
+            "url": url,
+            "status": status,
+            "cabecalhos": {k: v for k, v in cabecalhos.items() if k.lower() not in CABECALHOS_DESCARTADOS},
+            "etag": cabecalhos.get("etag"),
+            "last_modified": cabecalhos.get("last-modified"),
+            "validado_em": time.time(),
+            "tamanho": len(corpo),
+        }
+        for caminho, conteudo, modo in ((caminho_corpo, corpo, "wb"), (caminho_meta, json.dumps(meta), "w")):
+            temporario = f"{caminho}.tmp"
+            with open(temporario, modo) as f:
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        return meta
+
+    def _marcar_validado(self, url: str, meta: dict):
+        meta["validado_em"] = time.time()
+        caminho_meta, _ = self._caminhos(url)
+        with open(caminho_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    async def _interceptar(self, route: Route):
+        requisicao = route.request
+        if requisicao.method != "GET":
+            await route.fallback()
+            return
+        try:
+            await self._responder(route, requisicao.url)
+        except Exception as e:
+            logger.debug(f"Cache de recursos ignorado para {requisicao.url[:80]}: {e}")
+            await route.fallback()
+
+    async def _responder(self, route: Route, url: str):
+        entrada = self.ler(url)
+        if entrada is not None:
+            meta, corpo = entrada
+            if time.time() - meta["validado_em"] < self.revalidar_s:
+                self.acertos += 1
+                self.bytes_economizados += len(corpo)
+                await route.fulfill(status=meta["status"], headers=meta["cabecalhos"], body=corpo)
+                return
+
+            # Entrada vencida: GET condicional; 304 = o disco continua valendo
+            validadores = {}
+            if meta.get("etag"):
+                validadores["if-none-match"] = meta["etag"]
+            if meta.get("last_modified"):
+                validadores["if-modified-since"] = meta["last_modified"]
+            resposta = await route.fetch(headers={**route.request.headers, **validadores})
+            if resposta.status == 304:
+                self.revalidados += 1
+                self.bytes_economizados += len(corpo)
+                self._marcar_validado(url, meta)
+                await route.fulfill(status=meta["status"], headers=meta["cabecalhos"], body=corpo)
+                return
+        else:
+            resposta = await route.fetch()
+
+        self.faltas += 1
+        corpo = await resposta.body()
+        self.bytes_baixados += len(corpo)
+        if cacheavel(resposta.status, resposta.headers):
+            self.gravar(url, resposta.status, resposta.headers, corpo)
+        await route.fulfill(response=resposta)
+
+    def como_dict(self) -> dict:
+        return {
+            "acertos": self.acertos,
+            "revalidados": self.revalidados,
+            "faltas": self.faltas,
+            "taxa_acerto": round(self.taxa_acerto, 3),
+            "bytes_economizados": self.bytes_economizados,
+            "bytes_baixados": self.bytes_baixados,
+        }
+
+    def log_resumo(self):
+        total = self.acertos + self.revalidados + self.faltas
+        if not total:
+            return
+        logger.info(
+            f"🗄️ Cache de recursos: {self.taxa_acerto:.0%} de acerto ({self.acertos} do disco, "
+            f"{self.revalidados} revalidado(s), {self.faltas} baixado(s)) | "
+            f"{self.bytes_economizados / 2**20:.1f}MB economizados, {self.bytes_baixados / 2**20:.1f}MB baixados"
+        )
@@ -1,15 +1,32 @@
-from playwright.async_api import async_playwright, Browser, Page, Playwright
+import asyncio
+import os
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
 from loguru import logger
-from typing import Optional
+from typing import List, Optional
+from src.config.settings import settings
+from src.core.asset_cache import CacheRecursos
+from src.core.credentials import Credencial, PoolCredenciais
+from src.core.daemon import daemon_do_bot, endpoint_cdp
+from src.core.har import configurar_reproducao, redigir_arquivo_har
 
 class BrowserManager:
     _instance = None
     _playwright: Optional[Playwright] = None
     _browser: Optional[Browser] = None
+    _context: Optional[BrowserContext] = None
+    # True quando conectado ao daemon: o browser e o contexto não são nossos
+    conectado_daemon: bool = False
+    # Pool de credenciais e a credencial arrendada pelo contexto atual
+    pool: Optional[PoolCredenciais] = None
+    credencial: Optional[Credencial] = None
+    # Cache em disco dos recursos estáticos (opt-in), compartilhado pelos contextos
+    cache_recursos: Optional[CacheRecursos] = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(BrowserManager, cls).__new__(cls)
+            cls._instance._paginas_criadas = []
+            cls._instance._credenciais_arrendadas = []
         return cls._instance
 
     async def start_browser(self) -> Page:
@@ -17,19 +34,134 @@ class BrowserManager:
         if self._playwright is None:
             self._playwright = await async_playwright().start()
         
+        if self._browser is None and await self._conectar_daemon():
+            return await self._pagina_do_daemon()
+
         if self._browser is None:
             self._browser = await self._playwright.chromium.launch(headless=False)
             logger.info("Browser iniciado")
             
-        context = await self._browser.new_context()
-        page = await context.new_page()
+        # O contexto é nosso: arrenda uma credencial por toda a vida dele
+        await self.arrendar_credencial()
+        self._context = await self._criar_contexto()
+        return await self.nova_pagina()
+
+    async def nova_pagina(self) -> Page:
+        """Abre uma nova aba no contexto atual (mesma sessão autenticada)."""
+        page = await self._context.new_page()
+        self._paginas_criadas.append(page)
         return page
 
+    async def arrendar_credencial(self) -> Credencial:
+        """Credencial do contexto atual (arrenda uma do pool na primeira chamada)."""
+        if self.credencial is None:
+            if self.pool is None:
+                self.pool = PoolCredenciais.de_settings()
+            self.credencial = await self.pool.arrendar()
+            # Todas as credenciais usadas pelo contexto são redigidas do HAR gravado
+            self._credenciais_arrendadas.append(self.credencial)
+            logger.info(f"🔑 Contexto usando a credencial '{self.credencial}'")
+        return self.credencial
+
+    async def trocar_credencial(self, motivo: str) -> Credencial:
+        """
+        Retira a credencial atual do pool (login recusado), limpa os cookies do
+        contexto e arrenda a próxima. Levanta CredenciaisEsgotadasError se não houver outra.
+        """
+        falhou, self.credencial = self.credencial, None
+        if falhou is not None:
+            await self.pool.marcar_falha(falhou, motivo)
+            await self.pool.liberar(falhou)
+        if self._context is not None and not self.conectado_daemon:
+            await self._context.clear_cookies()
+        return await self.arrendar_credencial()
+
+    async def _liberar_credencial(self):
+        if self.credencial is not None and self.pool is not None:
+            await self.pool.liberar(self.credencial)
+        self.credencial = None
+
+    async def _conectar_daemon(self) -> bool:
+        """Conecta ao daemon via CDP se ele estiver no ar (e o modo HAR não exigir contexto próprio)."""
+        if not settings.CDP_ATIVO or settings.HAR_MODO.strip():
+            return False
+        if not await asyncio.to_thread(daemon_do_bot, settings.CDP_PORTA, settings.DAEMON_MARCADOR_PATH):
+            logger.debug("Daemon CDP do bot indisponível. Iniciando browser próprio.")
+            return False
+
+        try:
+            self._browser = await self._playwright.chromium.connect_over_cdp(endpoint_cdp(settings.CDP_PORTA))
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao conectar ao daemon CDP: {e}. Iniciando browser próprio.")
+            return False
+
+        self.conectado_daemon = True
+        logger.info(f"🔥 Conectado ao browser aquecido em {endpoint_cdp(settings.CDP_PORTA)}")
+        return True
+
+    async def _pagina_do_daemon(self) -> Page:
+        """Reaproveita a aba já logada do daemon (sem novo carregamento do SPA)."""
+        self._context = self._browser.contexts[0]
+        abertas = [p for p in self._context.pages if not p.is_closed()]
+        if abertas:
+            return abertas[0]
+        return await self.nova_pagina()
+
+    async def _criar_contexto(self) -> BrowserContext:
+        """Cria o contexto aplicando o modo HAR configurado (gravar/reproduzir)."""
+        modo = settings.HAR_MODO.strip().lower()
+
+        if modo == "gravar":
+            os.makedirs(os.path.dirname(settings.HAR_PATH), exist_ok=True)
+            logger.info(f"🎙️ Gravando sessão em HAR: {settings.HAR_PATH}")
+            return await self._browser.new_context(
+                record_har_path=settings.HAR_PATH,
+                record_har_content="embed",
+            )
+
+        context = await self._browser.new_context()
+        if modo == "reproduzir":
+            await configurar_reproducao(
+                context,
+                settings.HAR_PATH,
+                lambda: (self.credencial.usuario, self.credencial.senha) if self.credencial else None,
+                latencia_ms=settings.HAR_LATENCIA_MS,
+            )
+        elif modo:
+            logger.warning(f"⚠️ HAR_MODO desconhecido: '{settings.HAR_MODO}'. Ignorando.")
+        if settings.CACHE_RECURSOS_ATIVO and modo != "reproduzir":
+            if self.cache_recursos is None:
+                self.cache_recursos = CacheRecursos.de_settings()
+            await self.cache_recursos.instalar(context)
+        return context
+
     async def stop_browser(self):
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
-        if self._playwright:
-            await self._playwright.stop()
-            self._playwright = None
-            logger.info("Browser finalizado.")
+        try:
+            if self.conectado_daemon:
+                # Fecha só as abas extras e desconecta: o daemon continua logado
+                for page in self._paginas_criadas:
+                    if not page.is_closed():
+                        await page.close()
+                self._context = None
+            elif self._context:
+                # Fechar o contexto é o que grava o HAR no disco
+                await self._context.close()
+                self._context = None
+                if settings.HAR_MODO.strip().lower() == "gravar":
+                    redigir_arquivo_har(settings.HAR_PATH, [(c.usuario, c.senha) for c in self._credenciais_arrendadas])
+        finally:
+            self._credenciais_arrendadas = []
+            await self._liberar_credencial()
+            if self.cache_recursos:
+                self.cache_recursos.log_resumo()
+            self._paginas_criadas = []
+            if self._browser:
+                # Browser do daemon não é nosso: só a conexão cai (ao parar o Playwright)
+                if not self.conectado_daemon:
+                    await self._browser.close()
+                self._browser = None
+                self.conectado_daemon = False
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+                logger.info("Browser finalizado.")
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+from src.core.exceptions import CredenciaisEsgotadasError, CredenciaisNaoConfiguradasError
+
+
+@dataclass(frozen=True)
+class Credencial:
+    usuario: str
+    senha: str = field(repr=False)
+
+    def __str__(self) -> str:
+        return self.usuario
+
+
+def _ler_lista(dados: Iterable[dict], origem: str) -> List[Credencial]:
+    credenciais = []
+    for item in dados:
+        try:
+            credenciais.append(Credencial(usuario=str(item["usuario"]).strip(), senha=str(item["senha"])))
+        except (KeyError, TypeError):
+            logger.warning(f"⚠️ Credencial inválida ignorada em {origem} (esperado: usuario e senha)")
+    return credenciais
+
+
+def carregar_credenciais(principal: Credencial, lista_env: Iterable[dict] = (), arquivo: str = "") -> List[Credencial]:
+    """
+    Junta as credenciais do `.env` (NEOVERO_USER/NEOVERO_PASS e a lista JSON
+    NEOVERO_CREDENCIAIS) e do arquivo de segredos local (lista JSON de
+    {"usuario", "senha"}), sem repetir usuários. Credenciais sem usuário ou sem
+    senha (ex.: NEOVERO_USER vazio quando só a lista é usada) ficam de fora.
+    """
+    credenciais = [principal] + _ler_lista(lista_env, "NEOVERO_CREDENCIAIS")
+    if arquivo and os.path.exists(arquivo):
+        with open(arquivo, "r", encoding="utf-8") as f:
+            credenciais += _ler_lista(json.load(f), arquivo)
+
+    unicas: Dict[str, Credencial] = {}
+    for credencial in credenciais:
+        if credencial.usuario and credencial.senha:
+            unicas.setdefault(credencial.usuario, credencial)
+    if not unicas:
+        raise CredenciaisNaoConfiguradasError(
+            "Nenhuma credencial com usuário e senha: configure NEOVERO_USER/NEOVERO_PASS, "
+            f"NEOVERO_CREDENCIAIS ou o arquivo {arquivo or '(não configurado)'}"
+        )
+    return list(unicas.values())
+
+
+class PoolCredenciais:
+    """
+    Pool de credenciais do Neovero. Cada contexto do browser arrenda uma credencial
+    pela vida inteira do contexto; cada credencial aceita até `sessoes_por_credencial`
+    arrendamentos simultâneos. Uma credencial cujo login falhou é retirada do pool
+    (as demais continuam disponíveis).
+    """
+
+    def __init__(self, credenciais: List[Credencial], sessoes_por_credencial: int = 1):
+        self.credenciais = list(credenciais)
+        self.sessoes_por_credencial = max(sessoes_por_credencial, 1)
+        self.em_uso: Dict[str, int] = {c.usuario: 0 for c in self.credenciais}
+        self.falhas: Dict[str, str] = {}
+        self._condicao = asyncio.Condition()
+
+    @classmethod
+    def de_settings(cls) -> "PoolCredenciais":
+        from src.config.settings import settings
+        credenciais = carregar_credenciais(
+            Credencial(settings.NEOVERO_USER, settings.NEOVERO_PASS),
+            settings.NEOVERO_CREDENCIAIS,
+            settings.CREDENCIAIS_PATH,
+        )
+        logger.info(f"🔑 Pool com {len(credenciais)} credencial(is), até {settings.SESSOES_POR_CREDENCIAL} sessão(ões) cada")
+        return cls(credenciais, settings.SESSOES_POR_CREDENCIAL)
+
+    def _disponiveis(self) -> List[Credencial]:
+        return [c for c in self.credenciais if c.usuario not in self.falhas]
+
+    def _livre(self) -> Optional[Credencial]:
+        # A menos usada primeiro, para espalhar as sessões entre usuários
+        livres = [c for c in self._disponiveis() if self.em_uso[c.usuario] < self.sessoes_por_credencial]
+        return min(livres, key=lambda c: self.em_uso[c.usuario], default=None)
+
+    async def arrendar(self) -> Credencial:
+        """Aguarda uma credencial com vaga. Levanta CredenciaisEsgotadasError se todas falharam."""
+        async with self._condicao:
+            await self._condicao.wait_for(lambda: self._livre() is not None or not self._disponiveis())
+            credencial = self._livre()
+            if credencial is None:
+                raise CredenciaisEsgotadasError(f"Todas as credenciais falharam no login: {self.falhas}")
+            self.em_uso[credencial.usuario] += 1
+        logger.debug(f"🔑 Credencial '{credencial}' arrendada ({self.em_uso[credencial.usuario]}/{self.sessoes_por_credencial})")
+        return credencial
+
+    async def liberar(self, credencial: Credencial):
+        async with self._condicao:
+            self.em_uso[credencial.usuario] = max(self.em_uso[credencial.usuario] - 1, 0)
+            self._condicao.notify_all()
+        logger.debug(f"🔑 Credencial '{credencial}' liberada")
+
+    async def marcar_falha(self, credencial: Credencial, motivo: str):
+        """Retira a credencial do pool (login recusado) e acorda quem aguarda."""
+        async with self._condicao:
+            self.falhas[credencial.usuario] = motivo
+            self._condicao.notify_all()
+        logger.error(f"❌ Login falhou para '{credencial}': {motivo}. Credencial retirada do pool "
+                     f"({len(self._disponiveis())} restante(s))")
+
+    def como_dict(self) -> dict:
+        return {
+            "em_uso": dict(self.em_uso),
+            "falhas": dict(self.falhas),
+            "sessoes_por_credencial": self.sessoes_por_credencial,
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import urllib.request
+from playwright.async_api import async_playwright
+from loguru import logger
+from src.config.settings import settings
+from src.core.credentials import PoolCredenciais
+from src.pages.login_page import LoginPage
+
+
+def endpoint_cdp(porta: int) -> str:
+    return f"http://127.0.0.1:{porta}"
+
+
+def daemon_disponivel(porta: int, timeout: float = 0.5) -> bool:
+    """Verifica (rapidamente) se há um Chromium com depuração remota ouvindo na porta."""
+    try:
+        with urllib.request.urlopen(f"{endpoint_cdp(porta)}/json/version", timeout=timeout) as resposta:
+            return resposta.status == 200
+    except Exception:
+        return False
+
+
+def versao_cdp(porta: int, timeout: float = 0.5):
+    """Resposta de /json/version do browser na porta (None se não houver nenhum)."""
+    try:
+        with urllib.request.urlopen(f"{endpoint_cdp(porta)}/json/version", timeout=timeout) as resposta:
+            return json.loads(resposta.read())
+    except Exception:
+        return None
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def gravar_marcador(caminho: str, porta: int, pid: int) -> dict:
+    """Identifica o browser do daemon: PID do daemon e o websocket CDP daquele browser."""
+    versao = versao_cdp(porta, timeout=5) or {}
+    marcador = {"pid": pid, "porta": porta, "websocket": versao.get("webSocketDebuggerUrl")}
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(marcador, f)
+    return marcador
+
+
+def daemon_do_bot(porta: int, caminho_marcador: str) -> bool:
+    """
+    True só se o browser na porta for o do daemon do bot: o marcador existe, o processo
+    do daemon está vivo e o websocket CDP é o mesmo registrado no marcador. Um Chromium
+    qualquer com depuração remota (ex.: o browser de debug de um desenvolvedor) é ignorado.
+    """
+    try:
+        with open(caminho_marcador, "r", encoding="utf-8") as f:
+            marcador = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if marcador.get("porta") != porta or not marcador.get("websocket") or not _processo_vivo(marcador.get("pid", 0)):
+        return False
+    versao = versao_cdp(porta)
+    return bool(versao) and versao.get("webSocketDebuggerUrl") == marcador["websocket"]
+
+
+async def _garantir_login(login_page: LoginPage, credencial):
+    if await login_page.esta_autenticado():
+        return
+    logger.info("🔐 Sessão do daemon não autenticada. Realizando login...")
+    await login_page.navegar()
+    await login_page.realizar_login(credencial)
+    logger.success("✅ Daemon logado")
+
+
+async def executar_daemon():
+    """
+    Mantém um Chromium logado no Neovero com depuração remota na porta CDP_PORTA.
+    As execuções do bot se conectam a ele via `connect_over_cdp`, pulando a inicialização
+    do Playwright, o launch do browser, o primeiro carregamento do SPA e o login.
+    Verifica a sessão a cada DAEMON_KEEPALIVE_S segundos e refaz o login se ela expirar.
+    """
+    porta = settings.CDP_PORTA
+    if daemon_disponivel(porta):
+        logger.warning(f"⚠️ Já existe um browser ouvindo em {endpoint_cdp(porta)}. Nada a fazer.")
+        return
+
+    os.makedirs(settings.BROWSER_PROFILE_DIR, exist_ok=True)
+
+    async with async_playwright() as playwright:
+        # Contexto persistente = contexto padrão do browser, visível para quem conecta via CDP
+        context = await playwright.chromium.launch_persistent_context(
+            settings.BROWSER_PROFILE_DIR,
+            headless=False,
+            args=[f"--remote-debugging-port={porta}", "--remote-debugging-address=127.0.0.1"],
+        )
+        page = context.pages[0] if context.pages else await context.new_page()
+        login_page = LoginPage(page)
+        # Primeira credencial configurada (.env ou arquivo de segredos)
+        credencial = PoolCredenciais.de_settings().credenciais[0]
+
+        await _garantir_login(login_page, credencial)
+        await asyncio.to_thread(gravar_marcador, settings.DAEMON_MARCADOR_PATH, porta, os.getpid())
+        logger.success(f"🔥 Daemon pronto em {endpoint_cdp(porta)} (Ctrl+C para encerrar)")
+
+        try:
+            while True:
+                await asyncio.sleep(settings.DAEMON_KEEPALIVE_S)
+                try:
+                    await _garantir_login(login_page, credencial)
+                except Exception as e:
+                    logger.error(f"❌ Falha ao renovar sessão do daemon: {e}")
+        finally:
+            if os.path.exists(settings.DAEMON_MARCADOR_PATH):
+                os.remove(settings.DAEMON_MARCADOR_PATH)
+            await context.close()
+            logger.info("Daemon finalizado.")
@@ -0,0 +1,168 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from playwright.async_api import Page
+from loguru import logger
+from src.core.exceptions import EventoTimeoutError
+
+PREFIXO_BINDING = "__nvEmitirEvento"
+
+# Grid de histórico da janela do equipamento (tabelas soltas fora de nv-window não contam)
+SELETOR_GRID_HISTORICO = "nv-window table"
+SELETOR_LINHAS_HISTORICO = "nv-window table tr"
+
+# Observador injetado em TODOS os frames (página principal + iframes).
+# Cada mutação do DOM reavalia um pequeno conjunto de estados e só emite
+# quando algum deles muda, evitando tráfego desnecessário para o Python.
+# O binding tem nome único por ponte: numa página reaproveitada (daemon CDP),
+# o observador da conexão anterior é desligado e substituído.
+SCRIPT_OBSERVADOR = """
+(() => {
+    if (window.__nvPonteBinding === '%(binding)s') return;
+    if (window.__nvPonteObservador) window.__nvPonteObservador.disconnect();
+    window.__nvPonteBinding = '%(binding)s';
+
+    const SELETOR_MENSAGEM = '.toast, .toast-message, .alert, .nv-mensagem, .swal2-popup, [role="alert"]';
+    const estado = { janelas: -1, form: false, linhas: 0, mensagem: '' };
+
+    const emitir = (nome, dados) => {
+        try { window.%(binding)s(nome, dados || {}); } catch (e) {}
+    };
+
+    const verificar = () => {
+        const janelas = document.querySelectorAll('nv-window').length;
+        if (estado.janelas >= 0 && janelas > estado.janelas) emitir('janela_aberta', { total: janelas });
+        if (estado.janelas >= 0 && janelas < estado.janelas) emitir('janela_fechada', { total: janelas });
+        estado.janelas = janelas;
+
+        const form = !!document.getElementById('txtdataabertura');
+        if (form && !estado.form) emitir('form_os_pronto', {});
+        if (!form && estado.form) emitir('form_os_fechado', {});
+        estado.form = form;
+
+        const msg = document.querySelector(SELETOR_MENSAGEM);
+        const texto = msg ? (msg.innerText || '').trim() : '';
+        if (texto && texto !== estado.mensagem) {
+            emitir('mensagem_exibida', { texto: texto });
+        }
+        estado.mensagem = texto;
+
+        const linhas = document.querySelectorAll('%(linhas_historico)s').length;
+        if (linhas > 0 && linhas !== estado.linhas) emitir('historico_renderizado', { linhas: linhas });
+        estado.linhas = linhas;
+    };
+
+    window.__nvPonteObservador = new MutationObserver(verificar);
+    window.__nvPonteObservador.observe(document, { childList: true, subtree: true });
+    verificar();
+})();
+"""
+
+
+@dataclass
+class Evento:
+    nome: str
+    dados: dict = field(default_factory=dict)
+    frame: Any = None
+    instante: float = 0.0
+
+
+@dataclass
+class EsperaEvento:
+    """Resultado de `EventBridge.esperar`, preenchido ao sair do bloco `async with`."""
+    nome: str
+    evento: Optional[Evento] = None
+
+
+class EventBridge:
+    """
+    Ponte push de eventos do DOM do Neovero para o Python.
+    Um MutationObserver em cada frame chama um binding exposto via `expose_binding`;
+    os page objects aguardam o evento exato com prazo, em vez de fazer polling.
+
+    Eventos: janela_aberta, janela_fechada, form_os_pronto, form_os_fechado,
+    mensagem_exibida e historico_renderizado.
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.binding = f"{PREFIXO_BINDING}_{uuid.uuid4().hex[:8]}"
+        self._script = SCRIPT_OBSERVADOR % {"binding": self.binding, "linhas_historico": SELETOR_LINHAS_HISTORICO}
+        self._esperas: dict[str, list[tuple[asyncio.Future, Optional[Callable[[Evento], bool]]]]] = {}
+        self._ultimos: dict[str, Evento] = {}
+        self._total_recebidos = 0
+
+    async def instalar(self):
+        """Expõe o binding e injeta o observador (também nos frames já carregados)."""
+        try:
+            await self.page.expose_binding(self.binding, self._receber)
+        except Exception as e:
+            # Binding já registrado nesta página (ponte reinstalada): o observador é só reinjetado
+            if "already registered" not in str(e):
+                raise
+            logger.debug(f"Binding {self.binding} já registrado; reaproveitando")
+        else:
+            await self.page.add_init_script(self._script)
+
+        for frame in self.page.frames:
+            try:
+                await frame.evaluate(self._script)
+            except Exception as e:
+                logger.debug(f"Observador não injetado no frame {frame.name or frame.url[:60]}: {e}")
+
+        logger.info("📡 Ponte de eventos DOM → Python instalada")
+
+    def _receber(self, source: dict, nome: str, dados: Optional[dict] = None):
+        evento = Evento(nome=nome, dados=dados or {}, frame=source.get("frame"), instante=time.monotonic())
+        self._ultimos[nome] = evento
+        self._total_recebidos += 1
+        logger.debug(f"📡 Evento '{nome}': {evento.dados}")
+
+        for futuro, predicado in self._esperas.get(nome, []):
+            if futuro.done():
+                continue
+            try:
+                if predicado is None or predicado(evento):
+                    futuro.set_result(evento)
+            except Exception as e:
+                logger.debug(f"Predicado do evento '{nome}' falhou: {e}")
+
+    def ultimo(self, nome: str) -> Optional[Evento]:
+        """Último evento recebido com esse nome (ou None)."""
+        return self._ultimos.get(nome)
+
+    @asynccontextmanager
+    async def esperar(self, nome: str, timeout: int = 10000, predicado: Optional[Callable[[Evento], bool]] = None):
+        """
+        Arma a espera ANTES da ação (evita corrida) e aguarda o evento ao sair do bloco:
+
+            async with eventos.esperar("form_os_pronto", timeout=10000) as espera:
+                await botao.click()
+            frame = espera.evento.frame
+
+        Levanta EventoTimeoutError se o evento não chegar dentro do prazo (ms).
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        registro = (futuro, predicado)
+        self._esperas.setdefault(nome, []).append(registro)
+        espera = EsperaEvento(nome=nome)
+
+        try:
+            yield espera
+            try:
+                espera.evento = await asyncio.wait_for(futuro, timeout / 1000)
+            except asyncio.TimeoutError:
+                raise EventoTimeoutError(f"Evento '{nome}' não recebido em {timeout}ms")
+        finally:
+            self._esperas[nome].remove(registro)
+            if not futuro.done():
+                futuro.cancel()
+
+    async def aguardar(self, nome: str, timeout: int = 10000, predicado: Optional[Callable[[Evento], bool]] = None) -> Evento:
+        """Aguarda o próximo evento `nome` sem ação associada."""
+        async with self.esperar(nome, timeout=timeout, predicado=predicado) as espera:
+            pass
+        return espera.evento
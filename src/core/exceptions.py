@@ -1,3 +1,23 @@
 class AutomacaoOSError(Exception):
     """Exceção customizada para erros de negócio na automação."""
     pass
+
+
+class EventoTimeoutError(AutomacaoOSError):
+    """Evento esperado do DOM não chegou dentro do prazo."""
+    pass
+
+
+class CredenciaisEsgotadasError(AutomacaoOSError):
+    """Nenhuma credencial do pool restou com login válido."""
+    pass
+
+
+class CredenciaisNaoConfiguradasError(AutomacaoOSError):
+    """Nenhuma credencial com usuário e senha foi configurada (.env ou arquivo de segredos)."""
+    pass
+
+
+class PrazoOrdemExcedidoError(AutomacaoOSError):
+    """A ordem (ou o preparo do grupo) passou do prazo total e o passo em andamento foi cancelado."""
+    pass
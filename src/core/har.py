@@ -0,0 +1,114 @@
+import asyncio
+import json
+from typing import Any, Callable, Iterable, Optional, Tuple
+from urllib.parse import quote, quote_plus
+from playwright.async_api import BrowserContext, Route
+from loguru import logger
+
+USUARIO_REDIGIDO = "NEOVERO_USER_REDIGIDO"
+SENHA_REDIGIDA = "NEOVERO_PASS_REDIGIDO"
+VALOR_REDIGIDO = "REDIGIDO"
+
+# Cabeçalhos que carregam sessão/credenciais e nunca devem ir para o disco
+CABECALHOS_SENSIVEIS = {"authorization", "cookie", "set-cookie", "proxy-authorization", "x-csrf-token", "x-xsrf-token"}
+
+
+def _variantes(valor: str) -> list[str]:
+    """Formas em que um segredo pode aparecer num corpo HTTP (cru, url-encoded, JSON)."""
+    variantes = {valor, quote(valor, safe=""), quote_plus(valor), json.dumps(valor)[1:-1]}
+    # Mais longas primeiro para não substituir um prefixo de outra variante
+    return sorted((v for v in variantes if v), key=len, reverse=True)
+
+
+def substituir_segredos(texto: str, substituicoes: dict[str, str]) -> str:
+    """Troca cada segredo (em qualquer variante de codificação) pelo seu marcador."""
+    for segredo, marcador in substituicoes.items():
+        if not segredo:
+            continue
+        for variante in _variantes(segredo):
+            texto = texto.replace(variante, marcador)
+    return texto
+
+
+def substituicoes_credenciais(credenciais: Iterable[Tuple[str, str]]) -> dict[str, str]:
+    """Segredo → marcador para cada (usuário, senha); senhas antes dos usuários, mais longos primeiro."""
+    credenciais = [(u, s) for u, s in credenciais if u or s]
+    senhas = sorted({s for _, s in credenciais if s}, key=len, reverse=True)
+    usuarios = sorted({u for u, _ in credenciais if u}, key=len, reverse=True)
+    return {**{s: SENHA_REDIGIDA for s in senhas}, **{u: USUARIO_REDIGIDO for u in usuarios}}
+
+
+def _redigir_no(no: Any, substituicoes: dict[str, str]) -> Any:
+    if isinstance(no, dict):
+        # Conteúdo binário em base64 não carrega texto legível
+        if no.get("encoding") == "base64":
+            return no
+        if "name" in no and "value" in no and str(no["name"]).lower() in CABECALHOS_SENSIVEIS:
+            return {**no, "value": VALOR_REDIGIDO}
+        resultado = {}
+        for chave, valor in no.items():
+            if chave == "cookies" and isinstance(valor, list):
+                resultado[chave] = [{**c, "value": VALOR_REDIGIDO} for c in valor]
+            else:
+                resultado[chave] = _redigir_no(valor, substituicoes)
+        return resultado
+    if isinstance(no, list):
+        return [_redigir_no(item, substituicoes) for item in no]
+    if isinstance(no, str):
+        return substituir_segredos(no, substituicoes)
+    return no
+
+
+def redigir_har(dados_har: dict, usuario: str, senha: str, outras: Iterable[Tuple[str, str]] = ()) -> dict:
+    """
+    Remove credenciais de um HAR já carregado (a principal e `outras`, ex.: as trocadas
+    durante a gravação). Usuário e senha viram marcadores fixos (mantendo o login
+    reproduzível); cookies e cabeçalhos de autenticação viram 'REDIGIDO'.
+    """
+    return _redigir_no(dados_har, substituicoes_credenciais([(usuario, senha), *outras]))
+
+
+def redigir_arquivo_har(caminho: str, credenciais: Iterable[Tuple[str, str]]):
+    """Aplica `redigir_har` com todas as `credenciais` no arquivo gravado, sobrescrevendo-o."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+
+    dados = _redigir_no(dados, substituicoes_credenciais(credenciais))
+
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False)
+
+    total = len(dados.get("log", {}).get("entries", []))
+    logger.info(f"🔏 HAR redigido: {total} requisição(ões) em {caminho}")
+
+
+async def configurar_reproducao(
+    context: BrowserContext,
+    caminho: str,
+    credencial_atual: Callable[[], Optional[Tuple[str, str]]],
+    latencia_ms: int = 0,
+):
+    """
+    Serve as respostas gravadas via `route_from_har` (requisições fora do HAR são abortadas).
+    Uma rota registrada depois (e portanto avaliada antes) injeta latência e troca as
+    credenciais reais pelos marcadores, para o POST de login casar com o HAR redigido.
+    A credencial é lida a cada requisição: uma troca no pool vale na hora.
+    """
+    await context.route_from_har(caminho, not_found="abort")
+
+    async def _antes_do_har(route: Route):
+        if latencia_ms > 0:
+            await asyncio.sleep(latencia_ms / 1000)
+
+        corpo = route.request.post_data
+        credencial = credencial_atual()
+        if corpo and credencial:
+            corpo_redigido = substituir_segredos(corpo, substituicoes_credenciais([credencial]))
+            if corpo_redigido != corpo:
+                await route.fallback(post_data=corpo_redigido)
+                return
+        await route.fallback()
+
+    await context.route("**/*", _antes_do_har)
+    logger.info(f"📼 Reproduzindo sessão gravada: {caminho} (latência injetada: {latencia_ms}ms)")
+
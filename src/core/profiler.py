@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from loguru import logger
+
+# Categorias do trace do Chromium (mesmo conjunto do painel Performance do DevTools)
+CATEGORIAS_TRACE = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "v8.execute",
+    "blink.user_timing",
+    "loading",
+]
+
+
+def caminho_perfil(pasta: str, nome: str, extensao: str) -> str:
+    os.makedirs(pasta, exist_ok=True)
+    return os.path.join(pasta, f"{nome}_{datetime.now():%Y%m%d_%H%M%S}.{extensao}")
+
+
+class _PonteLogging(logging.Handler):
+    """Encaminha os avisos do logger `asyncio` (callbacks lentos) para o loguru."""
+
+    def emit(self, record: logging.LogRecord):
+        logger.warning(f"🐢 [asyncio] {record.getMessage()}")
+
+
+def ativar_debug_loop(loop: asyncio.AbstractEventLoop, limite_s: float = 0.1):
+    """
+    Modo debug do asyncio: todo callback/passo de corrotina que segurar o loop por
+    mais de `limite_s` é reportado (ex.: leitura síncrona da planilha, screenshot).
+    """
+    loop.set_debug(True)
+    loop.slow_callback_duration = limite_s
+    log_asyncio = logging.getLogger("asyncio")
+    log_asyncio.setLevel(logging.WARNING)
+    if not any(isinstance(h, _PonteLogging) for h in log_asyncio.handlers):
+        log_asyncio.addHandler(_PonteLogging())
+    logger.info(f"🐢 Detecção de callbacks lentos do asyncio ativa (> {limite_s * 1000:.0f}ms)")
+
+
+class AmostradorPython:
+    """
+    Profiler por amostragem da thread do event loop, em formato "collapsed stacks"
+    (flamegraph.pl, speedscope, inferno). Cada pilha começa pela task asyncio que
+    estava executando, então o tempo é atribuído à corrotina de origem; amostras
+    com o loop parado no seletor entram como `(loop ocioso)`.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, intervalo_s: float = 0.005):
+        self.loop = loop
+        self.intervalo_s = intervalo_s
+        self.amostras: Counter = Counter()
+        self._thread_alvo = threading.get_ident()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._amostrar, name="amostrador-perfil", daemon=True)
+        self._thread.start()
+        logger.info(f"🔬 Amostragem do Python ativa (a cada {self.intervalo_s * 1000:.0f}ms)")
+
+    def parar(self):
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+
+    def _pilha(self, frame) -> list:
+        pilha = []
+        while frame is not None:
+            codigo = frame.f_code
+            pilha.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        pilha.reverse()
+        return pilha
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo_s):
+            frame = sys._current_frames().get(self._thread_alvo)
+            if frame is None:
+                continue
+            task = asyncio.current_task(self.loop)
+            if task is not None:
+                raiz = f"task:{task.get_name()}"
+            elif frame.f_code.co_name == "select":
+                # Loop parado em selectors.select aguardando I/O (ex.: resposta do browser)
+                raiz = "(loop ocioso)"
+            else:
+                raiz = "(sem task)"
+            self.amostras[";".join([raiz] + self._pilha(frame))] += 1
+
+    def salvar(self, caminho: str) -> str:
+        with open(caminho, "w", encoding="utf-8") as f:
+            for pilha, total in self.amostras.most_common():
+                f.write(f"{pilha} {total}\n")
+        logger.info(f"🔬 Perfil do Python ({sum(self.amostras.values())} amostras): {caminho}")
+        return caminho
+
+
+class PerfilNavegador:
+    """
+    Captura CPU profile (CDP `Profiler`, arquivo .cpuprofile para o DevTools/speedscope)
+    e trace do Chromium (JSON para chrome://tracing/Perfetto) de uma janela de ordens:
+    da ordem `inicio` até `inicio + quantidade - 1` (numeração da execução).
+    """
+
+    def __init__(self, pasta: str, inicio: int = 1, quantidade: int = 3):
+        self.pasta = pasta
+        self.inicio = inicio
+        self.fim = inicio + quantidade - 1
+        self._cdp = None
+        self._browser = None
+        self._trace_path: Optional[str] = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._cdp is not None
+
+    async def antes_da_ordem(self, numero: int, page):
+        if numero != self.inicio or self.ativo:
+            return
+        try:
+            self._cdp = await page.context.new_cdp_session(page)
+            await self._cdp.send("Profiler.enable")
+            await self._cdp.send("Profiler.start")
+
+            self._browser = page.context.browser
+            if self._browser is not None:
+                self._trace_path = caminho_perfil(self.pasta, "trace_navegador", "json")
+                await self._browser.start_tracing(page=page, path=self._trace_path, categories=CATEGORIAS_TRACE)
+            logger.info(f"🔬 Captura do navegador iniciada (ordens {self.inicio}-{self.fim})")
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível iniciar a captura do navegador: {e}")
+            self._cdp = None
+
+    async def depois_da_ordem(self, numero: int):
+        if self.ativo and numero >= self.fim:
+            await self.finalizar()
+
+    async def finalizar(self):
+        """Encerra a captura (também chamado no fim da execução, se a janela não fechou)."""
+        if not self.ativo:
+            return
+        cdp, self._cdp = self._cdp, None
+        try:
+            resultado = await cdp.send("Profiler.stop")
+            caminho = caminho_perfil(self.pasta, "cpu_navegador", "cpuprofile")
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump(resultado["profile"], f)
+            logger.info(f"🔬 CPU profile do navegador: {caminho}")
+            await cdp.detach()
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao salvar o CPU profile do navegador: {e}")
+
+        if self._browser is not None and self._trace_path:
+            try:
+                await self._browser.stop_tracing()
+                logger.info(f"🔬 Trace do navegador: {self._trace_path}")
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao salvar o trace do navegador: {e}")
+            self._browser = self._trace_path = None
+
+
+class Perfilador:
+    """`--profile`: debug do event loop, amostragem do Python e captura do navegador."""
+
+    def __init__(self, pasta: str, limite_callback_s: float, intervalo_s: float, ordem_inicio: int, ordens: int):
+        self.pasta = pasta
+        self.limite_callback_s = limite_callback_s
+        self.amostrador: Optional[AmostradorPython] = None
+        self.intervalo_s = intervalo_s
+        self.navegador = PerfilNavegador(pasta, ordem_inicio, ordens)
+        self._inicio = 0.0
+
+    @classmethod
+    def de_settings(cls) -> "Perfilador":
+        from src.config.settings import settings
+        return cls(
+            settings.LOGS_DIR,
+            settings.PROFILE_CALLBACK_LENTO_S,
+            settings.PROFILE_INTERVALO_AMOSTRA_S,
+            settings.PROFILE_ORDEM_INICIO,
+            settings.PROFILE_ORDENS,
+        )
+
+    def iniciar(self):
+        loop = asyncio.get_running_loop()
+        ativar_debug_loop(loop, self.limite_callback_s)
+        self.amostrador = AmostradorPython(loop, self.intervalo_s)
+        self.amostrador.iniciar()
+        self._inicio = time.monotonic()
+
+    async def finalizar(self):
+        await self.navegador.finalizar()
+        if self.amostrador:
+            self.amostrador.parar()
+            self.amostrador.salvar(caminho_perfil(self.pasta, "perfil_python", "collapsed"))
+        logger.info(f"🔬 Perfil concluído em {time.monotonic() - self._inicio:.1f}s (arquivos em {self.pasta})")
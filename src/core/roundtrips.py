@@ -0,0 +1,233 @@
+import csv
+import functools
+import inspect
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from loguru import logger
+
+# Raiz do pacote `src`: a chamada é atribuída ao primeiro método nosso na pilha
+RAIZ_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORA_DE_PASSO = "(fora de passo)"
+SEM_ORDEM = "(sem ordem)"
+
+
+@dataclass
+class ExecucaoPasso:
+    """Chamadas ao Playwright de uma execução de um passo (ex.: 'preencher_salvar' da ordem #12)."""
+    nome: str
+    unidade: str
+    chamadas: int = 0
+    tempo_s: float = 0.0
+
+
+@dataclass
+class EstatisticaPasso:
+    execucoes: int = 0
+    chamadas: int = 0
+    tempo_s: float = 0.0
+    maximo: int = 0
+    estouros: int = 0
+
+    def como_dict(self) -> dict:
+        return {
+            "execucoes": self.execucoes,
+            "chamadas": self.chamadas,
+            "media": round(self.chamadas / self.execucoes, 1) if self.execucoes else None,
+            "maximo": self.maximo,
+            "tempo_s": round(self.tempo_s, 3),
+            "estouros": self.estouros,
+        }
+
+
+# Passo e ordem correntes: cada task (aba do pipeline) enxerga os seus
+_passo_atual: ContextVar[Optional[ExecucaoPasso]] = ContextVar("passo_ida_volta", default=None)
+_unidade_atual: ContextVar[str] = ContextVar("ordem_ida_volta", default=SEM_ORDEM)
+# Contador que recebe as chamadas das classes instrumentadas (o último a chamar `instalar`)
+_instalado: Optional["ContadorIdaVolta"] = None
+
+
+def _origem() -> str:
+    """Primeiro método do projeto na pilha (ex.: 'EquipmentPage.fechar_janela')."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(RAIZ_SRC) and arquivo != __file__:
+            return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        frame = frame.f_back
+    return "(externo)"
+
+
+def _medir(nome: str, metodo):
+    """Envolve um método assíncrono do Playwright: mede e registra no contador instalado."""
+
+    @functools.wraps(metodo)
+    async def medido(*args, **kwargs):
+        contador = _instalado
+        if contador is None or not contador.ativo:
+            return await metodo(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return await metodo(*args, **kwargs)
+        finally:
+            contador.registrar(nome, _origem(), time.perf_counter() - inicio)
+
+    return medido
+
+
+def metodo_em_andamento(tarefa) -> str:
+    """Método mais interno do projeto na cadeia de awaits da tarefa (ex.: 'OsPage._salvar_e_aguardar_processamento')."""
+    coro, metodo = tarefa.get_coro(), "(externo)"
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None)
+        if frame is not None and frame.f_code.co_filename.startswith(RAIZ_SRC):
+            metodo = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        coro = getattr(coro, "cr_await", None)
+    return metodo
+
+
+@dataclass
+class ContadorIdaVolta:
+    """
+    Conta e cronometra cada chamada assíncrona ao Playwright (count, is_visible,
+    inner_text, evaluate, fill...), atribuída ao método da página que a fez, ao passo
+    lógico (busca, abrir_os, preencher_salvar...) e à ordem. Orçamentos por passo
+    sinalizam execuções que passaram do número de chamadas esperado.
+    """
+    ativo: bool = False
+    orcamentos: Dict[str, int] = field(default_factory=dict)
+    passos: Dict[str, EstatisticaPasso] = field(default_factory=lambda: defaultdict(EstatisticaPasso))
+    # origem → método do Playwright → [chamadas, tempo]
+    origens: Dict[str, Dict[str, list]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(lambda: [0, 0.0])))
+    # ordem → passo → [chamadas, tempo]
+    ordens: Dict[str, Dict[str, list]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(lambda: [0, 0.0])))
+
+    def instalar(self, orcamentos: Optional[Dict[str, int]] = None, classes: Optional[Sequence[type]] = None):
+        """Instrumenta as classes do Playwright (uma vez por processo) e liga a contagem."""
+        global _instalado
+        if classes is None:
+            from playwright.async_api import ElementHandle, Frame, Keyboard, Locator, Mouse, Page
+            classes = (Page, Frame, Locator, ElementHandle, Mouse, Keyboard)
+
+        for classe in classes:
+            if getattr(classe, "_ida_volta_instrumentada", False):
+                continue
+            for nome, metodo in list(vars(classe).items()):
+                if not nome.startswith("_") and inspect.iscoroutinefunction(metodo):
+                    setattr(classe, nome, _medir(f"{classe.__name__}.{nome}", metodo))
+            classe._ida_volta_instrumentada = True
+
+        _instalado = self
+        self.orcamentos = dict(orcamentos or {})
+        self.ativo = True
+        orcamento = f" | orçamentos: {self.orcamentos}" if self.orcamentos else ""
+        logger.info(f"🔁 Contagem de idas e voltas ao Playwright ativa{orcamento}")
+
+    def registrar(self, metodo: str, origem: str, segundos: float):
+        execucao = _passo_atual.get()
+        if execucao is not None:
+            execucao.chamadas += 1
+            execucao.tempo_s += segundos
+        passo = execucao.nome if execucao else FORA_DE_PASSO
+        unidade = execucao.unidade if execucao else _unidade_atual.get()
+
+        por_metodo = self.origens[origem][metodo]
+        por_metodo[0] += 1
+        por_metodo[1] += segundos
+        por_passo = self.ordens[unidade][passo]
+        por_passo[0] += 1
+        por_passo[1] += segundos
+
+    @contextmanager
+    def ordem(self, rotulo: str):
+        """Atribui as chamadas do bloco à ordem `rotulo` (ex.: '#12 TAG-01')."""
+        token = _unidade_atual.set(rotulo)
+        try:
+            yield
+        finally:
+            _unidade_atual.reset(token)
+
+    @contextmanager
+    def passo(self, nome: str):
+        """Execução de um passo lógico; ao sair, confere o orçamento de chamadas."""
+        if not self.ativo:
+            yield
+            return
+        execucao = ExecucaoPasso(nome, _unidade_atual.get())
+        token = _passo_atual.set(execucao)
+        try:
+            yield
+        finally:
+            _passo_atual.reset(token)
+            estatistica = self.passos[nome]
+            estatistica.execucoes += 1
+            estatistica.chamadas += execucao.chamadas
+            estatistica.tempo_s += execucao.tempo_s
+            estatistica.maximo = max(estatistica.maximo, execucao.chamadas)
+            limite = self.orcamentos.get(nome)
+            if limite is not None and execucao.chamadas > limite:
+                estatistica.estouros += 1
+                logger.warning(f"🔁 Passo '{nome}' ({execucao.unidade}) fez {execucao.chamadas} chamadas ao Playwright (orçamento {limite})")
+
+    @property
+    def estouros(self) -> Dict[str, int]:
+        return {nome: e.estouros for nome, e in self.passos.items() if e.estouros}
+
+    def como_dict(self) -> dict:
+        return {
+            "ativo": self.ativo,
+            "orcamentos": self.orcamentos,
+            "passos": {nome: e.como_dict() for nome, e in self.passos.items()},
+            "estouros": self.estouros,
+        }
+
+    def _linhas_ordens(self) -> List[tuple]:
+        linhas = []
+        for unidade, passos in self.ordens.items():
+            linhas.append((unidade, sum(c for c, _ in passos.values()), sum(t for _, t in passos.values()), passos))
+        return linhas
+
+    def salvar_csv(self, caminho: str) -> str:
+        """Tabela completa: uma linha por ordem, colunas de chamadas por passo."""
+        nomes = sorted({p for passos in self.ordens.values() for p in passos})
+        with open(caminho, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.writer(f, delimiter=";")
+            escritor.writerow(["ordem", "chamadas", "tempo_s"] + nomes)
+            for unidade, chamadas, tempo, passos in self._linhas_ordens():
+                escritor.writerow([unidade, chamadas, f"{tempo:.3f}"] + [passos[p][0] if p in passos else 0 for p in nomes])
+        return caminho
+
+    def log_resumo(self, maximo_ordens: int = 20):
+        if not self.ativo or not self.ordens:
+            return
+        logger.info("🔁 Idas e voltas ao Playwright por passo (média | máx | tempo | estouros do orçamento):")
+        for nome, e in sorted(self.passos.items(), key=lambda item: -item[1].chamadas):
+            limite = self.orcamentos.get(nome)
+            orcamento = f" / orçamento {limite}" if limite is not None else ""
+            logger.info(
+                f"   {nome:<24} {e.chamadas / e.execucoes:>6.1f} | {e.maximo:>4} | "
+                f"{e.tempo_s:>7.1f}s | {e.estouros}{orcamento}"
+            )
+
+        linhas = sorted(self._linhas_ordens(), key=lambda linha: -linha[1])
+        logger.info(f"🔁 Ordens com mais chamadas ({min(maximo_ordens, len(linhas))} de {len(linhas)}):")
+        for unidade, chamadas, tempo, passos in linhas[:maximo_ordens]:
+            detalhe = ", ".join(f"{p}={c}" for p, (c, _) in sorted(passos.items(), key=lambda item: -item[1][0]))
+            logger.info(f"   {unidade:<32} {chamadas:>5} chamadas {tempo:>7.2f}s | {detalhe}")
+
+        metodos = sorted(
+            ((origem, metodo, c, t) for origem, por_metodo in self.origens.items() for metodo, (c, t) in por_metodo.items()),
+            key=lambda item: -item[2],
+        )
+        logger.info("🔁 Métodos com mais chamadas (origem → chamada do Playwright):")
+        for origem, metodo, chamadas, tempo in metodos[:10]:
+            logger.info(f"   {origem} → {metodo}: {chamadas} ({tempo:.2f}s)")
+
+
+contador_ida_volta = ContadorIdaVolta()
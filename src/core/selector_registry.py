@@ -0,0 +1,155 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from loguru import logger
+
+
+def nome_frame(frame) -> str:
+    """Identificador estável do frame para as estatísticas (nome, caminho da URL ou 'main')."""
+    if getattr(frame, "parent_frame", None) is None:
+        # Page (sem parent_frame) ou frame principal
+        return "main"
+    if frame.name:
+        return frame.name
+    url = getattr(frame, "url", "") or ""
+    return url.split("?")[0].rsplit("/", 1)[-1] or "iframe"
+
+
+@dataclass
+class EstatisticaSeletor:
+    tentativas: int = 0
+    acertos: int = 0
+    tempo_s: float = 0.0
+    frames: Counter = field(default_factory=Counter)
+
+    @property
+    def pontuacao(self) -> float:
+        # Suavização de Laplace: candidato nunca testado fica no meio (0,5)
+        return (self.acertos + 1) / (self.tentativas + 2)
+
+    def como_dict(self) -> dict:
+        return {"tentativas": self.tentativas, "acertos": self.acertos, "tempo_s": round(self.tempo_s, 4), "frames": dict(self.frames)}
+
+
+class Sonda:
+    """Uma tentativa de um seletor; `acerto(frame)` marca que ele encontrou o controle."""
+
+    def __init__(self):
+        self.frame: Optional[str] = None
+
+    @property
+    def acertou(self) -> bool:
+        return self.frame is not None
+
+    def acerto(self, frame):
+        self.frame = nome_frame(frame)
+
+
+class RegistroSeletores:
+    """
+    Registro de controles lógicos (ex.: 'fechar_janela') e seus seletores candidatos.
+    Conta acertos, tempo de cada sonda e em que frame cada seletor casou; devolve os
+    candidatos em ordem de sucesso histórico e os frames com o frame de acerto primeiro.
+    As estatísticas persistem entre execuções.
+    """
+
+    def __init__(self):
+        self.caminho: Optional[str] = None
+        self.controles: Dict[str, Dict[str, EstatisticaSeletor]] = {}
+
+    def carregar(self, caminho: str):
+        self.caminho = caminho
+        if not os.path.exists(caminho):
+            return
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Estatísticas de seletores ignoradas ({caminho}): {e}")
+            return
+        for controle, seletores in dados.items():
+            self.controles[controle] = {
+                seletor: EstatisticaSeletor(s["tentativas"], s["acertos"], s["tempo_s"], Counter(s.get("frames", {})))
+                for seletor, s in seletores.items()
+            }
+        logger.debug(f"Estatísticas de seletores carregadas: {len(self.controles)} controle(s)")
+
+    def salvar(self):
+        if not self.caminho:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
+
+    def _estatistica(self, controle: str, seletor: str) -> EstatisticaSeletor:
+        return self.controles.setdefault(controle, {}).setdefault(seletor, EstatisticaSeletor())
+
+    def ordenar(self, controle: str, candidatos: Sequence[str]) -> List[str]:
+        """Candidatos por taxa de acerto histórica (empates mantêm a ordem original)."""
+        estatisticas = self.controles.get(controle, {})
+        return sorted(candidatos, key=lambda s: -estatisticas[s].pontuacao if s in estatisticas else -0.5)
+
+    def ordenar_frames(self, controle: str, seletor: str, frames: Sequence) -> list:
+        """Frames com aquele em que o seletor mais casou primeiro."""
+        estatistica = self.controles.get(controle, {}).get(seletor)
+        if not estatistica or not estatistica.frames:
+            return list(frames)
+        return sorted(frames, key=lambda f: -estatistica.frames.get(nome_frame(f), 0))
+
+    @contextmanager
+    def sonda(self, controle: str, seletor: str):
+        """Mede uma tentativa do seletor (inclusive quando o bloco retorna ou levanta)."""
+        sonda = Sonda()
+        inicio = time.perf_counter()
+        try:
+            yield sonda
+        finally:
+            estatistica = self._estatistica(controle, seletor)
+            estatistica.tentativas += 1
+            estatistica.tempo_s += time.perf_counter() - inicio
+            if sonda.acertou:
+                estatistica.acertos += 1
+                estatistica.frames[sonda.frame] += 1
+
+    async def localizar(self, controle: str, candidatos: Sequence[str], frames: Sequence):
+        """
+        Primeiro candidato presente em algum frame, na ordem aprendida.
+        Retorna (frame, locator) ou None.
+        """
+        for seletor in self.ordenar(controle, candidatos):
+            with self.sonda(controle, seletor) as sonda:
+                for frame in self.ordenar_frames(controle, seletor, frames):
+                    try:
+                        locator = frame.locator(seletor)
+                        if await locator.count() > 0:
+                            sonda.acerto(frame)
+                            return frame, locator.first
+                    except Exception:
+                        continue
+        return None
+
+    def como_dict(self) -> dict:
+        return {c: {s: e.como_dict() for s, e in seletores.items()} for c, seletores in self.controles.items()}
+
+    def log_resumo(self):
+        if not self.controles:
+            return
+        logger.info("🎯 Seletores (controle: candidato mais eficaz | acertos | tempo médio por sonda | frame):")
+        for controle, seletores in sorted(self.controles.items()):
+            melhor_seletor, melhor = max(seletores.items(), key=lambda item: (item[1].acertos, -item[1].tempo_s))
+            tentativas = sum(e.tentativas for e in seletores.values())
+            tempo = sum(e.tempo_s for e in seletores.values())
+            frame = melhor.frames.most_common(1)[0][0] if melhor.frames else "-"
+            logger.info(
+                f"   {controle}: {melhor_seletor} | {melhor.acertos}/{melhor.tentativas} | "
+                f"{tempo / tentativas * 1000:.0f}ms ({tentativas} sonda(s)) | {frame}"
+            )
+
+
+registro_seletores = RegistroSeletores()
@@ -1,4 +1,6 @@
+import argparse
 import asyncio
+from datetime import datetime
 import sys
 import os
 from loguru import logger
@@ -7,199 +9,464 @@ from loguru import logger
 sys.path.append(os.getcwd())
 
 from src.config.settings import settings
+from src.core.animations import estabilizar
 from src.core.browser import BrowserManager
+from src.core.daemon import executar_daemon
+from src.core.profiler import Perfilador
+from src.core.roundtrips import contador_ida_volta
+from src.core.selector_registry import registro_seletores
 from src.pages.login_page import LoginPage
-from src.pages.menu_page import MenuPage
-from src.pages.equipment_page import EquipmentPage
-from src.pages.os_page import OsPage
-from src.services.excel_loader import carregar_planilha
+from src.services.admission import ControleAdmissao
+from src.services.deactivation_cache import CacheDesativacao
+from src.services.equipment_index import IndiceEquipamentos
+from src.services.excel_loader import TODAS_AS_ABAS, FiltroEntrada, carregar_planilhas
+from src.services.metrics import MetricasExecucao, ServidorMetricas
+from src.services.order_processor import OrderProcessor, criar_aba
+from src.services.planner import planejar_execucao
+from src.services.reconciliation import DiarioOrdens, reconciliar
+from src.services.timing_history import HistoricoTempos, contar_desativacoes
+from src.services.watcher import RegistroLinhas, arquivar, hash_ordem, listar_entradas, reservar, vigiar_pasta
+from src.utils.timers import LinhaDoTempo, aguardar_entrada_e_sessao
 
-async def run_automation():
-    logger.info("=" * 80)
-    logger.info("🚀 Iniciando Automação de OS - Estratégia State-Clean (Sem Reload)")
-    logger.info("=" * 80)
-    
-    # 1. Carregar Dados do Excel
-    input_file = os.path.join(settings.INPUT_DIR, "dados.xlsx")
-    if not os.path.exists(input_file):
-        logger.error(f"❌ Arquivo não encontrado: {input_file}")
+async def _login(browser_manager: BrowserManager, page):
+    """Login (dispensado quando a sessão aquecida do daemon já está autenticada)."""
+    login_page = LoginPage(page)
+    if browser_manager.conectado_daemon and await login_page.esta_autenticado():
+        logger.success("✅ Sessão aquecida do daemon reaproveitada (login dispensado)")
+        return
+    credencial = await browser_manager.arrendar_credencial()
+    while True:
+        logger.info(f"🔐 Iniciando processo de login ({credencial})...")
+        await login_page.navegar()
+        await login_page.realizar_login(credencial)
+        if await login_page.confirmar_login():
+            break
+        # Falha de uma credencial não derruba a execução: tenta a próxima do pool
+        credencial = await browser_manager.trocar_credencial("sessão não estabelecida após o login")
+    logger.success("✅ Login realizado com sucesso")
+    await estabilizar(page, 3)
+
+async def _abrir_aba_extra(browser_manager: BrowserManager, abas: list):
+    """Nova aba no mesmo contexto autenticado (sem novo login), na rota da aba principal."""
+    page = await browser_manager.nova_pagina()
+    aba = await criar_aba(page, chr(ord("A") + len(abas)), abas[0].menu.indice)
+    await page.goto(abas[0].page.url)
+    return aba
+
+async def _reconciliar(browser_manager: BrowserManager, abas: list, plano, diario):
+    """Reconcilia as ordens com salvamento incerto antes da primeira ordem."""
+    if diario is None:
+        return None
+    return await reconciliar(
+        plano, diario, abas,
+        nova_aba=lambda: _abrir_aba_extra(browser_manager, abas),
+        max_abas=settings.RECONCILIACAO_ABAS,
+    )
+
+async def _executar_plano(browser_manager: BrowserManager, abas: list, plano, processador: OrderProcessor):
+    """Executa os grupos do plano na aba principal ou, no modo pipeline, em duas abas."""
+    logger.info(f"\n{'=' * 80}")
+    logger.info(f"🔄 Iniciando processamento de {plano.total_ordens} ordem(ns) em {len(plano.grupos)} grupo(s)")
+    logger.info(f"{'=' * 80}\n")
+
+    if settings.MODO_PIPELINE and len(plano.grupos) > 1:
+        if len(abas) == 1:
+            logger.info("🔀 Modo pipeline: abrindo segunda aba no mesmo contexto...")
+            abas.append(await _abrir_aba_extra(browser_manager, abas))
+        await processador.executar_pipeline(abas[0], abas[1], plano.grupos)
+    else:
+        await processador.executar_sequencial(abas[0], plano.grupos)
+
+def _abrir_diario():
+    return DiarioOrdens(settings.DIARIO_ORDENS_PATH) if settings.RECONCILIACAO_ATIVA else None
+
+def _carregar_cache_desativacao():
+    if not settings.CACHE_DESATIVACAO_ATIVO:
+        return None
+    return CacheDesativacao(settings.DESATIVACAO_CACHE_PATH, settings.DESATIVACAO_TTL_NEGATIVO_S)
+
+def _em_pipeline(plano) -> bool:
+    return settings.MODO_PIPELINE and len(plano.grupos) > 1
+
+def _prever(plano, cache_desativacao, workers: int = 1, meta_s=None):
+    """Previsão de duração pelo histórico de tempos (None enquanto não houver histórico)."""
+    historico = HistoricoTempos(settings.HISTORICO_TEMPOS_PATH)
+    conhecidas = cache_desativacao.positivos.keys() if cache_desativacao else ()
+    previsao = historico.prever(plano, conhecidas, pipeline=_em_pipeline(plano))
+    if previsao is None:
+        logger.info("🔮 Sem histórico de tempos ainda: a previsão fica disponível após a primeira execução")
+    else:
+        previsao.log(workers, meta_s)
+    return historico, previsao
+
+def _pasta_cache_entrada():
+    return settings.ENTRADA_CACHE_DIR if settings.CACHE_ENTRADA_ATIVO else None
+
+def _carregar_indice():
+    if not settings.INDICE_ATIVO:
+        return None
+    return IndiceEquipamentos(settings.INDICE_EQUIPAMENTOS_PATH, settings.EQUIPAMENTO_URL_MODELO)
+
+def _verificar_tags(plano, indice):
+    """Sinaliza, antes da execução, TAGs que a busca já não encontrou e as ainda fora do índice."""
+    if indice is None:
         return
+    indexadas, desconhecidas, inexistentes = indice.verificar(grupo.tag for grupo in plano.grupos)
+    logger.info(f"📇 Índice de equipamentos: {len(indexadas)} TAG(s) com acesso direto, {len(desconhecidas)} pela busca")
+    if inexistentes:
+        logger.warning(f"⚠️ {len(inexistentes)} TAG(s) não encontrada(s) em buscas anteriores: {inexistentes[:20]}")
+
+def _planejar(ordens):
+    # Planejamento: duplicatas, agrupamento por TAG e ordenação
+    plano = planejar_execucao(
+        ordens,
+        campos_chave=settings.PLANO_CHAVE_DUPLICIDADE,
+        ordenar_por=settings.PLANO_ORDENAR_POR,
+    )
+    plano.log_resumo()
+    return plano
+
+def _criar_admissao():
+    """Controle de admissão global (um por processo, compartilhado pelas abas)."""
+    if not settings.ADMISSAO_ATIVA:
+        return None
+    admissao = ControleAdmissao.de_settings()
+    logger.info(f"🚦 Controle de admissão: {settings.ADMISSAO_RPS} req/s, até {admissao.limite} passo(s) crítico(s) simultâneo(s)")
+    return admissao
+
+async def _iniciar_metricas(metricas: MetricasExecucao):
+    """Sobe o endpoint de métricas no mesmo event loop (se METRICAS_PORTA estiver configurada)."""
+    if not settings.METRICAS_PORTA:
+        return None
+    servidor = ServidorMetricas(metricas, settings.METRICAS_HOST, settings.METRICAS_PORTA)
+    try:
+        await servidor.iniciar()
+    except OSError as e:
+        logger.warning(f"⚠️ Endpoint de métricas não iniciado (porta {settings.METRICAS_PORTA}): {e}")
+        return None
+    return servidor
+
+async def _screenshot_fatal(page):
+    try:
+        fatal_screenshot = os.path.join(settings.LOGS_DIR, "fatal_error.png")
+        await page.screenshot(path=fatal_screenshot)
+        logger.info(f"📸 Screenshot de erro fatal salvo: {fatal_screenshot}")
+    except:
+        pass
+
+async def run_automation(arquivos=None, abas=0, filtro=None, perfilar=False):
+    perfilador = Perfilador.de_settings() if perfilar else None
+    if perfilador:
+        perfilador.iniciar()
+    try:
+        await _executar_automacao(arquivos, abas, filtro, perfilador)
+    finally:
+        if perfilador:
+            await perfilador.finalizar()
 
-    ordens = carregar_planilha(input_file)
+def _preparar_entrada(arquivos, abas, filtro):
+    """Leitura, validação e planejamento (roda numa thread, fora do event loop)."""
+    ordens = carregar_planilhas(
+        arquivos, abas=abas, filtro=filtro, separador_csv=settings.CSV_SEPARADOR, pasta_cache=_pasta_cache_entrada()
+    )
     if not ordens:
         logger.error("❌ Nenhuma ordem carregada da planilha!")
-        return
+        return None
 
     logger.info(f"📊 Total de {len(ordens)} ordem(ns) carregada(s) da planilha")
+    plano = _planejar(ordens)
+    indice = _carregar_indice()
+    _verificar_tags(plano, indice)
+    registro_seletores.carregar(settings.SELETORES_STATS_PATH)
+    return plano, indice, _carregar_cache_desativacao()
 
-    # 2. Setup Browser
-    browser_manager = BrowserManager()
-    page = await browser_manager.start_browser()
-    
-    # Injeta script para prevenir roubo de foco
-    await page.add_init_script("window.focus = function() { return false; }")
-    logger.info("🔒 Script anti-foco injetado no navegador")
+async def _abrir_sessao(browser_manager: BrowserManager, linha: LinhaDoTempo):
+    """Sobe o navegador e autentica (concorrente com a leitura da planilha)."""
+    async with linha.etapa("navegador"):
+        page = await browser_manager.start_browser()
+    async with linha.etapa("login"):
+        await _login(browser_manager, page)
+    return page
+
+async def _aguardar_inicializacao(entrada: asyncio.Task, sessao: asyncio.Task):
+    """
+    Espera a planilha e a sessão. Se a entrada falhar (ou vier vazia), cancela na hora a
+    sessão ainda em andamento: nenhuma ordem é enviada. Retorna (plano, indice, cache, page) ou None.
+    """
+    resultado = await aguardar_entrada_e_sessao(entrada, sessao)
+    if resultado is None:
+        return None
+    (plano, indice, cache_desativacao), page = resultado
+    return plano, indice, cache_desativacao, page
+
+async def _executar_automacao(arquivos, abas, filtro, perfilador=None):
+    logger.info("=" * 80)
+    logger.info("🚀 Iniciando Automação de OS - Estratégia State-Clean (Sem Reload)")
+    logger.info("=" * 80)
     
-    # Estatísticas de execução
-    stats = {"sucesso": 0, "falha": 0, "pulado": 0}
+    arquivos = arquivos or [os.path.join(settings.INPUT_DIR, "dados.xlsx")]
+    for input_file in arquivos:
+        if not os.path.exists(input_file):
+            logger.error(f"❌ Arquivo não encontrado: {input_file}")
+            return
+    if settings.IDA_VOLTA_ATIVA:
+        contador_ida_volta.instalar(settings.IDA_VOLTA_ORCAMENTOS)
+
+    # 1. Planilha (thread) e navegador + login em paralelo
+    linha = LinhaDoTempo()
+    browser_manager = BrowserManager()
+
+    async def _entrada():
+        async with linha.etapa("planilha"):
+            return await asyncio.to_thread(_preparar_entrada, arquivos, abas, filtro)
+
+    entrada = asyncio.create_task(_entrada())
+    sessao = asyncio.create_task(_abrir_sessao(browser_manager, linha))
+    page = indice = cache_desativacao = servidor_metricas = None
     
     try:
-        # Instancia Páginas
-        login_page = LoginPage(page)
-        menu_page = MenuPage(page)
-        equipment_page = EquipmentPage(page)
-        os_page = OsPage(page)
-        
-        # === LOGIN ===
-        logger.info("🔐 Iniciando processo de login...")
-        await login_page.navegar()
-        await login_page.realizar_login()
-        logger.success("✅ Login realizado com sucesso")
-        await asyncio.sleep(3)
-        
+        inicializacao = await _aguardar_inicializacao(entrada, sessao)
+        if inicializacao is None:
+            logger.error("❌ Entrada inválida: execução abortada antes de qualquer ordem")
+            return
+        plano, indice, cache_desativacao, page = inicializacao
+        abas = [await criar_aba(page, "A", indice)]
+        linha.marcar("pronto")
+        linha.log_resumo()
+
+        # Ordens que ficaram em "Salvar clicado" numa execução interrompida
+        diario = _abrir_diario()
+        await _reconciliar(browser_manager, abas, plano, diario)
+
+        # Previsão pelo histórico: ponto de partida do ETA ao vivo
+        historico, previsao = _prever(plano, cache_desativacao)
+        a_verificar, conhecidas = contar_desativacoes(plano, cache_desativacao.positivos.keys() if cache_desativacao else ())
+
+        # Passos por ordem + estatísticas de execução
+        metricas = MetricasExecucao(plano.total_ordens)
+        if previsao:
+            metricas.segundos_previstos_por_ordem = previsao.segundos_por_ordem
+        processador = OrderProcessor(
+            total_ordens=plano.total_ordens,
+            ao_concluir=lambda os_data, status: linha.marcar("primeira OS"),
+            metricas=metricas,
+            admissao=_criar_admissao(),
+            perfil=perfilador.navegador if perfilador else None,
+            diario=diario,
+            prazo_ordem_s=settings.PRAZO_ORDEM_S,
+            cache_desativacao=cache_desativacao,
+        )
+        servidor_metricas = await _iniciar_metricas(metricas)
+
         # === LOOP PRINCIPAL ===
-        logger.info(f"\n{'=' * 80}")
-        logger.info(f"🔄 Iniciando processamento de {len(ordens)} ordem(ns)")
-        logger.info(f"{'=' * 80}\n")
-        
-        for i, os_data in enumerate(ordens):
-            num_ordem = i + 1
-            logger.info(f"\n{'─' * 80}")
-            logger.info(f"📌 ORDEM {num_ordem}/{len(ordens)} | TAG: {os_data.tag}")
-            logger.info(f"{'─' * 80}")
-            
-            try:
-                # ═══════════════════════════════════════════════════════════════
-                # MOMENTO 1: LIMPEZA PRÉVIA (Início de cada iteração)
-                # Remove resquícios da OS anterior antes de buscar novo ativo
-                # ═══════════════════════════════════════════════════════════════
-                logger.info("🧹 [MOMENTO 1] Limpeza prévia: removendo resquícios da iteração anterior...")
-                await equipment_page.fechar_janela()
-                await asyncio.sleep(1)
-                
-                # === PASSO 1: BUSCAR ATIVO ===
-                logger.info(f"🔍 Buscando ativo com TAG: {os_data.tag}")
-                await menu_page.buscar_ativo(os_data.tag)
-                await asyncio.sleep(2)  # Aguarda sistema processar busca
-                
-                # === PASSO 2: VERIFICAÇÃO DE DUPLICIDADE (Apenas para Desativações) ===
-                is_desativacao = (
-                    "DESATIV" in str(os_data.tipo_ordem).upper() or 
-                    "DESATIV" in str(os_data.tipo_oficina).upper()
-                )
-                
-                if is_desativacao:
-                    logger.info("🔎 Tipo identificado como DESATIVAÇÃO. Verificando duplicidade...")
-                    tem_duplicidade = await equipment_page.verificar_desativacao_existente()
-                    
-                    if tem_duplicidade:
-                        # ═══════════════════════════════════════════════════════════════
-                        # MOMENTO 2: LIMPEZA AO PULAR (Condicional de duplicidade)
-                        # Fecha janela de equipamento ao detectar duplicidade
-                        # ═══════════════════════════════════════════════════════════════
-                        logger.warning(f"⏭️ PULANDO ordem {os_data.tag}: Desativação ativa já existente!")
-                        stats["pulado"] += 1
-                        
-                        logger.info("🧹 [MOMENTO 2] Fechando janela de equipamento (duplicidade)...")
-                        await equipment_page.fechar_janela()
-                        await asyncio.sleep(1)
-                        
-                        logger.info(f"📊 Status atual: ✅ {stats['sucesso']} | ⏭️ {stats['pulado']} | ❌ {stats['falha']}")
-                        continue  # Pula para próxima ordem
-                else:
-                    logger.debug("ℹ️ Não é desativação. Pulando verificação de duplicidade.")
-                
-                # === PASSO 3: ABRIR NOVA OS ===
-                logger.info("🆕 Abrindo formulário de Nova OS...")
-                await equipment_page.clicar_abrir_os()
-                await asyncio.sleep(2)  # Aguarda iframe/modal carregar
-                
-                # === PASSO 4: PREENCHER E SALVAR OS ===
-                logger.info("📝 Preenchendo formulário da OS...")
-                await os_page.preencher_nova_os(os_data)
-                
-                stats["sucesso"] += 1
-                logger.success(f"✅ OS {os_data.tag} processada com sucesso!")
-                logger.info(f"📊 Status atual: ✅ {stats['sucesso']} | ⏭️ {stats['pulado']} | ❌ {stats['falha']}")
-
-            except Exception as e_os:
-                # ═══════════════════════════════════════════════════════════════
-                # MOMENTO 3: LIMPEZA DE ERRO (Bloco except)
-                # Garante que falhas não deixem janelas órfãs
-                # ═══════════════════════════════════════════════════════════════
-                stats["falha"] += 1
-                logger.error(f"❌ ERRO ao processar OS {os_data.tag}: {e_os}")
-                
-                # Screenshot de debug
-                try:
-                    screenshot_path = os.path.join(settings.LOGS_DIR, f"erro_{os_data.tag}.png")
-                    await page.screenshot(path=screenshot_path)
-                    logger.info(f"📸 Screenshot salvo: {screenshot_path}")
-                except Exception as e_screenshot:
-                    logger.debug(f"Não foi possível capturar screenshot: {e_screenshot}")
-                
-                # LIMPEZA DE EMERGÊNCIA
-                logger.warning("🧹 [MOMENTO 3] Limpeza de emergência após erro...")
-                try:
-                    await equipment_page.fechar_janela()
-                    await asyncio.sleep(2)  # Pausa maior para estabilização após erro
-                except Exception as e_cleanup:
-                    logger.error(f"❌ Falha na limpeza de emergência: {e_cleanup}")
-                    
-                    # Último recurso: força limpeza via JavaScript direto
-                    try:
-                        logger.warning("⚠️ Executando limpeza JavaScript direta (último recurso)...")
-                        await page.evaluate("""
-                            () => {
-                                const windows = document.querySelectorAll('nv-window');
-                                windows.forEach((win, idx) => {
-                                    if (idx > 0) win.remove();
-                                });
-                            }
-                        """)
-                        await asyncio.sleep(1)
-                        logger.info("✅ Limpeza JavaScript concluída")
-                    except Exception as e_js:
-                        logger.error(f"❌ Falha crítica na limpeza JavaScript: {e_js}")
-                
-                logger.info(f"📊 Status atual: ✅ {stats['sucesso']} | ⏭️ {stats['pulado']} | ❌ {stats['falha']}")
-            
-            # Pequena pausa entre iterações para estabilidade do sistema
-            await asyncio.sleep(0.5)
+        inicio_ordens = linha.agora()
+        await _executar_plano(browser_manager, abas, plano, processador)
+        parede_s = linha.agora() - inicio_ordens
 
         # === RELATÓRIO FINAL ===
-        logger.info(f"\n{'=' * 80}")
-        logger.info("📋 RELATÓRIO FINAL DE EXECUÇÃO")
-        logger.info(f"{'=' * 80}")
-        logger.success(f"✅ Ordens Processadas com Sucesso: {stats['sucesso']}")
-        logger.warning(f"⏭️ Ordens Puladas (Duplicidade):  {stats['pulado']}")
-        logger.error(f"❌ Ordens com Falha:               {stats['falha']}")
-        logger.info(f"📊 Total Processado:                {stats['sucesso'] + stats['pulado'] + stats['falha']}/{len(ordens)}")
-        logger.info(f"{'=' * 80}")
-        
-        if stats['falha'] == 0:
-            logger.success("🎉 Automação concluída SEM FALHAS!")
-        else:
-            logger.warning(f"⚠️ Automação concluída com {stats['falha']} falha(s). Verifique os logs.")
+        processador.relatorio_final(plano.total_ordens)
+        if metricas.duracoes:
+            historico.registrar(
+                metricas,
+                desativacoes=a_verificar,
+                puladas=max(metricas.contadores["pulado"] - conhecidas, 0),
+                inicializacao_s=linha.marcos.get("pronto"),
+                parede_s=parede_s,
+                pipeline=_em_pipeline(plano),
+            )
 
     except Exception as e_fatal:
         logger.critical(f"💥 ERRO FATAL na execução: {e_fatal}")
-        
-        try:
-            fatal_screenshot = os.path.join(settings.LOGS_DIR, "fatal_error.png")
-            await page.screenshot(path=fatal_screenshot)
-            logger.info(f"📸 Screenshot de erro fatal salvo: {fatal_screenshot}")
-        except:
-            pass
-        
+        if page:
+            await _screenshot_fatal(page)
         raise  # Re-lança exceção para debugging
         
     finally:
+        if servidor_metricas:
+            await servidor_metricas.parar()
+        if perfilador:
+            # A captura do navegador precisa terminar antes de fechá-lo
+            await perfilador.navegador.finalizar()
+        if indice:
+            indice.salvar()
+        if cache_desativacao:
+            cache_desativacao.salvar()
+        registro_seletores.salvar()
+        logger.info("\n🔌 Encerrando navegador...")
+        await browser_manager.stop_browser()
+        logger.info("✅ Navegador encerrado com sucesso")
+
+async def _processar_arquivo_vigiado(
+    caminho: str,
+    registro: RegistroLinhas,
+    browser_manager: BrowserManager,
+    abas: list,
+    metricas: MetricasExecucao,
+    admissao: ControleAdmissao = None,
+    cache_desativacao: CacheDesativacao = None,
+):
+    """Carrega o arquivo (já reservado em PROCESSANDO_DIR), executa só as linhas novas e o arquiva ao final."""
+    ordens = await asyncio.to_thread(
+        carregar_planilhas, [caminho], separador_csv=settings.CSV_SEPARADOR, pasta_cache=_pasta_cache_entrada()
+    )
+    novas = registro.filtrar_novas(ordens)
+    logger.info(f"📊 {os.path.basename(caminho)}: {len(ordens)} linha(s), {len(novas)} nova(s)")
+
+    if novas:
+        plano = _planejar(novas)
+        _verificar_tags(plano, abas[0].menu.indice)
+        diario = _abrir_diario()
+        reconciliacao = await _reconciliar(browser_manager, abas, plano, diario)
+        if reconciliacao:
+            registro.marcar(hash_ordem(o) for o in reconciliacao.salvas)
+
+        def _ao_concluir(os_data, status):
+            if status in ("sucesso", "pulado"):
+                registro.marcar([hash_ordem(os_data)])
+
+        # No serviço as métricas acumulam entre arquivos; a fila cresce a cada arquivo
+        metricas.total_ordens += plano.total_ordens
+        processador = OrderProcessor(
+            total_ordens=plano.total_ordens, ao_concluir=_ao_concluir, metricas=metricas, admissao=admissao, diario=diario,
+            prazo_ordem_s=settings.PRAZO_ORDEM_S, cache_desativacao=cache_desativacao,
+        )
+        await _executar_plano(browser_manager, abas, plano, processador)
+        processador.relatorio_final(plano.total_ordens)
+        if abas[0].menu.indice:
+            abas[0].menu.indice.salvar()
+        if cache_desativacao:
+            cache_desativacao.salvar()
+        registro_seletores.salvar()
+
+    arquivar(caminho, settings.ARQUIVO_DIR)
+
+async def run_service():
+    """
+    Modo serviço: mantém a sessão aberta e processa cada planilha depositada em
+    INPUT_DIR, executando apenas as linhas ainda não concluídas em arquivos anteriores.
+    """
+    logger.info("=" * 80)
+    logger.info("🛰️ Iniciando Automação de OS - Modo Serviço (pasta vigiada)")
+    logger.info("=" * 80)
+
+    registro = RegistroLinhas(os.path.join(settings.OUTPUT_DIR, "linhas_processadas.txt"))
+    logger.info(f"🧾 {len(registro)} linha(s) já concluída(s) em execuções anteriores")
+
+    browser_manager = BrowserManager()
+    page = await browser_manager.start_browser()
+    abas = [await criar_aba(page, "A", _carregar_indice())]
+    registro_seletores.carregar(settings.SELETORES_STATS_PATH)
+    if settings.IDA_VOLTA_ATIVA:
+        contador_ida_volta.instalar(settings.IDA_VOLTA_ORCAMENTOS)
+
+    metricas = MetricasExecucao()
+    admissao = _criar_admissao()
+    cache_desativacao = _carregar_cache_desativacao()
+    servidor_metricas = await _iniciar_metricas(metricas)
+
+    fila: asyncio.Queue = asyncio.Queue()
+    # Arquivos reservados e não arquivados (queda ou falha anterior) são retomados primeiro
+    for pendente in listar_entradas(settings.PROCESSANDO_DIR):
+        logger.info(f"♻️ Retomando arquivo pendente: {os.path.basename(pendente)}")
+        fila.put_nowait((pendente, None))
+    vigia = asyncio.create_task(vigiar_pasta(settings.INPUT_DIR, fila, settings.VIGIA_INTERVALO_S))
+
+    try:
+        await _login(browser_manager, page)
+
+        while True:
+            caminho, assinatura = await fila.get()
+            # Só a versão vista pelo vigia é lida e arquivada; uma mais nova chega pela fila
+            reservado = caminho if assinatura is None else reservar(caminho, assinatura, settings.PROCESSANDO_DIR)
+            if reservado is None:
+                continue
+            try:
+                await _processar_arquivo_vigiado(
+                    reservado, registro, browser_manager, abas, metricas, admissao, cache_desativacao
+                )
+            except Exception as e_arquivo:
+                # Arquivo fica em PROCESSANDO_DIR: é retomado no próximo início do serviço
+                logger.error(f"❌ Falha ao processar {os.path.basename(reservado)}: {e_arquivo}")
+
+    except Exception as e_fatal:
+        logger.critical(f"💥 ERRO FATAL no serviço: {e_fatal}")
+        await _screenshot_fatal(page)
+        raise
+
+    finally:
+        vigia.cancel()
+        if servidor_metricas:
+            await servidor_metricas.parar()
         logger.info("\n🔌 Encerrando navegador...")
         await browser_manager.stop_browser()
         logger.info("✅ Navegador encerrado com sucesso")
 
+def executar_previsao(arquivos=None, abas=0, filtro=None, meta_horas=None, workers: int = 1):
+    """Lê e planeja a planilha (sem navegador) e mostra a duração prevista pelo histórico."""
+    arquivos = arquivos or [os.path.join(settings.INPUT_DIR, "dados.xlsx")]
+    ordens = carregar_planilhas(
+        arquivos, abas=abas, filtro=filtro, separador_csv=settings.CSV_SEPARADOR, pasta_cache=_pasta_cache_entrada()
+    )
+    if not ordens:
+        logger.error("❌ Nenhuma ordem carregada da planilha!")
+        return None
+    plano = _planejar(ordens)
+    _, previsao = _prever(plano, _carregar_cache_desativacao(), workers, meta_horas * 3600 if meta_horas else None)
+    return previsao
+
+def _parse_abas(valor: str):
+    if valor == TODAS_AS_ABAS:
+        return TODAS_AS_ABAS
+    return [int(a) if a.strip().isdigit() else a.strip() for a in valor.split(",")]
+
+def _parse_data(valor: str):
+    return datetime.strptime(valor, "%d/%m/%Y").date()
+
+def _parse_lista(valor: str):
+    return [v.strip() for v in valor.split(",") if v.strip()]
+
+def _filtro_de_args(args) -> FiltroEntrada:
+    linha_inicio = linha_fim = None
+    if args.linhas:
+        inicio, _, fim = args.linhas.partition("-")
+        linha_inicio = int(inicio) if inicio else None
+        linha_fim = int(fim) if fim else None
+    return FiltroEntrada(
+        tags=args.tags,
+        data_de=args.data_de,
+        data_ate=args.data_ate,
+        tipos_ordem=args.tipo_ordem,
+        linha_inicio=linha_inicio,
+        linha_fim=linha_fim,
+    )
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Automação de Ordens de Serviço - Neovero")
+    parser.add_argument("--arquivos", nargs="+", help="Planilhas de entrada (padrão: data/input/dados.xlsx)")
+    parser.add_argument("--abas", default="0", help="Abas a ler: 'todas', ou índices/nomes separados por vírgula (padrão: 0)")
+    parser.add_argument("--profile", action="store_true", help="Perfila a execução (event loop, Python e navegador) em data/logs")
+    parser.add_argument("--ida-volta", action="store_true", help="Conta as chamadas ao Playwright por ordem/passo (sobrepõe IDA_VOLTA_ATIVA)")
+    parser.add_argument("--metricas-porta", type=int, help="Expõe métricas em http://127.0.0.1:PORTA/metrics (sobrepõe METRICAS_PORTA)")
+    filtros = parser.add_argument_group("filtros de leitura")
+    filtros.add_argument("--tags", type=_parse_lista, help="Só estas TAGs (separadas por vírgula)")
+    filtros.add_argument("--data-de", type=_parse_data, help="Data Início mínima (DD/MM/AAAA)")
+    filtros.add_argument("--data-ate", type=_parse_data, help="Data Início máxima (DD/MM/AAAA)")
+    filtros.add_argument("--tipo-ordem", type=_parse_lista, help="Só estes tipos de ordem (separados por vírgula)")
+    filtros.add_argument("--linhas", help="Intervalo de linhas do arquivo, ex.: 10-200 (cabeçalho = linha 1)")
+    subcomandos = parser.add_subparsers(dest="comando")
+    subcomandos.add_parser("executar", help="Processa a planilha de entrada (padrão)")
+    subcomandos.add_parser("vigiar", help="Modo serviço: processa cada planilha depositada em data/input")
+    subcomandos.add_parser("daemon", help="Mantém um Chromium logado para execuções via CDP")
+    previsao = subcomandos.add_parser("previsao", help="Prevê a duração da planilha pelo histórico de tempos (sem navegador)")
+    previsao.add_argument("--meta-horas", type=float, help="Tempo-alvo: informa quantos workers são necessários para cumpri-lo")
+    previsao.add_argument("--workers", type=int, default=1, help="Sessões em paralelo consideradas na previsão (padrão: 1)")
+    indice = subcomandos.add_parser("indice", help="Importa uma exportação de equipamentos para o índice TAG → equipamento")
+    indice.add_argument("exportacao", help="Arquivo CSV, Parquet ou Excel com as colunas de TAG e id")
+    return parser
+
 if __name__ == "__main__":
+    args = criar_parser().parse_args()
+
     # Configura logger com rotação de arquivos
     logger.add(
         os.path.join(settings.LOGS_DIR, "execution.log"),
@@ -208,8 +475,27 @@ if __name__ == "__main__":
         level="DEBUG"
     )
     
+    if args.ida_volta:
+        settings.IDA_VOLTA_ATIVA = True
+    if args.metricas_porta is not None:
+        settings.METRICAS_PORTA = args.metricas_porta
+
     try:
-        asyncio.run(run_automation())
+        if args.comando == "daemon":
+            asyncio.run(executar_daemon())
+        elif args.comando == "indice":
+            indice = IndiceEquipamentos(settings.INDICE_EQUIPAMENTOS_PATH, settings.EQUIPAMENTO_URL_MODELO)
+            indice.importar_exportacao(args.exportacao, settings.INDICE_CAMPO_TAG, settings.INDICE_CAMPO_ID)
+            indice.salvar()
+        elif args.comando == "previsao":
+            executar_previsao(
+                arquivos=args.arquivos, abas=_parse_abas(args.abas), filtro=_filtro_de_args(args),
+                meta_horas=args.meta_horas, workers=args.workers,
+            )
+        elif args.comando == "vigiar":
+            asyncio.run(run_service())
+        else:
+            asyncio.run(run_automation(arquivos=args.arquivos, abas=_parse_abas(args.abas), filtro=_filtro_de_args(args), perfilar=args.profile))
     except KeyboardInterrupt:
         logger.warning("\n⚠️ Execução interrompida pelo usuário (Ctrl+C)")
         sys.exit(0)
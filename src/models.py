@@ -2,6 +2,15 @@ from datetime import date, time
 from typing import Optional, Union, Any
 from pydantic import BaseModel, Field, field_validator, ValidationInfo
 
+class Procedencia(BaseModel):
+    """Origem de uma ordem: arquivo, aba e linha (numeração do Excel) da planilha."""
+    arquivo: str
+    aba: str
+    linha: int
+
+    def __str__(self) -> str:
+        return f"{self.arquivo}[{self.aba}]:{self.linha}"
+
 class OrdemServico(BaseModel):
     """
     Representa uma Ordem de Serviço com validações e normalização de dados.
@@ -23,6 +32,8 @@ class OrdemServico(BaseModel):
     mao_de_obra_finalizada: bool
     tecnico: str
     servico_executado: str
+    # --- Origem (preenchida pelo loader) ---
+    procedencia: Optional[Procedencia] = None
     # --- Validadores ---
 
     @field_validator(
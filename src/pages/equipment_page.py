@@ -1,16 +1,28 @@
 import asyncio
 import os
+import time
+from typing import List, Optional
 from playwright.async_api import Page, Frame, Locator, expect
 from loguru import logger
-from src.core.exceptions import AutomacaoOSError
+from src.core.animations import CONDICAO_JANELAS_LIMPAS, CONDICAO_MENOS_JANELAS, estabilizar
+from src.core.exceptions import AutomacaoOSError, EventoTimeoutError
+from src.core.selector_registry import registro_seletores
+from src.core.events import SELETOR_GRID_HISTORICO, SELETOR_LINHAS_HISTORICO, EventBridge
 from src.config.settings import settings
 
+# Janela sem mudança na contagem de linhas para considerar o histórico completo
+HISTORICO_ESTAVEL_MS = 300
+
+
 class EquipmentPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, eventos: Optional[EventBridge] = None):
         self.page = page
+        self.eventos = eventos
         self.btn_abrir_os = '//*[@id="btnAbrirOS_text"]'
         self.btn_fechar = '//*[@id="btnFechar_text"]'
         self.texto_desativacao = "DESATIVAÇÃO-INTERNA"
+        # Se a última verificação de desativação varreu o grid de histórico completo
+        self.historico_completo = False
 
     async def _encontrar_elemento_em_frames(self, seletor: str, timeout: int = 5000) -> tuple[Frame, Locator] | None:
         """
@@ -22,7 +34,7 @@ class EquipmentPage:
         try:
             if await locator_main.count() > 0 and await locator_main.first.is_visible():
                 return self.page.main_frame, locator_main.first
-        except:
+        except Exception:
             pass
 
         # 2. Varre todos os iframes carregados
@@ -36,14 +48,76 @@ class EquipmentPage:
         
         return None
 
-    async def verificar_desativacao_existente(self) -> bool:
+    async def _contar_historico(self) -> tuple[int, int]:
+        """(grids de histórico, linhas nesses grids) somando todos os frames."""
+        grids = linhas = 0
+        for frame in self.page.frames:
+            try:
+                grids += await frame.locator(SELETOR_GRID_HISTORICO).count()
+                linhas += await frame.locator(SELETOR_LINHAS_HISTORICO).count()
+            except Exception:
+                continue
+        return grids, linhas
+
+    async def _aguardar_historico(self, timeout: int = 3000) -> bool:
+        """
+        Aguarda o grid de histórico da janela do equipamento renderizar e a contagem de
+        linhas ficar estável por HISTORICO_ESTAVEL_MS (o grid pode chegar em partes).
+        Com a ponte de eventos, o evento do grid abrevia a espera; sem ela, mantém a
+        espera fixa. Retorna True só se o grid existe e parou de crescer no prazo.
+        """
+        prazo = time.monotonic() + timeout / 1000
+        if not self.eventos:
+            await asyncio.sleep(timeout / 1000)
+        else:
+            historico = self.eventos.ultimo("historico_renderizado")
+            janela = self.eventos.ultimo("janela_aberta")
+            if not (historico and janela and historico.instante >= janela.instante):
+                try:
+                    await self.eventos.aguardar("historico_renderizado", timeout=timeout)
+                except EventoTimeoutError:
+                    logger.debug("Evento de histórico não recebido; conferindo o grid mesmo assim.")
+
+        # Pelo menos uma janela de estabilidade, mesmo com o prazo já consumido
+        estavel_s = HISTORICO_ESTAVEL_MS / 1000
+        prazo = max(prazo, time.monotonic() + estavel_s)
+        anterior = await self._contar_historico()
+        desde = time.monotonic()
+        while time.monotonic() < prazo:
+            await asyncio.sleep(min(0.1, estavel_s))
+            atual = await self._contar_historico()
+            if atual != anterior:
+                anterior, desde = atual, time.monotonic()
+            elif anterior[0] and time.monotonic() - desde >= estavel_s:
+                return True
+
+        logger.warning(f"⚠️ Grid de histórico não confirmado completo em {timeout}ms ({anterior[1]} linha(s))")
+        return False
+
+    async def _clicar_e_aguardar_fechamento(self, elemento: Locator):
+        """Clica e aguarda a janela fechar (evento) ou 1s fixo sem a ponte de eventos."""
+        if not self.eventos:
+            janelas = await self.page.evaluate("() => document.querySelectorAll('nv-window').length")
+            await elemento.click()
+            await estabilizar(self.page, 1, CONDICAO_MENOS_JANELAS, arg=janelas, timeout=1000)
+            return
+
+        try:
+            async with self.eventos.esperar("janela_fechada", timeout=1000):
+                await elemento.click()
+        except EventoTimeoutError:
+            pass
+
+    async def verificar_desativacao_existente(self) -> Optional[str]:
         """
         Verifica se existe QUALQUER registro de desativação no histórico do equipamento.
         REGRA DE NEGÓCIO ABSOLUTA: Não distingue status (Aberta/Fechada).
         Se encontrar "DESATIV", considera duplicidade imediatamente.
+        Retorna o texto da linha encontrada (evidência) ou None; `historico_completo`
+        indica se o None vale como negativo (grid presente e estável antes da varredura).
         """
         logger.info("🔍 Verificando histórico de Ordens (regra absoluta: qualquer DESATIVAÇÃO = duplicidade)...")
-        await asyncio.sleep(3)
+        self.historico_completo = await self._aguardar_historico()
         
         total_linhas_analisadas = 0
         total_frames_verificados = 0
@@ -83,13 +157,13 @@ class EquipmentPage:
                                     is_visible = await linha.is_visible(timeout=500)
                                     if not is_visible:
                                         continue
-                                except:
+                                except Exception:
                                     continue
                                 
                                 # Extrai texto cru
                                 try:
                                     texto_linha = await linha.inner_text(timeout=500)
-                                except:
+                                except Exception:
                                     continue
                                 
                                 # LOG DEBUG obrigatório
@@ -104,7 +178,7 @@ class EquipmentPage:
                                     logger.warning(f"   Texto: '{texto_linha.strip()}'")
                                     logger.warning(f"   Frame: {frame.name or frame.url[:100]}")
                                     logger.warning("❌ DUPLICIDADE DETECTADA (regra absoluta)")
-                                    return True
+                                    return texto_linha.strip()
                             
                             except Exception as e_linha:
                                 # Tolerância a falhas
@@ -122,7 +196,19 @@ class EquipmentPage:
         # Se chegou aqui, não encontrou nenhuma desativação
         logger.info(f"📊 Varredura completa: {total_linhas_analisadas} linha(s) analisadas em {total_frames_verificados} frame(s)")
         logger.success("✅ Nenhum registro de desativação encontrado. Pode prosseguir.")
-        return False
+        return None
+
+    async def ler_historico(self) -> List[str]:
+        """Textos das linhas do histórico do equipamento (uma leitura por frame)."""
+        await self._aguardar_historico()
+        linhas = []
+        for frame in self.page.frames:
+            try:
+                linhas.extend(t.strip() for t in await frame.locator("tr").all_inner_texts() if t.strip())
+            except Exception as e:
+                logger.debug(f"Histórico não lido no frame {frame.name or frame.url[:100]}: {e}")
+        logger.debug(f"📋 Histórico: {len(linhas)} linha(s)")
+        return linhas
 
     async def clicar_abrir_os(self):
         """
@@ -142,10 +228,10 @@ class EquipmentPage:
             return
         
         # LOCALIZA E CLICA NO BOTÃO
-        resultado = await self._encontrar_elemento_em_frames(self.btn_abrir_os)
-        
-        if not resultado:
-            resultado = await self._encontrar_elemento_em_frames("text=Abrir OS")
+        # (candidatos na ordem de sucesso histórico, começando pelo frame onde costumam casar)
+        resultado = await registro_seletores.localizar(
+            "abrir_os", [self.btn_abrir_os, "text=Abrir OS"], [self.page] + self.page.frames
+        )
 
         if resultado:
             _, locator = resultado
@@ -156,42 +242,61 @@ class EquipmentPage:
                 logger.warning("⚠️ Botão 'Abrir OS' está desabilitado!")
                 raise AutomacaoOSError("Botão Abrir OS desabilitado")
             
-            await locator.click()
-            logger.info("✅ Botão Abrir OS clicado.")
-            
             # === VERIFICAÇÃO ROBUSTA: Aguarda formulário aparecer em qualquer frame ===
             logger.info("⏳ Aguardando janela de OS carregar (timeout: 10s)...")
             
-            janela_carregada = False
-            tempo_inicio = asyncio.get_event_loop().time()
-            timeout_segundos = 10
-            
-            # Loop de retentativa com verificação em frames
-            while (asyncio.get_event_loop().time() - tempo_inicio) < timeout_segundos:
-                # Busca o elemento em todos os frames usando o helper
-                resultado_formulario = await self._encontrar_elemento_em_frames(
-                    input_data_abertura,
-                    timeout=500  # 500ms por tentativa
-                )
-                
-                if resultado_formulario:
-                    frame_encontrado, _ = resultado_formulario
-                    logger.success(f"✅ Janela de OS aberta com sucesso! (Frame: {frame_encontrado.name or 'main'})")
-                    janela_carregada = True
-                    break
-                
-                # Pequena pausa antes de tentar novamente
-                await asyncio.sleep(0.5)
-            
-            # Valida se conseguiu carregar
-            if not janela_carregada:
-                logger.error("❌ Janela de OS não abriu após 10s de espera!")
-                raise AutomacaoOSError("Timeout: Janela de OS não carregou em nenhum frame")
+            if self.eventos:
+                await self._clicar_e_aguardar_formulario(locator)
+            else:
+                await locator.click()
+                logger.info("✅ Botão Abrir OS clicado.")
+                await self._aguardar_formulario_polling(input_data_abertura)
                 
         else:
             logger.error("❌ Botão Abrir OS não encontrado.")
             raise AutomacaoOSError("Falha ao localizar botão Abrir OS.")
 
+    async def _clicar_e_aguardar_formulario(self, locator: Locator, timeout: int = 10000):
+        """Clica em 'Abrir OS' com a espera do evento 'form_os_pronto' já armada."""
+        try:
+            async with self.eventos.esperar("form_os_pronto", timeout=timeout) as espera:
+                await locator.click()
+                logger.info("✅ Botão Abrir OS clicado.")
+        except EventoTimeoutError:
+            logger.error("❌ Janela de OS não abriu após 10s de espera!")
+            raise AutomacaoOSError("Timeout: Janela de OS não carregou em nenhum frame")
+
+        frame_encontrado = espera.evento.frame
+        nome_frame = getattr(frame_encontrado, "name", "") or "main"
+        logger.success(f"✅ Janela de OS aberta com sucesso! (Frame: {nome_frame})")
+
+    async def _aguardar_formulario_polling(self, input_data_abertura: str, timeout_segundos: int = 10):
+        """Fallback sem ponte de eventos: verifica o formulário em todos os frames a cada 500ms."""
+        janela_carregada = False
+        tempo_inicio = asyncio.get_event_loop().time()
+
+        # Loop de retentativa com verificação em frames
+        while (asyncio.get_event_loop().time() - tempo_inicio) < timeout_segundos:
+            # Busca o elemento em todos os frames usando o helper
+            resultado_formulario = await self._encontrar_elemento_em_frames(
+                input_data_abertura,
+                timeout=500  # 500ms por tentativa
+            )
+
+            if resultado_formulario:
+                frame_encontrado, _ = resultado_formulario
+                logger.success(f"✅ Janela de OS aberta com sucesso! (Frame: {frame_encontrado.name or 'main'})")
+                janela_carregada = True
+                break
+
+            # Pequena pausa antes de tentar novamente
+            await asyncio.sleep(0.5)
+
+        # Valida se conseguiu carregar
+        if not janela_carregada:
+            logger.error("❌ Janela de OS não abriu após 10s de espera!")
+            raise AutomacaoOSError("Timeout: Janela de OS não carregou em nenhum frame")
+
     async def fechar_janela(self):
         """
         Fecha explicitamente janelas/modais abertas.
@@ -218,46 +323,49 @@ class EquipmentPage:
         
         logger.debug("🔍 Tentando localizar botões nativos de fechar...")
         
-        for seletor in seletores_fechar_nativos:
-            try:
-                # Procura em todos os frames (página principal + iframes)
-                frames_para_verificar = [self.page] + self.page.frames
+        for seletor in registro_seletores.ordenar("fechar_janela", seletores_fechar_nativos):
+            with registro_seletores.sonda("fechar_janela", seletor) as sonda:
+                try:
+                    # Procura em todos os frames (página principal + iframes), começando pelo do último acerto
+                    frames_para_verificar = registro_seletores.ordenar_frames(
+                        "fechar_janela", seletor, [self.page] + self.page.frames
+                    )
                 
-                for frame in frames_para_verificar:
-                    try:
-                        locator = frame.locator(seletor)
-                        count = await locator.count()
+                    for frame in frames_para_verificar:
+                        try:
+                            locator = frame.locator(seletor)
+                            count = await locator.count()
                         
-                        if count > 0:
-                            # Tenta clicar em cada ocorrência visível
-                            for i in range(count):
-                                elemento = locator.nth(i)
+                            if count > 0:
+                                # Tenta clicar em cada ocorrência visível
+                                for i in range(count):
+                                    elemento = locator.nth(i)
                                 
-                                try:
-                                    if await elemento.is_visible():
-                                        logger.info(f"✅ Clicando em botão nativo: {seletor} (ocorrência {i+1})")
-                                        await elemento.click()
-                                        await asyncio.sleep(1)
-                                        janela_fechada = True
+                                    try:
+                                        if await elemento.is_visible():
+                                            sonda.acerto(frame)
+                                            logger.info(f"✅ Clicando em botão nativo: {seletor} (ocorrência {i+1})")
+                                            await self._clicar_e_aguardar_fechamento(elemento)
+                                            janela_fechada = True
                                         
-                                        # Verifica se realmente fechou
-                                        # (checa se o formulário de OS desapareceu)
-                                        if await self.page.locator('//*[@id="txtdataabertura"]').count() == 0:
-                                            logger.success("✅ Janela fechada com sucesso via botão nativo!")
-                                            return
-                                except:
-                                    continue
-                    except:
-                        continue
+                                            # Verifica se realmente fechou
+                                            # (checa se o formulário de OS desapareceu)
+                                            if await self.page.locator('//*[@id="txtdataabertura"]').count() == 0:
+                                                logger.success("✅ Janela fechada com sucesso via botão nativo!")
+                                                return
+                                    except Exception:
+                                        continue
+                        except Exception:
+                            continue
                         
-            except Exception as e:
-                logger.debug(f"Seletor {seletor} não encontrado: {e}")
-                continue
+                except Exception as e:
+                    logger.debug(f"Seletor {seletor} não encontrado: {e}")
+                    continue
         
         # Se chegou aqui e janela_fechada é True mas ainda detecta modal, continua
         if janela_fechada:
             logger.info("⚠️ Botão foi clicado mas modal ainda pode estar presente. Verificando...")
-            await asyncio.sleep(1)
+            await estabilizar(self.page, 1, CONDICAO_JANELAS_LIMPAS, timeout=1000)
         
         # === ESTRATÉGIA 2: VERIFICAR SE AINDA HÁ JANELAS ABERTAS ===
         janelas_ainda_abertas = False
@@ -270,7 +378,7 @@ class EquipmentPage:
             if num_janelas > 1:
                 janelas_ainda_abertas = True
                 logger.warning(f"⚠️ Ainda há {num_janelas} janelas nv-window abertas!")
-        except:
+        except Exception:
             pass
         
         # === ESTRATÉGIA 3: JAVASCRIPT FALLBACK (ÚLTIMO RECURSO) ===
@@ -298,7 +406,7 @@ class EquipmentPage:
                 
                 if resultado > 0:
                     logger.success(f"✅ {resultado} janela(s) removida(s) via JavaScript (fallback)")
-                    await asyncio.sleep(1)
+                    await estabilizar(self.page, 1, CONDICAO_JANELAS_LIMPAS)
                 else:
                     logger.info("ℹ️ Nenhuma janela adicional detectada para remover")
                     
@@ -315,5 +423,5 @@ class EquipmentPage:
                 logger.success(f"✅ Estado limpo confirmado ({num_janelas_final} janela(s) restante(s))")
             else:
                 logger.warning(f"⚠️ Ainda há {num_janelas_final} janelas abertas após limpeza!")
-        except:
+        except Exception:
             pass
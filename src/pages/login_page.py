@@ -1,6 +1,8 @@
+from typing import Optional
 from playwright.async_api import Page
 from loguru import logger
 from src.config.settings import settings
+from src.core.credentials import Credencial
 
 class LoginPage:
     def __init__(self, page: Page):
@@ -8,24 +10,27 @@ class LoginPage:
         self.input_usuario = '//*[@id="login"]'
         self.input_senha = '//*[@id="senha"]'
         self.btn_entrar = '//*[@id="formusuario"]/div[3]'
+        # Busca de equipamentos do menu lateral: só existe com sessão ativa
+        self.indicador_sessao = '//*[@id="side-menu"]/div[2]/nv-atalhos/div/div[2]/form/input'
 
     async def navegar(self):
         """Acessa a URL inicial"""
         logger.info(f"Acessando: {settings.NEOVERO_URL}")
         await self.page.goto(settings.NEOVERO_URL)
 
-    async def realizar_login(self):
-        """Executa o fluxo de login completo"""
-        logger.info("Preenchendo credenciais...")
+    async def realizar_login(self, credencial: Optional[Credencial] = None):
+        """Executa o fluxo de login completo (padrão: NEOVERO_USER/NEOVERO_PASS)"""
+        credencial = credencial or Credencial(settings.NEOVERO_USER, settings.NEOVERO_PASS)
+        logger.info(f"Preenchendo credenciais ({credencial})...")
         
         # 1. Espera o campo de usuário aparecer 
         await self.page.wait_for_selector(self.input_usuario, state="visible")
         
         # 2. Preenche Usuário
-        await self.page.fill(self.input_usuario, settings.NEOVERO_USER)
+        await self.page.fill(self.input_usuario, credencial.usuario)
         
         # 3. Preenche Senha
-        await self.page.fill(self.input_senha, settings.NEOVERO_PASS)
+        await self.page.fill(self.input_senha, credencial.senha)
         
         # 4. Clica em Entrar e espera a navegação acontecer
         logger.info("Clicando em Entrar...")
@@ -40,3 +45,17 @@ class LoginPage:
         except Exception:
             logger.warning("Navegação não detectada ou timeout. Verifique se o login foi bem sucedido.")
 
+    async def confirmar_login(self, timeout: int = 15000) -> bool:
+        """Aguarda o menu da sessão logada aparecer (False = login recusado ou sem resposta)."""
+        try:
+            await self.page.wait_for_selector(self.indicador_sessao, state="attached", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def esta_autenticado(self) -> bool:
+        """Verifica se a página já está numa sessão logada (ex.: sessão aquecida do daemon)."""
+        try:
+            return await self.page.locator(self.indicador_sessao).count() > 0
+        except Exception:
+            return False
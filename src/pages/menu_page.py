@@ -1,18 +1,81 @@
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urldefrag
 from playwright.async_api import Page, expect
 from loguru import logger
-from src.core.exceptions import AutomacaoOSError
+from src.core.animations import CONDICAO_JANELA_EQUIPAMENTO
+from src.core.exceptions import AutomacaoOSError, EventoTimeoutError
+from src.core.events import EventBridge
+from src.config.settings import settings
+from src.services.equipment_index import itens_da_resposta
+
+if TYPE_CHECKING:
+    from src.services.equipment_index import IndiceEquipamentos
 
 class MenuPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, eventos: Optional[EventBridge] = None, indice: Optional["IndiceEquipamentos"] = None):
         self.page = page
+        self.eventos = eventos
+        # Índice TAG → equipamento: abre a janela direto, sem passar pela busca
+        self.indice = indice
         self.input_busca_equipamento = '//*[@id="side-menu"]/div[2]/nv-atalhos/div/div[2]/form/input'
 
-    async def buscar_ativo(self, tag: str):
+    async def buscar_ativo(self, tag: str) -> bool:
+        """
+        Abre o equipamento pela TAG: direto pelo índice quando a TAG é conhecida,
+        senão pela busca da barra lateral.
+        Retorna True quando a janela do equipamento já foi confirmada (acesso direto).
+        """
+        if self.indice is not None and await self._abrir_pelo_indice(tag):
+            return True
+        await self._buscar_pela_barra_lateral(tag)
+        return False
+
+    async def _navegar(self, url: str):
+        """Mesma página com outra rota (#...): troca só o hash, sem recarregar o SPA."""
+        atual, _ = urldefrag(self.page.url)
+        destino, fragmento = urldefrag(url)
+        if fragmento and atual == destino:
+            await self.page.evaluate("h => { window.location.hash = h; }", fragmento)
+        else:
+            await self.page.goto(url)
+
+    async def _abrir_pelo_indice(self, tag: str) -> bool:
+        url = self.indice.url(tag)
+        if not url:
+            return False
+
+        logger.info(f"📇 Abrindo equipamento {tag} direto pelo índice...")
+        try:
+            if self.eventos:
+                async with self.eventos.esperar("janela_aberta", timeout=5000):
+                    await self._navegar(url)
+            else:
+                await self._navegar(url)
+                await self.page.wait_for_function(CONDICAO_JANELA_EQUIPAMENTO, timeout=5000, polling=100)
+            return True
+        except Exception as e:
+            # Link desatualizado: sai do índice e volta a ser aprendido pela busca
+            logger.warning(f"⚠️ Link direto de {tag} não abriu o equipamento ({e}). Usando a busca.")
+            self.indice.esquecer(tag)
+            return False
+
+    async def _buscar_pela_barra_lateral(self, tag: str):
         """
         Busca um equipamento pela TAG usando a barra lateral.
         """
         logger.info(f"🔍 Buscando ativo: {tag}...")
 
+        # Respostas da busca alimentam o índice (TAG → id do equipamento)
+        respostas = []
+
+        def _coletar(resposta):
+            if settings.INDICE_URL_RESPOSTA and settings.INDICE_URL_RESPOSTA in resposta.url:
+                respostas.append(resposta)
+
+        if self.indice is not None:
+            self.page.on("response", _coletar)
+
+        janela_abriu = None
         try:
             # 1. Garante que o menu está visível e o input existe
             locator_busca = self.page.locator(self.input_busca_equipamento)
@@ -27,14 +90,22 @@ class MenuPage:
             await locator_busca.fill("") 
             await locator_busca.fill(tag)
 
-            # 3. Pressiona ENTER para iniciar a busca
-            await locator_busca.press("Enter")
-            
-            # 4. Aguarda feedback da aplicação
-            try:
-                await self.page.wait_for_load_state("networkidle", timeout=5000)
-            except Exception:
-                pass 
+            # 3. Pressiona ENTER e 4. aguarda feedback da aplicação
+            if self.eventos:
+                # Janela do equipamento abrindo = busca respondida
+                try:
+                    async with self.eventos.esperar("janela_aberta", timeout=5000):
+                        await locator_busca.press("Enter")
+                    janela_abriu = True
+                except EventoTimeoutError:
+                    logger.debug("Janela do equipamento não sinalizada em 5s.")
+                    janela_abriu = False
+            else:
+                await locator_busca.press("Enter")
+                try:
+                    await self.page.wait_for_load_state("networkidle", timeout=5000)
+                except Exception:
+                    pass 
 
             logger.debug(f"Busca por {tag} disparada com sucesso.")
 
@@ -42,3 +113,41 @@ class MenuPage:
             logger.error(f"❌ Erro ao buscar a tag {tag} no menu: {e}")
             # Repassa o erro para o controlador principal tomar decisão (abortar OS ou tentar de novo)
             raise e
+        finally:
+            if self.indice is not None:
+                self.page.remove_listener("response", _coletar)
+
+        if self.indice is not None:
+            await self._aprender(tag, respostas, janela_abriu)
+
+    async def _aprender(self, tag: str, respostas: list, janela_abriu: Optional[bool]):
+        """
+        Alimenta o índice com as respostas da busca. A TAG só vira inexistente com uma
+        resposta explícita sem itens, ou depois de INDICE_FALHAS_INEXISTENTE buscas
+        seguidas sem janela (um timeout isolado só é contado).
+        """
+        vazia = False
+        for resposta in respostas:
+            try:
+                dados = await resposta.json()
+                vazia = vazia or itens_da_resposta(
+                    dados, settings.INDICE_CAMINHO_ITENS, settings.INDICE_CAMPO_TAG, settings.INDICE_CAMPO_ID
+                ) == []
+                self.indice.aprender(dados, settings.INDICE_CAMPO_TAG, settings.INDICE_CAMPO_ID, settings.INDICE_CAMINHO_ITENS)
+            except Exception as e:
+                logger.debug(f"Resposta da busca não aproveitada no índice ({resposta.url[:80]}): {e}")
+
+        if tag in self.indice:
+            logger.debug(f"📇 TAG {tag} adicionada ao índice de equipamentos")
+        elif janela_abriu is True:
+            return
+        elif vazia:
+            logger.warning(f"⚠️ TAG {tag} não encontrada pela busca (marcada no índice)")
+            self.indice.marcar_inexistente(tag)
+        elif janela_abriu is False:
+            falhas = self.indice.registrar_falha(tag)
+            if falhas >= settings.INDICE_FALHAS_INEXISTENTE:
+                logger.warning(f"⚠️ TAG {tag} sem resultado em {falhas} buscas seguidas (marcada no índice)")
+                self.indice.marcar_inexistente(tag)
+            else:
+                logger.debug(f"Busca por {tag} sem resposta conclusiva ({falhas}/{settings.INDICE_FALHAS_INEXISTENTE})")
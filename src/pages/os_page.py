@@ -1,14 +1,34 @@
 import asyncio
 import os
-from playwright.async_api import Page, Frame, expect, TimeoutError as PlaywrightTimeoutError
+import re
+from typing import Callable, Optional
+from playwright.async_api import Page, Frame, expect
 from loguru import logger
-from src.core.exceptions import AutomacaoOSError
+from src.core.animations import CONDICAO_FORM_OS_FECHADO, CONDICAO_JANELAS_LIMPAS, CONDICAO_SEM_FOCO, estabilizar
+from src.core.exceptions import AutomacaoOSError, EventoTimeoutError
+from src.core.selector_registry import registro_seletores
+from src.core.events import EventBridge
 from src.config.settings import settings
 from src.models import OrdemServico
 
+# Retornos do salvamento da OS (a mensagem é a do Neovero; avisos de outras telas não casam)
+_RETORNO_SALVAR = re.compile(r"salv|grav|registr", re.I)
+_RETORNO_ERRO = re.compile(r"erro|falha|inv[aá]lid|obrigat|n[aã]o foi poss[ií]vel", re.I)
+_RETORNO_SUCESSO = re.compile(r"sucesso", re.I)
+
+
+def _classificar_retorno_salvar(texto: str) -> Optional[str]:
+    """'erro' | 'salvo' para mensagens do salvamento da OS; None para qualquer outra."""
+    if not _RETORNO_SALVAR.search(texto):
+        return None
+    if _RETORNO_ERRO.search(texto):
+        return "erro"
+    return "salvo" if _RETORNO_SUCESSO.search(texto) else None
+
 class OsPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, eventos: Optional[EventBridge] = None):
         self.page = page
+        self.eventos = eventos
         
         # --- SELETORES (Mapeados) ---
         self.input_data_inicio = '//*[@id="txtdataabertura"]'
@@ -41,7 +61,7 @@ class OsPage:
         try:
             if await self.page.locator(self.input_data_inicio).count() > 0:
                  return self.page
-        except:
+        except Exception:
             pass
 
         for frame in self.page.frames:
@@ -49,7 +69,7 @@ class OsPage:
                 if await frame.locator(self.input_data_inicio).count() > 0:
                     logger.debug(f"Formulário OS encontrado no frame: {frame.name or frame.url}")
                     return frame
-            except:
+            except Exception:
                 continue
         return self.page
 
@@ -86,33 +106,12 @@ class OsPage:
                 # Tenta selecionar pelo valor original como fallback
                 try:
                     await locator_select.select_option(label=texto_excel)
-                except:
+                except Exception:
                     pass
 
         except Exception as e:
             logger.error(f"Erro no dropdown {seletor} (Valor: {texto_excel}): {e}")
 
-    async def _aguardar_fechamento_modal(self, timeout: int = 15000) -> bool:
-        """
-        Aguarda a modal/iframe da OS desaparecer após o salvamento.
-        Retorna True se fechou, False se timeout.
-        """
-        logger.info("⏳ Aguardando fechamento automático da janela OS...")
-        
-        try:
-            # Estratégia 1: Espera o formulário desaparecer
-            await self.page.wait_for_selector(
-                self.input_data_inicio, 
-                state="hidden", 
-                timeout=timeout
-            )
-            logger.success("✅ Janela OS fechada automaticamente!")
-            return True
-            
-        except PlaywrightTimeoutError:
-            logger.warning("⚠️ Janela não fechou automaticamente no tempo esperado.")
-            return False
-
     async def _fechar_modal_forcado(self) -> bool:
         """
         Tenta fechar a modal/janela de OS manualmente clicando no botão X.
@@ -129,25 +128,27 @@ class OsPage:
             "//*[contains(@class, 'nv-window')]//a[contains(@class, 'close')]"
         ]
         
-        for seletor in seletores_fechar:
-            try:
-                # Procura em todos os frames
-                for frame in [self.page] + self.page.frames:
-                    locator = frame.locator(seletor)
-                    if await locator.count() > 0:
-                        elemento = locator.first
-                        if await elemento.is_visible():
-                            await elemento.click()
-                            logger.info(f"✅ Clicado botão fechar: {seletor}")
-                            await asyncio.sleep(1)
+        for seletor in registro_seletores.ordenar("fechar_modal_os", seletores_fechar):
+            with registro_seletores.sonda("fechar_modal_os", seletor) as sonda:
+                try:
+                    # Procura em todos os frames, começando pelo do último acerto
+                    for frame in registro_seletores.ordenar_frames("fechar_modal_os", seletor, [self.page] + self.page.frames):
+                        locator = frame.locator(seletor)
+                        if await locator.count() > 0:
+                            elemento = locator.first
+                            if await elemento.is_visible():
+                                sonda.acerto(frame)
+                                await elemento.click()
+                                logger.info(f"✅ Clicado botão fechar: {seletor}")
+                                await estabilizar(self.page, 1, CONDICAO_FORM_OS_FECHADO)
                             
-                            # Verifica se realmente fechou
-                            if await self.page.locator(self.input_data_inicio).count() == 0:
-                                logger.success("✅ Janela fechada com sucesso!")
-                                return True
-            except Exception as e:
-                logger.debug(f"Seletor {seletor} falhou: {e}")
-                continue
+                                # Verifica se realmente fechou
+                                if await self.page.locator(self.input_data_inicio).count() == 0:
+                                    logger.success("✅ Janela fechada com sucesso!")
+                                    return True
+                except Exception as e:
+                    logger.debug(f"Seletor {seletor} falhou: {e}")
+                    continue
         
         logger.error("❌ Não conseguiu fechar a janela manualmente!")
         return False
@@ -182,7 +183,7 @@ class OsPage:
                             });
                         }
                     """)
-                    await asyncio.sleep(1)
+                    await estabilizar(self.page, 1, CONDICAO_JANELAS_LIMPAS)
                     logger.info("✅ Janelas flutuantes removidas via JavaScript")
                 except Exception as e:
                     logger.error(f"❌ Falha ao remover janelas: {e}")
@@ -197,7 +198,7 @@ class OsPage:
         logger.info("🎯 Clicando em área neutra (1,1) para sanitização de foco...")
         try:
             await self.page.mouse.click(1, 1)
-            await asyncio.sleep(0.5)
+            await estabilizar(self.page, 0.5, CONDICAO_SEM_FOCO)
             logger.success("✅ Foco sanitizado com sucesso")
         except Exception as e:
             logger.warning(f"⚠️ Erro ao clicar em área neutra: {e}")
@@ -225,31 +226,33 @@ class OsPage:
         # Tenta em todos os frames (página + iframes)
         frames_para_verificar = [self.page] + self.page.frames
         
-        for seletor in seletores_fechar:
+        for seletor in registro_seletores.ordenar("fechar_janela_os", seletores_fechar):
             if janela_fechada:
                 break
                 
-            for frame in frames_para_verificar:
-                try:
-                    locator = frame.locator(seletor)
-                    count = await locator.count()
+            with registro_seletores.sonda("fechar_janela_os", seletor) as sonda:
+                for frame in registro_seletores.ordenar_frames("fechar_janela_os", seletor, frames_para_verificar):
+                    try:
+                        locator = frame.locator(seletor)
+                        count = await locator.count()
                     
-                    if count > 0:
-                        # Procura por elemento visível
-                        for i in range(count):
-                            elemento = locator.nth(i)
+                        if count > 0:
+                            # Procura por elemento visível
+                            for i in range(count):
+                                elemento = locator.nth(i)
                             
-                            try:
-                                if await elemento.is_visible(timeout=1000):
-                                    logger.info(f"✅ Botão fechar encontrado: {seletor}")
-                                    await elemento.click()
-                                    janela_fechada = True
-                                    logger.success("✅ Janela de OS fechada manualmente")
-                                    return
-                            except:
-                                continue
-                except:
-                    continue
+                                try:
+                                    if await elemento.is_visible(timeout=1000):
+                                        sonda.acerto(frame)
+                                        logger.info(f"✅ Botão fechar encontrado: {seletor}")
+                                        await elemento.click()
+                                        janela_fechada = True
+                                        logger.success("✅ Janela de OS fechada manualmente")
+                                        return
+                                except Exception:
+                                    continue
+                    except Exception:
+                        continue
         
         if not janela_fechada:
             logger.warning("⚠️ Botão fechar não encontrado! Tentando fallback JavaScript...")
@@ -268,8 +271,44 @@ class OsPage:
                 logger.error(f"❌ Falha ao fechar janela: {e}")
                 raise AutomacaoOSError("Não foi possível fechar a janela de OS")
 
-    async def preencher_nova_os(self, os_data: OrdemServico):
-        """Executa o preenchimento completo da OS com sequência rigorosa de encerramento."""
+    async def _salvar_e_aguardar_processamento(self, btn_salvar, timeout: int = 5000):
+        """
+        Clica em Salvar e aguarda o processamento.
+        Com a ponte de eventos, só a confirmação ou o erro do salvamento da OS encerram
+        a espera antes dos 5s (outras mensagens na tela são ignoradas); um erro de
+        salvamento interrompe a OS. Sem mensagem reconhecida, vale a espera limitada.
+        """
+        if not self.eventos:
+            await btn_salvar.click()
+            logger.success("✅ Botão Salvar clicado!")
+            logger.info("⏳ [2/5] WAIT: Aguardando processamento do sistema (5 segundos)...")
+            await asyncio.sleep(timeout / 1000)
+            logger.success("✅ Processamento concluído")
+            return
+
+        logger.info("⏳ [2/5] WAIT: Aguardando retorno do sistema (até 5 segundos)...")
+        try:
+            async with self.eventos.esperar(
+                "mensagem_exibida", timeout=timeout,
+                predicado=lambda e: _classificar_retorno_salvar(e.dados.get("texto", "")) is not None,
+            ) as espera:
+                await btn_salvar.click()
+                logger.success("✅ Botão Salvar clicado!")
+        except EventoTimeoutError:
+            logger.success("✅ Processamento concluído (sem mensagem de salvamento)")
+            return
+
+        texto = espera.evento.dados.get("texto", "")
+        if _classificar_retorno_salvar(texto) == "erro":
+            logger.error(f"❌ Neovero retornou erro ao salvar: '{texto}'")
+            raise AutomacaoOSError(f"Erro do sistema ao salvar: {texto}")
+        logger.success(f"✅ Processamento concluído: '{texto}'")
+
+    async def preencher_nova_os(self, os_data: OrdemServico, ao_clicar_salvar: Optional[Callable[[], None]] = None):
+        """
+        Executa o preenchimento completo da OS com sequência rigorosa de encerramento.
+        `ao_clicar_salvar` é chamado logo antes do clique em Salvar (diário de ordens).
+        """
         logger.info(f"📝 Preenchendo OS: {os_data.tag} | Padrão: {os_data.padrao}")
         
         # 1. Localizar Frame
@@ -349,22 +388,18 @@ class OsPage:
                 logger.warning("⚠️ Botão salvar está desabilitado!")
                 raise AutomacaoOSError("Botão salvar desabilitado")
             
-            # Clique
-            await btn_salvar.click()
-            logger.success("✅ Botão Salvar clicado!")
-            
-            # === WAIT 1: PROCESSAMENTO ===
-            logger.info("⏳ [2/5] WAIT: Aguardando processamento do sistema (5 segundos)...")
-            await asyncio.sleep(5)
-            logger.success("✅ Processamento concluído")
+            # Clique + WAIT 1: PROCESSAMENTO
+            if ao_clicar_salvar:
+                ao_clicar_salvar()
+            await self._salvar_e_aguardar_processamento(btn_salvar)
             
             # === AÇÃO 2: FECHAR JANELA ===
             logger.info("🔧 [3/5] AÇÃO 2: Fechando janela de OS manualmente...")
             await self._fechar_janela_os_manualmente()
             
             # === WAIT 2: ESTABILIZAÇÃO ===
-            logger.info("⏳ [4/5] WAIT: Aguardando estabilização da animação (3 segundos)...")
-            await asyncio.sleep(3)
+            logger.info("⏳ [4/5] WAIT: Aguardando estabilização da animação (3 segundos ou formulário fechado)...")
+            await estabilizar(self.page, 3, CONDICAO_FORM_OS_FECHADO)
             logger.success("✅ Janela estabilizada")
             
             # === AÇÃO 3: SANITIZAÇÃO DE FOCO ===
@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from loguru import logger
+
+# Suavização das médias móveis exponenciais (latência por passo e taxa de erro)
+ALFA_LATENCIA = 0.3
+ALFA_ERRO = 0.2
+
+# Quantas observações recentes definem a latência de referência de cada passo
+JANELA_REFERENCIA = 50
+
+
+class TokenBucket:
+    """Limite de requisições/segundo com rajada (`capacidade`). `taxa` <= 0 desliga o limite."""
+
+    def __init__(self, taxa: float, capacidade: int = 1):
+        self.taxa = taxa
+        self.capacidade = max(capacidade, 1)
+        self._tokens = float(self.capacidade)
+        self._atualizado = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    async def adquirir(self):
+        if self.taxa <= 0:
+            return
+        # O lock mantém a fila justa (ordem de chegada) entre as abas
+        async with self._lock:
+            self._repor()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.taxa)
+                self._repor()
+            self._tokens -= 1
+
+
+class ControleAdmissao:
+    """
+    Controle de admissão global na frente dos passos críticos (busca, Abrir OS, salvar).
+
+    Cada passo consome um token do `TokenBucket` e ocupa uma vaga de concorrência.
+    O número de vagas segue AIMD: cai multiplicativamente (`fator_reducao`) quando a
+    latência média de um passo passa de `tolerancia_latencia` × a sua referência
+    (menor latência recente) ou quando a taxa de erro passa de `taxa_erro_max`; sobe
+    uma vaga a cada `limite` passos saudáveis. Após uma redução, espera `limite`
+    observações antes de reduzir de novo.
+    """
+
+    def __init__(
+        self,
+        taxa_rps: float = 2.0,
+        rajada: int = 4,
+        limite_inicial: int = 2,
+        limite_min: int = 1,
+        limite_max: int = 4,
+        tolerancia_latencia: float = 2.0,
+        taxa_erro_max: float = 0.2,
+        fator_reducao: float = 0.5,
+    ):
+        self.bucket = TokenBucket(taxa_rps, rajada)
+        self.limite_min = limite_min
+        self.limite_max = max(limite_max, limite_min)
+        self.limite = min(max(limite_inicial, limite_min), self.limite_max)
+        self.tolerancia_latencia = tolerancia_latencia
+        self.taxa_erro_max = taxa_erro_max
+        self.fator_reducao = fator_reducao
+
+        self.em_uso = 0
+        self.taxa_erro = 0.0
+        self.latencia_media: Dict[str, float] = {}
+        self._recentes: Dict[str, deque] = {}
+        self._saudaveis = 0
+        self._desde_reducao = math.inf
+        self._condicao = asyncio.Condition()
+
+    @classmethod
+    def de_settings(cls) -> "ControleAdmissao":
+        from src.config.settings import settings
+        return cls(
+            taxa_rps=settings.ADMISSAO_RPS,
+            rajada=settings.ADMISSAO_RAJADA,
+            limite_inicial=settings.ADMISSAO_LIMITE_MAX,
+            limite_min=settings.ADMISSAO_LIMITE_MIN,
+            limite_max=settings.ADMISSAO_LIMITE_MAX,
+            tolerancia_latencia=settings.ADMISSAO_TOLERANCIA_LATENCIA,
+            taxa_erro_max=settings.ADMISSAO_TAXA_ERRO_MAX,
+        )
+
+    def referencia(self, passo: str) -> Optional[float]:
+        recentes = self._recentes.get(passo)
+        return min(recentes) if recentes else None
+
+    @asynccontextmanager
+    async def slot(self, passo: str):
+        """Aguarda token e vaga, executa o passo e alimenta o AIMD com latência e resultado."""
+        await self.bucket.adquirir()
+        async with self._condicao:
+            await self._condicao.wait_for(lambda: self.em_uso < self.limite)
+            self.em_uso += 1
+
+        inicio = time.monotonic()
+        erro = False
+        try:
+            yield
+        except Exception:
+            erro = True
+            raise
+        finally:
+            self.observar(passo, time.monotonic() - inicio, erro)
+            async with self._condicao:
+                self.em_uso -= 1
+                self._condicao.notify_all()
+
+    def observar(self, passo: str, latencia: float, erro: bool = False):
+        """Registra uma observação e ajusta o limite (aumento aditivo, redução multiplicativa)."""
+        self.taxa_erro = ALFA_ERRO * erro + (1 - ALFA_ERRO) * self.taxa_erro
+        media = self.latencia_media.get(passo, latencia)
+        media = ALFA_LATENCIA * latencia + (1 - ALFA_LATENCIA) * media
+        self.latencia_media[passo] = media
+        if not erro:
+            self._recentes.setdefault(passo, deque(maxlen=JANELA_REFERENCIA)).append(latencia)
+
+        referencia = self.referencia(passo)
+        lento = referencia is not None and media > referencia * self.tolerancia_latencia
+        self._desde_reducao += 1
+
+        if erro or lento or self.taxa_erro > self.taxa_erro_max:
+            self._saudaveis = 0
+            if self._desde_reducao >= self.limite:
+                motivo = "erro" if erro else (f"latência de '{passo}' {media:.1f}s" if lento else f"taxa de erro {self.taxa_erro:.0%}")
+                self._ajustar(max(self.limite_min, math.floor(self.limite * self.fator_reducao)), motivo)
+                self._desde_reducao = 0
+            return
+
+        self._saudaveis += 1
+        if self._saudaveis >= self.limite and self.limite < self.limite_max:
+            self._saudaveis = 0
+            self._ajustar(self.limite + 1, "passos saudáveis")
+
+    def _ajustar(self, novo: int, motivo: str):
+        if novo == self.limite:
+            return
+        seta = "⬇️" if novo < self.limite else "⬆️"
+        logger.info(f"🚦 {seta} Limite de concorrência: {self.limite} → {novo} ({motivo})")
+        # Quem aguarda vaga é reavaliado na próxima saída de slot
+        self.limite = novo
+
+    def como_dict(self) -> dict:
+        return {
+            "limite": self.limite,
+            "em_uso": self.em_uso,
+            "taxa_rps": self.bucket.taxa,
+            "taxa_erro": round(self.taxa_erro, 3),
+            "latencia_media": {p: round(v, 3) for p, v in self.latencia_media.items()},
+        }
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from loguru import logger
+
+
+class CacheDesativacao:
+    """
+    Cache persistente do histórico de desativação por TAG, em JSON. Pela regra de
+    negócio (qualquer desativação já registrada = duplicidade), um positivo nunca deixa
+    de valer: fica para sempre, com a primeira evidência (texto da linha e instante).
+    Negativos só valem por `ttl_negativo_s`, pois outra pessoa pode desativar o equipamento.
+    """
+
+    def __init__(self, caminho: str, ttl_negativo_s: float = 600):
+        self.caminho = caminho
+        self.ttl_negativo_s = ttl_negativo_s
+        self.positivos: Dict[str, dict] = {}
+        self.negativos: Dict[str, float] = {}
+        self.acertos_positivos = 0
+        self.acertos_negativos = 0
+        self._alterado = False
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            self.positivos = dados.get("positivos", {})
+            self.negativos = dados.get("negativos", {})
+        logger.debug(f"Cache de desativação: {len(self.positivos)} TAG(s) desativada(s) em {caminho}")
+
+    @staticmethod
+    def _chave(tag: str) -> str:
+        return tag.strip().upper()
+
+    def positivo(self, tag: str) -> Optional[dict]:
+        """Evidência da desativação já registrada da TAG, ou None."""
+        evidencia = self.positivos.get(self._chave(tag))
+        if evidencia:
+            self.acertos_positivos += 1
+        return evidencia
+
+    def negativo_recente(self, tag: str) -> bool:
+        """True se a TAG foi varrida sem desativação há menos de `ttl_negativo_s`."""
+        instante = self.negativos.get(self._chave(tag))
+        if instante is None or time.time() - instante >= self.ttl_negativo_s:
+            return False
+        self.acertos_negativos += 1
+        return True
+
+    def registrar_positivo(self, tag: str, texto: str):
+        """Guarda a primeira evidência; as seguintes não a substituem."""
+        chave = self._chave(tag)
+        self.negativos.pop(chave, None)
+        if chave in self.positivos:
+            return
+        self.positivos[chave] = {"texto": texto[:300], "encontrado": datetime.now().isoformat(timespec="seconds")}
+        self._alterado = True
+
+    def registrar_negativo(self, tag: str):
+        chave = self._chave(tag)
+        if chave in self.positivos:
+            return
+        self.negativos[chave] = time.time()
+        self._alterado = True
+
+    def invalidar(self, tag: str):
+        """
+        Descarta o negativo da TAG (ex.: desativação que falhou depois do Salvar: o registro
+        pode já existir no servidor). A próxima tentativa volta a varrer o histórico.
+        """
+        if self.negativos.pop(self._chave(tag), None) is not None:
+            self._alterado = True
+
+    def salvar(self):
+        if not self._alterado:
+            return
+        # Negativos vencidos não servem mais para nada
+        agora = time.time()
+        self.negativos = {t: i for t, i in self.negativos.items() if agora - i < self.ttl_negativo_s}
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"positivos": self.positivos, "negativos": self.negativos}, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
+        self._alterado = False
+        logger.debug(f"Cache de desativação salvo ({len(self.positivos)} positivo(s), {len(self.negativos)} negativo(s))")
+
+    def log_resumo(self):
+        if self.acertos_positivos or self.acertos_negativos:
+            logger.info(
+                f"🗃️ Cache de desativação: {self.acertos_positivos} grupo(s) pulado(s) sem navegador, "
+                f"{self.acertos_negativos} varredura(s) de histórico evitada(s)"
+            )
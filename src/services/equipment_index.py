@@ -0,0 +1,211 @@
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+from loguru import logger
+
+
+# Ids aceitos do JSON: entram na URL do modelo, então nada de barras, espaços ou '#'
+_ID_VALIDO = re.compile(r"^[\w.\-]{1,64}$")
+
+
+def _url_valida(url: Any) -> bool:
+    if not isinstance(url, str):
+        return False
+    partes = urlparse(url.strip())
+    return partes.scheme in ("http", "https") and bool(partes.netloc)
+
+
+def itens_da_resposta(dados: Any, caminho: str = "", campo_tag: str = "tag", campo_id: str = "id") -> Optional[list]:
+    """
+    Objetos de equipamento de uma resposta da busca. Com `caminho` (ex.: "dados.itens"),
+    só o que está nesse caminho; sem ele, a lista da raiz, o próprio objeto da raiz
+    (se tiver TAG e id) ou a única lista do primeiro nível (resposta paginada).
+    Objetos aninhados dentro de um equipamento (setor, fabricante...) nunca entram.
+    None quando a resposta não tem esse formato.
+    """
+    if caminho:
+        for parte in caminho.split("."):
+            if not isinstance(dados, dict):
+                return None
+            dados = {str(k).lower(): v for k, v in dados.items()}.get(parte.lower())
+        if isinstance(dados, dict):
+            return [dados]
+        return dados if isinstance(dados, list) else None
+
+    if isinstance(dados, list):
+        return dados
+    if isinstance(dados, dict):
+        chaves = {str(k).lower() for k in dados}
+        if campo_tag.lower() in chaves and campo_id.lower() in chaves:
+            return [dados]
+        listas = [v for v in dados.values() if isinstance(v, list)]
+        if len(listas) == 1:
+            return listas[0]
+    return None
+
+
+def extrair_equipamentos(dados: Any, campo_tag: str = "tag", campo_id: str = "id", caminho: str = "") -> Dict[str, str]:
+    """
+    TAG e id dos equipamentos de uma resposta da busca (ver `itens_da_resposta`),
+    com nomes de campo sem diferenciar maiúsculas. Ids que não cabem numa URL são
+    descartados. Retorna {TAG normalizada: id}.
+    """
+    encontrados: Dict[str, str] = {}
+    for item in itens_da_resposta(dados, caminho, campo_tag, campo_id) or []:
+        if not isinstance(item, dict):
+            continue
+        chaves = {str(k).lower(): v for k, v in item.items()}
+        tag, ident = chaves.get(campo_tag.lower()), chaves.get(campo_id.lower())
+        if isinstance(ident, bool) or not isinstance(tag, (str, int)) or not isinstance(ident, (str, int)):
+            continue
+        tag, ident = str(tag).strip().upper(), str(ident).strip()
+        if tag and _ID_VALIDO.match(ident):
+            encontrados[tag] = ident
+    return encontrados
+
+
+class IndiceEquipamentos:
+    """
+    Índice persistente TAG → equipamento (id interno e/ou URL direta), em JSON.
+    Alimentado pelas respostas da busca durante a execução ou em lote a partir de
+    uma exportação; também lembra as TAGs que a busca não encontrou.
+    """
+
+    def __init__(self, caminho: str, url_modelo: str = ""):
+        self.caminho = caminho
+        # Ex.: "https://neovero/#/equipamentos/{id}" (vazio = só navegação pela busca)
+        self.url_modelo = url_modelo
+        self.equipamentos: Dict[str, dict] = {}
+        self.inexistentes: Dict[str, str] = {}
+        # Buscas seguidas sem janela nem resposta conclusiva, por TAG
+        self.falhas: Dict[str, int] = {}
+        self._alterado = False
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            self.equipamentos = dados.get("equipamentos", {})
+            self.inexistentes = dados.get("inexistentes", {})
+            self.falhas = dados.get("falhas", {})
+        logger.debug(f"Índice de equipamentos: {len(self.equipamentos)} TAG(s) em {caminho}")
+
+    def __len__(self) -> int:
+        return len(self.equipamentos)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag.strip().upper() in self.equipamentos
+
+    def obter(self, tag: str) -> Optional[dict]:
+        return self.equipamentos.get(tag.strip().upper())
+
+    def url(self, tag: str) -> Optional[str]:
+        """URL direta do equipamento: a registrada ou a do modelo com o id."""
+        entrada = self.obter(tag)
+        if not entrada:
+            return None
+        if entrada.get("url"):
+            return entrada["url"]
+        if self.url_modelo and entrada.get("id"):
+            return self.url_modelo.format(id=entrada["id"], tag=tag.strip().upper())
+        return None
+
+    def registrar(self, tag: str, ident: Optional[str] = None, url: Optional[str] = None):
+        tag = tag.strip().upper()
+        entrada = {"id": ident, "url": url, "atualizado": datetime.now().isoformat(timespec="seconds")}
+        anterior = self.equipamentos.get(tag, {})
+        if anterior.get("id") == ident and anterior.get("url") == url and tag not in self.inexistentes:
+            return
+        self.equipamentos[tag] = entrada
+        self.inexistentes.pop(tag, None)
+        self.falhas.pop(tag, None)
+        self._alterado = True
+
+    def esquecer(self, tag: str):
+        """Remove uma entrada que deixou de abrir o equipamento (ex.: id mudou)."""
+        if self.equipamentos.pop(tag.strip().upper(), None) is not None:
+            self._alterado = True
+
+    def marcar_inexistente(self, tag: str):
+        tag = tag.strip().upper()
+        if tag in self.equipamentos:
+            return
+        self.inexistentes[tag] = datetime.now().isoformat(timespec="seconds")
+        self.falhas.pop(tag, None)
+        self._alterado = True
+
+    def registrar_falha(self, tag: str) -> int:
+        """Conta uma busca sem resultado conclusivo (ex.: timeout). Retorna as falhas seguidas."""
+        tag = tag.strip().upper()
+        if tag in self.equipamentos:
+            return 0
+        self.falhas[tag] = self.falhas.get(tag, 0) + 1
+        self._alterado = True
+        return self.falhas[tag]
+
+    def aprender(self, dados: Any, campo_tag: str = "tag", campo_id: str = "id", caminho: str = "") -> int:
+        """Registra os equipamentos encontrados num JSON de resposta. Retorna quantos."""
+        encontrados = extrair_equipamentos(dados, campo_tag, campo_id, caminho)
+        for tag, ident in encontrados.items():
+            self.registrar(tag, ident)
+        return len(encontrados)
+
+    def importar_exportacao(self, caminho: str, coluna_tag: str = "tag", coluna_id: str = "id") -> int:
+        """Constrói o índice em lote a partir de uma exportação (CSV, Parquet ou Excel)."""
+        import polars as pl
+
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao == ".csv":
+            with open(caminho, "r", encoding="utf-8") as f:
+                separador = ";" if ";" in f.readline() else ","
+            df = pl.read_csv(caminho, infer_schema=False, separator=separador)
+        elif extensao == ".parquet":
+            df = pl.read_parquet(caminho)
+        else:
+            df = pl.read_excel(caminho)
+
+        colunas = {c.strip().lower(): c for c in df.columns}
+        if coluna_tag.lower() not in colunas or coluna_id.lower() not in colunas:
+            raise ValueError(f"Exportação sem as colunas '{coluna_tag}' e '{coluna_id}': {df.columns}")
+        col_url = colunas.get("url")
+
+        total = 0
+        for linha in df.iter_rows(named=True):
+            tag, ident = linha[colunas[coluna_tag.lower()]], linha[colunas[coluna_id.lower()]]
+            if tag is None or ident is None or not str(tag).strip():
+                continue
+            url = linha[col_url] if col_url else None
+            if url and not _url_valida(url):
+                logger.warning(f"⚠️ URL inválida ignorada para {tag}: {url!r}")
+                url = None
+            self.registrar(str(tag), str(ident), url.strip() if url else None)
+            total += 1
+        logger.success(f"📇 {total} equipamento(s) importado(s) de {os.path.basename(caminho)}")
+        return total
+
+    def verificar(self, tags: Iterable[str]) -> Tuple[List[str], List[str], List[str]]:
+        """Separa as TAGs em (indexadas, desconhecidas, inexistentes segundo buscas anteriores)."""
+        indexadas, desconhecidas, inexistentes = [], [], []
+        for tag in dict.fromkeys(t.strip().upper() for t in tags):
+            if tag in self.equipamentos:
+                indexadas.append(tag)
+            elif tag in self.inexistentes:
+                inexistentes.append(tag)
+            else:
+                desconhecidas.append(tag)
+        return indexadas, desconhecidas, inexistentes
+
+    def salvar(self):
+        if not self._alterado:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(
+                {"equipamentos": self.equipamentos, "inexistentes": self.inexistentes, "falhas": self.falhas},
+                f, ensure_ascii=False, indent=1,
+            )
+        os.replace(temporario, self.caminho)
+        self._alterado = False
+        logger.debug(f"Índice de equipamentos salvo ({len(self.equipamentos)} TAG(s))")
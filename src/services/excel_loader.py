@@ -1,132 +1,231 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Sequence, Tuple, Union
 import polars as pl
-from src.models import OrdemServico
+from src.services.input_cache import CacheEntrada, hash_arquivo
+from src.services.order_batch import OrdemBatch, expr_data, expr_texto
 from loguru import logger
-from typing import List
-from datetime import date, time, datetime
-
-def _parse_time(val):
-    if val is None:
-        return None
-    if isinstance(val, time):
-        return val
-    if isinstance(val, datetime):
-        return val.time()
-    if isinstance(val, str):
-        val = val.strip()
-        try:
-            return datetime.strptime(val, "%H:%M").time()
-        except ValueError:
-            try:
-                return datetime.strptime(val, "%H:%M:%S").time()
-            except ValueError:
-                pass # Let Pydantic handle or fail
-    return val
-
-def _parse_date(val):
-    if val is None:
-        return None
-    if isinstance(val, date):
-        return val # Covers date and datetime
-    if isinstance(val, datetime):
-        return val.date()
-    
-    # Tratamento para datas numéricas "DDMMYYYY" (ex: 19012026.0)
-    if isinstance(val, (int, float)):
-        s_val = str(int(val))
-        if len(s_val) == 8: # DDMMYYYY
-            try:
-                # DD = s_val[:2], MM = s_val[2:4], YYYY = s_val[4:]
-                return date(int(s_val[4:]), int(s_val[2:4]), int(s_val[:2]))
-            except ValueError:
-                pass
-    
-    if isinstance(val, str):
-        val = val.strip()
-        # Tenta formatos comuns
-        formatos = ["%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"]
-        for fmt in formatos:
-            try:
-                return datetime.strptime(val, fmt).date()
-            except ValueError:
-                continue
-    return val
-
-def _safe_str(val):
-    """Converte None para string vazia"""
-    if val is None:
-        return ""
-    return str(val)
-
-def carregar_planilha(caminho_arquivo: str) -> List[OrdemServico]:
+
+TODAS_AS_ABAS = "todas"
+EXTENSOES_LAZY = (".csv", ".parquet")
+SEPARADOR_CSV = ";"
+
+SeletorAbas = Union[int, str, Sequence[Union[int, str]]]
+
+
+@dataclass
+class FiltroEntrada:
     """
-    Lê um arquivo Excel e converte suas linhas em objetos OrdemServico.
-    Ignora linhas inválidas, logando warnings.
+    Filtros aplicados na leitura. Em CSV/Parquet são empurrados para o scan
+    (só as linhas que casam são lidas e validadas); no Excel, logo após a leitura.
+    `linha_inicio`/`linha_fim` seguem a numeração do arquivo (cabeçalho = linha 1).
     """
-    logger.info(f"Lendo arquivo: {caminho_arquivo}...")
-    
-    try:
-        # Lê o Excel usando fastexcel diretamente 
+    tags: Optional[Sequence[str]] = None
+    data_de: Optional[date] = None
+    data_ate: Optional[date] = None
+    tipos_ordem: Optional[Sequence[str]] = None
+    linha_inicio: Optional[int] = None
+    linha_fim: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return any(v is not None for v in vars(self).values())
+
+    def predicado(self, schema: pl.Schema) -> Optional[pl.Expr]:
+        condicoes = []
+
+        def normalizado(coluna: str) -> pl.Expr:
+            return expr_texto(coluna, schema[coluna]).str.strip_chars().str.to_uppercase()
+
+        if self.tags is not None:
+            condicoes.append(normalizado("Tag").is_in([t.strip().upper() for t in self.tags]))
+        if self.tipos_ordem is not None:
+            condicoes.append(normalizado("Tipo de Ordem").is_in([t.strip().upper() for t in self.tipos_ordem]))
+        if self.data_de is not None or self.data_ate is not None:
+            data = expr_data("Data Início", schema["Data Início"])
+            if self.data_de is not None:
+                condicoes.append(data >= self.data_de)
+            if self.data_ate is not None:
+                condicoes.append(data <= self.data_ate)
+
+        if not condicoes:
+            return None
+        return pl.all_horizontal(condicoes)
+
+    def predicado_normalizado(self) -> Optional[pl.Expr]:
+        """Mesmos filtros sobre as colunas já normalizadas do lote (usado nas abas vindas do cache)."""
+        condicoes = []
+        if self.tags is not None:
+            condicoes.append(pl.col("tag").is_in([t.strip().upper() for t in self.tags]))
+        if self.tipos_ordem is not None:
+            condicoes.append(pl.col("tipo_ordem").is_in([t.strip().upper() for t in self.tipos_ordem]))
+        if self.data_de is not None:
+            condicoes.append(pl.col("data_inicio") >= self.data_de)
+        if self.data_ate is not None:
+            condicoes.append(pl.col("data_inicio") <= self.data_ate)
+        if self.linha_inicio is not None:
+            condicoes.append(pl.col("_linha") >= self.linha_inicio)
+        if self.linha_fim is not None:
+            condicoes.append(pl.col("_linha") <= self.linha_fim)
+
+        if not condicoes:
+            return None
+        return pl.all_horizontal(condicoes)
+
+
+def _resolver_abas(caminho: str, abas: SeletorAbas) -> List[Union[int, str]]:
+    """Converte o seletor (índice, nome, lista ou 'todas') na lista de abas do arquivo."""
+    if caminho.lower().endswith(EXTENSOES_LAZY):
+        # CSV/Parquet têm uma única "aba"
+        return [0]
+    if abas == TODAS_AS_ABAS:
         import fastexcel
-        excel_reader = fastexcel.read_excel(caminho_arquivo)
-        # Carrega a primeira aba (default) e converte para Polars
-        df = excel_reader.load_sheet(0).to_polars()
-    except Exception as e:
-        logger.error(f"Erro crítico ao abrir arquivo: {e}")
-        raise
-
-    ordens_validas = []
-    
-    # Itera sobre cada linha da planilha
-    for row in df.iter_rows(named=True):
+        return list(fastexcel.read_excel(caminho).sheet_names)
+    if isinstance(abas, (int, str)):
+        return [abas]
+    return list(abas)
+
+
+def escanear_entrada(caminho: str, aba: Union[int, str] = 0, separador: str = SEPARADOR_CSV) -> Tuple[pl.LazyFrame, str]:
+    """
+    Abre a entrada como LazyFrame. CSV e Parquet são lidos via `scan_csv`/`scan_parquet`
+    (memory-mapped, leitura preguiçosa); Excel é lido por inteiro pelo fastexcel.
+    Retorna também o nome da aba para a procedência.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".parquet":
+        return pl.scan_parquet(caminho), "parquet"
+    if extensao == ".csv":
+        return pl.scan_csv(caminho, separator=separador, try_parse_dates=True), "csv"
+
+    import fastexcel
+    planilha = fastexcel.read_excel(caminho).load_sheet(aba)
+    return planilha.to_polars().lazy(), planilha.name
+
+
+def _normalizar_aba(
+    caminho: str, aba: Union[int, str], filtro: FiltroEntrada, separador: str
+) -> Tuple[pl.DataFrame, pl.DataFrame]:
+    """Lê, filtra e normaliza uma aba. Retorna (válidas, rejeitadas = linhas sem TAG)."""
+    lf, nome_aba = escanear_entrada(caminho, aba, separador)
+
+    # Procedência: arquivo, aba e linha como aparecem no arquivo (+2: cabeçalho e base 1)
+    lf = lf.with_row_index("_linha", offset=2).with_columns(
+        pl.col("_linha").cast(pl.Int64),
+        pl.lit(os.path.basename(caminho)).alias("_arquivo"),
+        pl.lit(nome_aba).alias("_aba"),
+    )
+
+    if filtro.linha_inicio is not None or filtro.linha_fim is not None:
+        primeira = max(filtro.linha_inicio or 2, 2)
+        quantidade = None if filtro.linha_fim is None else max(filtro.linha_fim - primeira + 1, 0)
+        lf = lf.slice(primeira - 2, quantidade)
+
+    predicado = filtro.predicado(lf.collect_schema())
+    if predicado is not None:
+        lf = lf.filter(predicado)
+
+    df = OrdemBatch.de_planilha(lf.collect()).df
+    sem_tag = pl.col("tag") == ""
+    return df.filter(~sem_tag), df.filter(sem_tag)
+
+
+def _ler_aba(
+    caminho: str,
+    aba: Union[int, str],
+    filtro: FiltroEntrada,
+    separador: str,
+    cache: Optional[CacheEntrada] = None,
+    conteudo: Optional[str] = None,
+) -> Tuple[OrdemBatch, pl.DataFrame, float]:
+    """
+    Lê uma aba (executa em thread: fastexcel e Polars liberam o GIL). Com cache, a aba
+    inteira normalizada vem do disco (ou é gravada nele) e os filtros são aplicados depois.
+    """
+    inicio = time.perf_counter()
+    if cache is None or conteudo is None:
+        validas, rejeitadas = _normalizar_aba(caminho, aba, filtro, separador)
+    else:
+        entrada = cache.obter(caminho, aba, conteudo)
+        if entrada is None:
+            entrada = _normalizar_aba(caminho, aba, FiltroEntrada(), separador)
+            cache.gravar(caminho, aba, conteudo, *entrada)
+        predicado = filtro.predicado_normalizado()
+        validas, rejeitadas = entrada if predicado is None else (df.filter(predicado) for df in entrada)
+    return OrdemBatch(validas), rejeitadas, time.perf_counter() - inicio
+
+
+def carregar_planilhas(
+    arquivos: Sequence[str],
+    abas: SeletorAbas = 0,
+    filtro: Optional[FiltroEntrada] = None,
+    separador_csv: str = SEPARADOR_CSV,
+    max_workers: Optional[int] = None,
+    pasta_cache: Optional[str] = None,
+) -> OrdemBatch:
+    """
+    Lê vários arquivos (Excel, CSV ou Parquet) e/ou várias abas em paralelo (pool de
+    threads) e junta tudo num único lote ordenado por arquivo → aba → linha, com a
+    procedência de cada ordem. `abas`: índice, nome, lista de índices/nomes ou 'todas'.
+    Ignora linhas sem TAG, logando warnings. Com `pasta_cache`, abas de Excel já
+    normalizadas são reaproveitadas enquanto o conteúdo do arquivo não mudar.
+    """
+    filtro = filtro or FiltroEntrada()
+    if filtro:
+        logger.info(f"🔎 Filtros de leitura: { {k: v for k, v in vars(filtro).items() if v is not None} }")
+
+    # CSV/Parquet já são lidos por scan com os filtros empurrados: o cache é só para Excel
+    cache = CacheEntrada(pasta_cache) if pasta_cache else None
+
+    tarefas = []
+    for caminho in arquivos:
+        logger.info(f"Lendo arquivo: {caminho}...")
+        try:
+            conteudo = hash_arquivo(caminho) if cache and not caminho.lower().endswith(EXTENSOES_LAZY) else None
+            tarefas.extend((caminho, aba, conteudo) for aba in _resolver_abas(caminho, abas))
+        except Exception as e:
+            logger.error(f"Erro crítico ao abrir arquivo: {e}")
+            raise
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futuros = [
+            pool.submit(_ler_aba, caminho, aba, filtro, separador_csv, cache, conteudo)
+            for caminho, aba, conteudo in tarefas
+        ]
         try:
-            # 1. Tratamento Especial para "NOW" e Datas
-            hora_fim_raw = row.get("Hora Fim")
-            data_inicio_raw = row.get("Data Início")
-            
-            # Lógica: Se Hora Fim for "NOW", a Data Fim também vira "NOW" para o modelo
-            if isinstance(hora_fim_raw, str) and hora_fim_raw.strip().upper() == "NOW":
-                data_fechamento_processada = "NOW"
-                hora_fechamento_processada = None
-            else:
-                # Se não for NOW, assumimos que fecha no mesmo dia que abriu
-                data_fechamento_processada = data_inicio_raw
-                hora_fechamento_processada = hora_fim_raw
-
-            # 2. Mapeamento Exato (Coluna Excel -> Campo Modelo)
-            dados_os = {
-                "tag": _safe_str(row.get("Tag")),
-                "padrao": _safe_str(row.get("Padrão")),
-                
-                "data_inicio": data_inicio_raw,
-                "hora_inicio": row.get("Hora Início"),
-                
-                # Campos calculados acima
-                "data_fechamento": data_fechamento_processada,
-                "hora_fechamento": hora_fechamento_processada,
-                
-                "tipo_oficina": _safe_str(row.get("Tipo de Oficina")),
-                "tipo_ordem": _safe_str(row.get("Tipo de Ordem")),
-                "complexidade": _safe_str(row.get("Complexidade")),
-                "reclamante": _safe_str(row.get("Reclamante")),
-                "tipo_ocorrencia": _safe_str(row.get("Tipo de Ocorrência")),
-                "causa_ocorrencia": _safe_str(row.get("Causa da ocorrência")),
-                "observacoes": _safe_str(row.get("Observações")),
-                
-                # Conversão para bool
-                "mao_de_obra_finalizada": bool(row.get("Check Mão de Obra")),
-                
-                "tecnico": _safe_str(row.get("Técnico Responsável")),
-                "servico_executado": _safe_str(row.get("Serviço Realizado"))
-            }
-            
-            # 3. Validação Pydantic
-            logger.debug(f"Tentando criar OS com: {dados_os}")
-            os_obj = OrdemServico(**dados_os)
-            ordens_validas.append(os_obj)
-            
+            resultados = [f.result() for f in futuros]
         except Exception as e:
-            tag_erro = row.get("Tag", "LINHA SEM TAG")
-            logger.warning(f"Ignorando OS '{tag_erro}' por dados inválidos: {e}")
+            logger.error(f"Erro crítico ao abrir arquivo: {e}")
+            raise
+
+    # Tempo de leitura por arquivo (soma das abas)
+    for caminho in arquivos:
+        da_planilha = [(lote, rej, seg) for (c, _, _), (lote, rej, seg) in zip(tarefas, resultados) if c == caminho]
+        linhas = sum(len(lote) + rej.height for lote, rej, _ in da_planilha)
+        segundos = sum(seg for _, _, seg in da_planilha)
+        logger.info(f"📄 {os.path.basename(caminho)}: {linhas} linha(s) em {len(da_planilha)} aba(s) ({segundos:.2f}s)")
+    if cache and (cache.acertos or cache.faltas):
+        logger.info(f"🗃️ Cache de entrada: {cache.acertos} aba(s) reaproveitada(s), {cache.faltas} lida(s) da planilha")
+
+    lote = OrdemBatch.concatenar([lote for lote, _, _ in resultados])
 
-    logger.success(f"Sucesso! {len(ordens_validas)} ordens prontas para processar.")
-    return ordens_validas
+    # Linhas sem TAG (ex.: linhas em branco no fim da planilha) não são executáveis
+    rejeitadas = [rej for _, rej, _ in resultados if rej.height]
+    if rejeitadas:
+        rejeitadas = pl.concat(rejeitadas, how="vertical_relaxed")
+        ignoradas = rejeitadas.select(["_arquivo", "_aba", "_linha"]).head(20).rows()
+        logger.warning(f"Ignorando {rejeitadas.height} linha(s) sem TAG: {[f'{a}[{b}]:{c}' for a, b, c in ignoradas]}")
+
+    logger.success(f"Sucesso! {len(lote)} ordens prontas para processar.")
+    return lote
+
+
+def carregar_planilha(caminho_arquivo: str) -> OrdemBatch:
+    """
+    Lê a primeira aba de um arquivo Excel e normaliza suas linhas num lote colunar (OrdemBatch).
+    Cada item do lote se comporta como um OrdemServico; o objeto Pydantic completo
+    só é criado quando a ordem é entregue aos page objects.
+    """
+    return carregar_planilhas([caminho_arquivo], abas=0)
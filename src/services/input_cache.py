@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import re
+from typing import Optional, Tuple
+import polars as pl
+from loguru import logger
+from src.models import OrdemServico
+from src.services import order_batch
+
+# Incrementar quando a leitura/normalização mudar de um jeito que a assinatura abaixo não capte
+VERSAO_LOADER = 1
+
+
+def versao_normalizacao() -> str:
+    """
+    Assinatura do loader + modelo: versão manual, campos do OrdemServico (com tipos)
+    e as tabelas de normalização. Qualquer mudança invalida o cache inteiro.
+    """
+    assinatura = json.dumps(
+        {
+            "loader": VERSAO_LOADER,
+            "modelo": {nome: repr(campo.annotation) for nome, campo in OrdemServico.model_fields.items()},
+            "colunas": order_batch.MAPA_COLUNAS_EXCEL,
+            "upper": order_batch.CAMPOS_UPPER,
+            "datas": order_batch.FORMATOS_DATA,
+            "horas": order_batch.FORMATOS_HORA,
+            "falsos": order_batch.TEXTOS_FALSOS,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(assinatura.encode("utf-8")).hexdigest()[:12]
+
+
+def hash_arquivo(caminho: str, bloco: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo (não do nome nem da data de modificação)."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        while parte := f.read(bloco):
+            sha.update(parte)
+    return sha.hexdigest()
+
+
+def _seguro(texto: str) -> str:
+    return re.sub(r"[^\w.-]+|_{2,}", "_", texto)
+
+
+class CacheEntrada:
+    """
+    Cache em disco das abas já lidas e normalizadas, endereçado pelo conteúdo:
+    cada entrada (Parquet das ordens válidas + Parquet das rejeitadas) é chaveada
+    pelo hash do arquivo, pela aba e pela versão do loader/modelo. Arquivo alterado
+    ou modelo novo geram outra chave; a entrada antiga da mesma aba é apagada na gravação.
+    """
+
+    def __init__(self, pasta: str):
+        self.pasta = pasta
+        self.versao = versao_normalizacao()
+        self.acertos = 0
+        self.faltas = 0
+
+    def _prefixo(self, caminho: str, aba) -> str:
+        # Hash do caminho absoluto: planilhas de mesmo nome em pastas diferentes não disputam a entrada
+        local = hashlib.sha256(os.path.abspath(caminho).encode("utf-8")).hexdigest()[:8]
+        return f"{_seguro(os.path.basename(caminho))}__{local}__{_seguro(str(aba))}__"
+
+    def _caminhos(self, caminho: str, aba, conteudo: str) -> Tuple[str, str]:
+        base = os.path.join(self.pasta, f"{self._prefixo(caminho, aba)}{conteudo[:16]}.v{self.versao}")
+        return f"{base}.parquet", f"{base}.rejeitadas.parquet"
+
+    def obter(self, caminho: str, aba, conteudo: str) -> Optional[Tuple[pl.DataFrame, pl.DataFrame]]:
+        """(válidas, rejeitadas) lidas via memory map, ou None se não houver entrada."""
+        validas, rejeitadas = self._caminhos(caminho, aba, conteudo)
+        if not (os.path.exists(validas) and os.path.exists(rejeitadas)):
+            self.faltas += 1
+            return None
+        try:
+            resultado = pl.read_parquet(validas, memory_map=True), pl.read_parquet(rejeitadas, memory_map=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Entrada de cache ilegível, relendo a planilha ({os.path.basename(validas)}): {e}")
+            self.faltas += 1
+            return None
+        self.acertos += 1
+        return resultado
+
+    def gravar(self, caminho: str, aba, conteudo: str, validas: pl.DataFrame, rejeitadas: pl.DataFrame):
+        os.makedirs(self.pasta, exist_ok=True)
+        destinos = self._caminhos(caminho, aba, conteudo)
+        for df, destino in zip((validas, rejeitadas), destinos):
+            temporario = f"{destino}.tmp"
+            df.write_parquet(temporario)
+            os.replace(temporario, destino)
+
+        # Versões anteriores desta aba (conteúdo ou modelo diferentes) não servem mais
+        prefixo = self._prefixo(caminho, aba)
+        nomes = {os.path.basename(d) for d in destinos}
+        for nome in os.listdir(self.pasta):
+            if nome.startswith(prefixo) and nome not in nomes:
+                os.remove(os.path.join(self.pasta, nome))
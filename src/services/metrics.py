@@ -0,0 +1,249 @@
+import asyncio
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from loguru import logger
+from src.core.animations import estabilizacao
+from src.core.roundtrips import contador_ida_volta
+from src.core.selector_registry import registro_seletores
+
+# Limites (s) dos histogramas de latência por fase
+BUCKETS_LATENCIA = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+# Janela da taxa móvel de ordens/minuto
+JANELA_TAXA_S = 300
+
+STATUS = ("sucesso", "pulado", "falha")
+
+# Ordens concluídas a partir das quais a taxa real pesa tanto quanto a previsão no ETA
+PESO_PREVISAO = 10
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus (buckets `le`, soma e contagem)."""
+
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = tuple(buckets)
+        self.contagens = [0] * len(self.buckets)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.soma += valor
+        self.total += 1
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.contagens[i] += 1
+
+    def como_dict(self) -> dict:
+        return {
+            "buckets": {str(limite): n for limite, n in zip(self.buckets, self.contagens)},
+            "soma": round(self.soma, 3),
+            "total": self.total,
+            "media": round(self.soma / self.total, 3) if self.total else None,
+        }
+
+
+class MetricasExecucao:
+    """
+    Métricas vivas de uma execução: contadores por status, fase atual de cada
+    worker (aba), profundidade da fila, taxa móvel, latência por fase e ETA.
+    Só acumula em memória; `ServidorMetricas` expõe o estado via HTTP.
+    """
+
+    def __init__(self, total_ordens: int = 0):
+        self.total_ordens = total_ordens
+        self.contadores: Dict[str, int] = {status: 0 for status in STATUS}
+        self.fases: Dict[str, str] = {}
+        self.latencias: Dict[str, Histograma] = {}
+        # Duração por ordem (normal, desativacao, *_now) e por preparo de grupo
+        self.duracoes: Dict[str, Histograma] = {}
+        # Previsão do histórico (s por ordem): ponto de partida do ETA
+        self.segundos_previstos_por_ordem: Optional[float] = None
+        # Controle de admissão (opcional): limite efetivo, vagas em uso, taxa de erro
+        self.admissao = None
+        self._concluidas: deque = deque()
+        self._inicio = time.monotonic()
+
+    @property
+    def concluidas(self) -> int:
+        return sum(self.contadores.values())
+
+    @property
+    def fila(self) -> int:
+        return max(self.total_ordens - self.concluidas, 0)
+
+    def registrar(self, status: str):
+        self.contadores[status] += 1
+        self._concluidas.append(time.monotonic())
+
+    def registrar_duracao(self, categoria: str, segundos: float):
+        self.duracoes.setdefault(categoria, Histograma()).observar(segundos)
+
+    @contextmanager
+    def fase(self, worker: str, nome: str):
+        """Marca a fase atual do worker e mede sua duração (também em caso de erro)."""
+        anterior = self.fases.get(worker, "ocioso")
+        self.fases[worker] = nome
+        inicio = time.monotonic()
+        try:
+            with contador_ida_volta.passo(nome):
+                yield
+        finally:
+            self.latencias.setdefault(nome, Histograma()).observar(time.monotonic() - inicio)
+            self.fases[worker] = anterior
+
+    def ordens_por_minuto(self) -> float:
+        agora = time.monotonic()
+        while self._concluidas and agora - self._concluidas[0] > JANELA_TAXA_S:
+            self._concluidas.popleft()
+        janela = min(JANELA_TAXA_S, agora - self._inicio)
+        if not self._concluidas or janela <= 0:
+            return 0.0
+        return len(self._concluidas) * 60 / janela
+
+    def eta_segundos(self) -> Optional[float]:
+        """
+        Tempo restante pela taxa móvel. Com previsão do histórico, o ETA parte dela e é
+        recalibrado pela taxa real à medida que as ordens concluem.
+        """
+        taxa = self.ordens_por_minuto()
+        previsto = self.segundos_previstos_por_ordem
+        if not taxa:
+            return self.fila * previsto if previsto else None
+        real = 60 / taxa
+        if previsto:
+            peso = self.concluidas / (self.concluidas + PESO_PREVISAO)
+            real = peso * real + (1 - peso) * previsto
+        return self.fila * real
+
+    def como_dict(self) -> dict:
+        eta = self.eta_segundos()
+        return {
+            "total_ordens": self.total_ordens,
+            "ordens": dict(self.contadores),
+            "fila": self.fila,
+            "fases": dict(self.fases),
+            "ordens_por_minuto": round(self.ordens_por_minuto(), 2),
+            "eta_segundos": round(eta, 1) if eta is not None else None,
+            "latencia_fases": {nome: h.como_dict() for nome, h in self.latencias.items()},
+            "duracoes": {nome: h.como_dict() for nome, h in self.duracoes.items()},
+            "tempo_execucao_segundos": round(time.monotonic() - self._inicio, 1),
+            "admissao": self.admissao.como_dict() if self.admissao else None,
+            "estabilizacao": estabilizacao.como_dict(),
+            "seletores": registro_seletores.como_dict(),
+            "ida_volta": contador_ida_volta.como_dict() if contador_ida_volta.ativo else None,
+        }
+
+    def prometheus(self) -> str:
+        """Formato de exposição texto do Prometheus."""
+        linhas: List[str] = [
+            "# HELP neovero_ordens_total Ordens concluídas por status.",
+            "# TYPE neovero_ordens_total counter",
+        ]
+        linhas += [f'neovero_ordens_total{{status="{s}"}} {n}' for s, n in self.contadores.items()]
+
+        linhas += [
+            "# HELP neovero_fila_ordens Ordens ainda não concluídas.",
+            "# TYPE neovero_fila_ordens gauge",
+            f"neovero_fila_ordens {self.fila}",
+            "# HELP neovero_ordens_por_minuto Taxa móvel de conclusão.",
+            "# TYPE neovero_ordens_por_minuto gauge",
+            f"neovero_ordens_por_minuto {self.ordens_por_minuto():.4f}",
+        ]
+
+        eta = self.eta_segundos()
+        if eta is not None:
+            linhas += [
+                "# HELP neovero_eta_segundos Estimativa de tempo restante.",
+                "# TYPE neovero_eta_segundos gauge",
+                f"neovero_eta_segundos {eta:.1f}",
+            ]
+
+        linhas += ["# HELP neovero_fase_worker Fase atual de cada worker (1 = ativa).", "# TYPE neovero_fase_worker gauge"]
+        linhas += [f'neovero_fase_worker{{worker="{w}",fase="{f}"}} 1' for w, f in self.fases.items()]
+
+        linhas += ["# HELP neovero_fase_segundos Latência de cada fase.", "# TYPE neovero_fase_segundos histogram"]
+        for nome, h in self.latencias.items():
+            for limite, n in zip(h.buckets, h.contagens):
+                linhas.append(f'neovero_fase_segundos_bucket{{fase="{nome}",le="{limite}"}} {n}')
+            linhas.append(f'neovero_fase_segundos_bucket{{fase="{nome}",le="+Inf"}} {h.total}')
+            linhas.append(f'neovero_fase_segundos_sum{{fase="{nome}"}} {h.soma:.3f}')
+            linhas.append(f'neovero_fase_segundos_count{{fase="{nome}"}} {h.total}')
+
+        if self.admissao:
+            linhas += [
+                "# HELP neovero_admissao_limite Limite efetivo de concorrência (AIMD).",
+                "# TYPE neovero_admissao_limite gauge",
+                f"neovero_admissao_limite {self.admissao.limite}",
+                "# HELP neovero_admissao_em_uso Passos críticos em andamento.",
+                "# TYPE neovero_admissao_em_uso gauge",
+                f"neovero_admissao_em_uso {self.admissao.em_uso}",
+                "# HELP neovero_admissao_taxa_erro Taxa de erro suavizada dos passos críticos.",
+                "# TYPE neovero_admissao_taxa_erro gauge",
+                f"neovero_admissao_taxa_erro {self.admissao.taxa_erro:.4f}",
+            ]
+
+        if estabilizacao.ativo:
+            linhas += [
+                "# HELP neovero_estabilizacao_economia_segundos Tempo fixo de estabilização evitado (modo sem animação).",
+                "# TYPE neovero_estabilizacao_economia_segundos counter",
+                f"neovero_estabilizacao_economia_segundos {estabilizacao.economia_s:.2f}",
+            ]
+
+        return "\n".join(linhas) + "\n"
+
+
+class ServidorMetricas:
+    """
+    Endpoint HTTP mínimo (asyncio.start_server) no mesmo event loop da automação:
+    `GET /metrics` → texto Prometheus, `GET /metrics.json` → JSON.
+    """
+
+    def __init__(self, metricas: MetricasExecucao, host: str = "127.0.0.1", porta: int = 9464):
+        self.metricas = metricas
+        self.host = host
+        self.porta = porta
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        logger.info(f"📈 Métricas em http://{self.host}:{self.porta}/metrics (JSON: /metrics.json)")
+
+    async def parar(self):
+        if self._servidor:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            requisicao = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Descarta os cabeçalhos
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            partes = requisicao.decode("latin-1").split()
+            caminho = partes[1].split("?")[0] if len(partes) > 1 else ""
+
+            if caminho == "/metrics":
+                status, tipo, corpo = "200 OK", "text/plain; version=0.0.4; charset=utf-8", self.metricas.prometheus()
+            elif caminho == "/metrics.json":
+                status, tipo = "200 OK", "application/json; charset=utf-8"
+                corpo = json.dumps(self.metricas.como_dict(), ensure_ascii=False)
+            else:
+                status, tipo, corpo = "404 Not Found", "text/plain; charset=utf-8", "use /metrics ou /metrics.json\n"
+
+            dados = corpo.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {tipo}\r\nContent-Length: {len(dados)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + dados
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Requisição de métricas descartada: {e}")
+        finally:
+            writer.close()
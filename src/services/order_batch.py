@@ -0,0 +1,256 @@
+from typing import Iterator, List, Optional, Sequence, Union
+import polars as pl
+from src.models import OrdemServico, Procedencia
+
+# Campos de texto normalizados pelo validador `limpar_strings_upper` do modelo
+CAMPOS_UPPER = [
+    "tag", "padrao", "tipo_oficina", "tipo_ordem",
+    "complexidade", "reclamante", "tipo_ocorrencia",
+    "causa_ocorrencia", "tecnico", "servico_executado",
+]
+
+# Campos temporais tipados; se o valor não for reconhecido, o texto original
+# é guardado em "<campo>_texto" (o modelo aceita Any nesses campos)
+CAMPOS_DATA = ["data_inicio", "data_fechamento"]
+CAMPOS_HORA = ["hora_inicio"]
+
+FORMATOS_DATA = ["%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"]
+FORMATOS_HORA = ["%H:%M", "%H:%M:%S"]
+
+# Textos lidos como "falso" em colunas booleanas vindas de CSV
+TEXTOS_FALSOS = ["", "0", "FALSE", "FALSO", "N", "NAO", "NÃO"]
+
+# Colunas de origem anexadas pelo loader (arquivo, aba, linha do Excel)
+COLUNAS_PROCEDENCIA = ["_arquivo", "_aba", "_linha"]
+
+# Campos do modelo que vêm da planilha (a procedência é montada das colunas acima)
+CAMPOS_MODELO = [campo for campo in OrdemServico.model_fields if campo != "procedencia"]
+
+# Coluna da planilha -> campo do modelo
+MAPA_COLUNAS_EXCEL = {
+    "Tag": "tag",
+    "Padrão": "padrao",
+    "Data Início": "data_inicio",
+    "Hora Início": "hora_inicio",
+    "Hora Fim": "hora_fim",
+    "Tipo de Oficina": "tipo_oficina",
+    "Tipo de Ordem": "tipo_ordem",
+    "Complexidade": "complexidade",
+    "Reclamante": "reclamante",
+    "Tipo de Ocorrência": "tipo_ocorrencia",
+    "Causa da ocorrência": "causa_ocorrencia",
+    "Observações": "observacoes",
+    "Check Mão de Obra": "mao_de_obra_finalizada",
+    "Técnico Responsável": "tecnico",
+    "Serviço Realizado": "servico_executado",
+}
+
+
+def expr_texto(nome: str, dtype: pl.DataType) -> pl.Expr:
+    coluna = pl.col(nome)
+    return coluna if dtype == pl.String else coluna.cast(pl.String, strict=False)
+
+
+def expr_data(nome: str, dtype: pl.DataType) -> pl.Expr:
+    coluna = pl.col(nome)
+    if dtype == pl.Date:
+        return coluna
+    if dtype == pl.Datetime:
+        return coluna.dt.date()
+    if dtype == pl.String:
+        texto = coluna.str.strip_chars()
+        return pl.coalesce([texto.str.strptime(pl.Date, fmt, strict=False) for fmt in FORMATOS_DATA])
+    if dtype.is_numeric():
+        # Datas numéricas "DDMMYYYY" (ex: 19012026.0)
+        return coluna.cast(pl.Int64, strict=False).cast(pl.String).str.strptime(pl.Date, "%d%m%Y", strict=False)
+    return pl.lit(None, dtype=pl.Date)
+
+
+def _expr_hora(nome: str, dtype: pl.DataType) -> pl.Expr:
+    coluna = pl.col(nome)
+    if dtype == pl.Time:
+        return coluna
+    if dtype == pl.Datetime:
+        return coluna.dt.time()
+    if dtype == pl.String:
+        texto = coluna.str.strip_chars()
+        return pl.coalesce([texto.str.strptime(pl.Time, fmt, strict=False) for fmt in FORMATOS_HORA])
+    return pl.lit(None, dtype=pl.Time)
+
+
+def _expr_bool(nome: str, dtype: pl.DataType) -> pl.Expr:
+    """Semântica de `bool(valor)`, exceto textos como 'FALSE'/'NÃO' (comuns em CSV)."""
+    coluna = pl.col(nome)
+    if dtype == pl.Boolean:
+        return coluna.fill_null(False)
+    if dtype == pl.String:
+        return ~coluna.fill_null("").str.strip_chars().str.to_uppercase().is_in(TEXTOS_FALSOS)
+    if dtype.is_numeric():
+        return coluna.fill_null(0) != 0
+    return coluna.is_not_null()
+
+
+def _temporal_com_fallback(nome: str, dtype: pl.DataType, expr_tipada: pl.Expr) -> List[pl.Expr]:
+    texto = expr_texto(nome, dtype)
+    return [
+        expr_tipada.alias(nome),
+        pl.when(expr_tipada.is_null()).then(texto).otherwise(None).alias(f"{nome}_texto"),
+    ]
+
+
+def _normalizar(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Normalização vetorizada equivalente aos validadores do modelo.
+    Espera colunas com nomes de campos do modelo mais `fecha_agora` (bool) já calculada.
+    """
+    schema = df.schema
+    exprs = []
+
+    for campo in CAMPOS_UPPER:
+        exprs.append(expr_texto(campo, schema[campo]).fill_null("").str.strip_chars().str.to_uppercase().alias(campo))
+    exprs.append(expr_texto("observacoes", schema["observacoes"]).fill_null("").alias("observacoes"))
+
+    for campo in CAMPOS_DATA:
+        exprs.extend(_temporal_com_fallback(campo, schema[campo], expr_data(campo, schema[campo])))
+    for campo in CAMPOS_HORA:
+        exprs.extend(_temporal_com_fallback(campo, schema[campo], _expr_hora(campo, schema[campo])))
+
+    exprs.append(expr_texto("hora_fechamento", schema["hora_fechamento"]).alias("hora_fechamento"))
+    exprs.append(_expr_bool("mao_de_obra_finalizada", schema["mao_de_obra_finalizada"]).alias("mao_de_obra_finalizada"))
+    exprs.append(pl.col("fecha_agora").fill_null(False))
+    exprs.extend(pl.col(c) for c in COLUNAS_PROCEDENCIA if c in schema)
+
+    df = df.select(exprs)
+    # Com fechamento "NOW", a data de fechamento não é usada
+    return df.with_columns(
+        pl.when(pl.col("fecha_agora")).then(None).otherwise(pl.col("data_fechamento")).alias("data_fechamento"),
+        pl.when(pl.col("fecha_agora")).then(None).otherwise(pl.col("data_fechamento_texto")).alias("data_fechamento_texto"),
+    )
+
+
+def _eh_now(expr: pl.Expr) -> pl.Expr:
+    return expr.str.strip_chars().str.to_uppercase() == "NOW"
+
+
+class OrdemView:
+    """
+    Visão leve (`__slots__`) de uma linha do `OrdemBatch`.
+    Expõe os mesmos atributos de `OrdemServico`; `para_modelo()` cria o objeto
+    Pydantic completo só quando a ordem é entregue aos page objects.
+    """
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: "OrdemBatch", indice: int):
+        self._batch = batch
+        self._i = indice
+
+    def _valor(self, campo: str):
+        return self._batch._colunas[campo][self._i]
+
+    def _temporal(self, campo: str):
+        valor = self._valor(campo)
+        return valor if valor is not None else self._valor(f"{campo}_texto")
+
+    def __getattr__(self, campo: str):
+        if campo in OrdemBatch.CAMPOS_DIRETOS:
+            return self._valor(campo)
+        raise AttributeError(campo)
+
+    @property
+    def data_inicio(self):
+        return self._temporal("data_inicio")
+
+    @property
+    def hora_inicio(self):
+        return self._temporal("hora_inicio")
+
+    @property
+    def data_fechamento(self):
+        return "NOW" if self.is_closing_now else self._temporal("data_fechamento")
+
+    @property
+    def is_closing_now(self) -> bool:
+        return bool(self._valor("fecha_agora"))
+
+    @property
+    def procedencia(self) -> Optional[Procedencia]:
+        if "_arquivo" not in self._batch._colunas:
+            return None
+        return Procedencia(arquivo=self._valor("_arquivo"), aba=self._valor("_aba"), linha=self._valor("_linha"))
+
+    def como_dict(self) -> dict:
+        return {campo: getattr(self, campo) for campo in OrdemServico.model_fields}
+
+    def para_modelo(self) -> OrdemServico:
+        return OrdemServico(**self.como_dict())
+
+    def __repr__(self) -> str:
+        return f"OrdemView({self._i}, tag={self.tag!r})"
+
+
+class OrdemBatch:
+    """
+    Lote de ordens em formato colunar (Polars). Indexável e iterável como uma
+    lista, mas cada item é uma `OrdemView` de dois slots em vez de um objeto Pydantic.
+    """
+    CAMPOS_DIRETOS = frozenset(CAMPOS_UPPER + ["observacoes", "hora_fechamento", "mao_de_obra_finalizada"])
+
+    def __init__(self, df: pl.DataFrame):
+        self.df = df
+        self._colunas = {nome: df.get_column(nome) for nome in df.columns}
+
+    @classmethod
+    def de_planilha(cls, df: pl.DataFrame) -> "OrdemBatch":
+        """Constrói o lote a partir das colunas da planilha (nomes em MAPA_COLUNAS_EXCEL)."""
+        faltantes = [c for c in MAPA_COLUNAS_EXCEL if c not in df.columns]
+        df = df.with_columns([pl.lit(None, dtype=pl.String).alias(c) for c in faltantes])
+        df = df.select(
+            [pl.col(origem).alias(campo) for origem, campo in MAPA_COLUNAS_EXCEL.items()]
+            + [pl.col(c) for c in COLUNAS_PROCEDENCIA if c in df.columns]
+        )
+
+        # Se Hora Fim for "NOW", a Data Fim também vira "NOW"; senão fecha no mesmo dia que abriu
+        hora_fim = expr_texto("hora_fim", df.schema["hora_fim"])
+        df = df.with_columns(
+            _eh_now(hora_fim).fill_null(False).alias("fecha_agora"),
+            pl.col("data_inicio").alias("data_fechamento"),
+            pl.when(_eh_now(hora_fim)).then(None).otherwise(hora_fim).alias("hora_fechamento"),
+        )
+        return cls(_normalizar(df))
+
+    @classmethod
+    def de_registros(cls, registros: Sequence[dict]) -> "OrdemBatch":
+        """Constrói o lote a partir de dicionários com os campos do modelo."""
+        df = pl.DataFrame(
+            {campo: pl.Series(campo, [r.get(campo) for r in registros], strict=False) for campo in CAMPOS_MODELO}
+        )
+        fechamento = expr_texto("data_fechamento", df.schema["data_fechamento"])
+        df = df.with_columns(_eh_now(fechamento).fill_null(False).alias("fecha_agora"))
+        return cls(_normalizar(df))
+
+    def __len__(self) -> int:
+        return self.df.height
+
+    def __getitem__(self, indice: int) -> OrdemView:
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        return OrdemView(self, indice)
+
+    def __iter__(self) -> Iterator[OrdemView]:
+        return (OrdemView(self, i) for i in range(len(self)))
+
+    @classmethod
+    def concatenar(cls, lotes: Sequence["OrdemBatch"]) -> "OrdemBatch":
+        """Junta lotes já normalizados, preservando a ordem recebida."""
+        if not lotes:
+            return cls.de_registros([])
+        return cls(pl.concat([lote.df for lote in lotes], how="vertical_relaxed"))
+
+
+def materializar(os_data: Union[OrdemServico, OrdemView]) -> OrdemServico:
+    """Converte uma visão do lote no modelo completo (no momento da entrega aos page objects)."""
+    if isinstance(os_data, OrdemView):
+        return os_data.para_modelo()
+    return os_data
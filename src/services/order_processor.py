@@ -0,0 +1,471 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from weakref import WeakKeyDictionary
+from playwright.async_api import Page
+from loguru import logger
+from src.config.settings import settings
+from src.core.animations import (
+    CONDICAO_FORM_OS_ABERTO,
+    CONDICAO_JANELA_EQUIPAMENTO,
+    CONDICAO_JANELAS_LIMPAS,
+    desativar_animacoes,
+    estabilizacao,
+    estabilizar,
+)
+from src.core.events import EventBridge
+from src.core.profiler import PerfilNavegador, caminho_perfil
+from src.core.exceptions import PrazoOrdemExcedidoError
+from src.core.roundtrips import contador_ida_volta, metodo_em_andamento
+from src.core.selector_registry import registro_seletores
+from src.models import OrdemServico
+from src.pages.menu_page import MenuPage
+from src.pages.equipment_page import EquipmentPage
+from src.pages.os_page import OsPage
+from src.services.admission import ControleAdmissao
+from src.services.deactivation_cache import CacheDesativacao
+from src.services.equipment_index import IndiceEquipamentos
+from src.services.metrics import MetricasExecucao
+from src.services.order_batch import materializar
+from src.services.planner import GrupoTag, is_desativacao
+from src.services.reconciliation import CONCLUIDA, SALVAR_CLICADO, DiarioOrdens
+from src.services.timing_history import PREPARO, PREPARO_DESATIVACAO, categoria_ordem
+
+
+# Cancelamentos (1s cada) enviados a um passo que estourou o prazo antes de desistir de esperá-lo
+TENTATIVAS_CANCELAMENTO = 5
+
+
+@dataclass
+class BrowserTab:
+    """Uma aba autenticada com seus page objects e ponte de eventos."""
+    nome: str
+    page: Page
+    eventos: EventBridge
+    menu: MenuPage
+    equipamento: EquipmentPage
+    os: OsPage
+
+
+# Ponte já instalada em cada página: a aba do daemon CDP é reaproveitada e não pode
+# receber de novo os init scripts nem o binding (expose_binding repetido levanta erro)
+_pontes_instaladas: "WeakKeyDictionary[Page, EventBridge]" = WeakKeyDictionary()
+
+
+async def criar_aba(page: Page, nome: str = "A", indice: Optional[IndiceEquipamentos] = None) -> BrowserTab:
+    """
+    Prepara uma página para a automação: script anti-foco, ponte de eventos e page objects.
+    Numa página já preparada (aba reaproveitada do daemon), só os page objects são recriados.
+    """
+    eventos = _pontes_instaladas.get(page)
+    if eventos is not None:
+        logger.debug(f"Aba {nome} reaproveitada: scripts e ponte de eventos já instalados")
+    else:
+        # Injeta script para prevenir roubo de foco
+        await page.add_init_script("window.focus = function() { return false; }")
+        logger.info(f"🔒 Script anti-foco injetado na aba {nome}")
+
+        # Modo sem animação: troca as esperas de estabilização por condições do DOM
+        if settings.MODO_SEM_ANIMACAO:
+            await desativar_animacoes(page)
+
+        # Ponte de eventos DOM → Python (substitui o polling nas páginas)
+        eventos = EventBridge(page)
+        await eventos.instalar()
+        _pontes_instaladas[page] = eventos
+
+    return BrowserTab(
+        nome=nome,
+        page=page,
+        eventos=eventos,
+        menu=MenuPage(page, eventos, indice),
+        equipamento=EquipmentPage(page, eventos),
+        os=OsPage(page, eventos),
+    )
+
+
+class OrderProcessor:
+    """
+    Passos de um grupo de ordens da mesma TAG (preparar equipamento → abrir/salvar
+    cada OS → limpeza de erro) e as estatísticas da execução.
+    Usado tanto no modo sequencial quanto no pipeline.
+    """
+
+    def __init__(
+        self,
+        total_ordens: int = 0,
+        ao_concluir: Optional[Callable[[OrdemServico, str], None]] = None,
+        metricas: Optional[MetricasExecucao] = None,
+        admissao: Optional[ControleAdmissao] = None,
+        perfil: Optional[PerfilNavegador] = None,
+        diario: Optional[DiarioOrdens] = None,
+        prazo_ordem_s: float = 0,
+        cache_desativacao: Optional[CacheDesativacao] = None,
+    ):
+        self.stats = {"sucesso": 0, "falha": 0, "pulado": 0}
+        self.total_ordens = total_ordens
+        # Chamado com (ordem, "sucesso" | "pulado" | "falha") ao fim de cada ordem
+        self.ao_concluir = ao_concluir
+        # Contadores, fase por aba e latências (expostos pelo endpoint de métricas)
+        self.metricas = metricas or MetricasExecucao(total_ordens)
+        # Controle de admissão global (compartilhado entre abas/processadores)
+        self.admissao = admissao
+        if admissao:
+            self.metricas.admissao = admissao
+        # --profile: captura CPU/trace do navegador numa janela de ordens
+        self.perfil = perfil
+        # Diário de estados (Salvar clicado / concluída) para a reconciliação após queda
+        self.diario = diario
+        # Prazo total por ordem/preparo (0 = sem prazo) e estouros por passo em andamento
+        self.prazo_ordem_s = prazo_ordem_s
+        self.estouros_prazo: Dict[str, int] = {}
+        # TAGs com desativação já registrada (permanente) e varreduras negativas recentes
+        self.cache_desativacao = cache_desativacao
+        self._contador = 0
+
+    @asynccontextmanager
+    async def _passo_critico(self, aba: "BrowserTab", nome: str, chave_admissao: Optional[str] = None):
+        """
+        Fase medida nas métricas e, se configurado, admitida pelo controle de admissão.
+        `chave_admissao` separa a latência de referência de variantes do mesmo passo.
+        """
+        with self.metricas.fase(aba.nome, nome):
+            if self.admissao is None:
+                yield
+                return
+            async with self.admissao.slot(chave_admissao or nome):
+                yield
+
+    @staticmethod
+    def _chave_busca(aba: "BrowserTab", tag: str) -> str:
+        """Acesso direto pelo índice e busca pela barra lateral têm latências bem diferentes."""
+        indice = aba.menu.indice
+        return "busca_indice" if indice is not None and indice.url(tag) else "busca_barra"
+
+    async def _com_prazo(self, aba: "BrowserTab", descricao: str, coro):
+        """
+        Executa `coro` sob o prazo total da ordem. Ao estourar, cancela o passo em
+        andamento, espera o desempilhamento (finally, liberação da admissão) e levanta
+        PrazoOrdemExcedidoError com o passo e o método que estavam rodando.
+        """
+        if not self.prazo_ordem_s:
+            return await coro
+
+        tarefa = asyncio.ensure_future(coro)
+        try:
+            concluidas, _ = await asyncio.wait({tarefa}, timeout=self.prazo_ordem_s)
+        except asyncio.CancelledError:
+            tarefa.cancel()
+            raise
+        if concluidas:
+            return tarefa.result()
+
+        passo = self.metricas.fases.get(aba.nome, "ocioso")
+        metodo = metodo_em_andamento(tarefa)
+        for _ in range(TENTATIVAS_CANCELAMENTO):
+            tarefa.cancel()
+            concluidas, _ = await asyncio.wait({tarefa}, timeout=1)
+            if concluidas:
+                break
+        else:
+            logger.error(f"⏰ {descricao}: o passo '{passo}' não atendeu ao cancelamento")
+        if concluidas and not tarefa.cancelled():
+            # Terminou durante o cancelamento (exceção própria ou resultado): vale o desfecho real
+            return tarefa.result()
+
+        self.estouros_prazo[passo] = self.estouros_prazo.get(passo, 0) + 1
+        raise PrazoOrdemExcedidoError(
+            f"{descricao}: prazo de {self.prazo_ordem_s:.0f}s esgotado no passo '{passo}' (em {metodo})"
+        )
+
+    def _registrar(self, os_data: OrdemServico, status: str):
+        self.stats[status] += 1
+        self.metricas.registrar(status)
+        if self.diario and status == "sucesso":
+            self.diario.registrar(os_data, CONCLUIDA)
+        if self.cache_desativacao and status == "sucesso" and is_desativacao(os_data):
+            self.cache_desativacao.registrar_positivo(os_data.tag, f"{os_data.tipo_ordem} criada por esta automação")
+        if self.ao_concluir:
+            self.ao_concluir(os_data, status)
+
+    def log_status(self):
+        eta = self.metricas.eta_segundos()
+        restante = f" | ⏳ ~{eta / 60:.0f}min restantes" if eta is not None and self.metricas.fila else ""
+        logger.info(f"📊 Status atual: ✅ {self.stats['sucesso']} | ⏭️ {self.stats['pulado']} | ❌ {self.stats['falha']}{restante}")
+
+    def _pular_desativacoes(self, grupo: GrupoTag) -> List[OrdemServico]:
+        """Registra as desativações do grupo como puladas e retorna as demais ordens."""
+        pendentes = []
+        for os_data in grupo.ordens:
+            if is_desativacao(os_data):
+                logger.warning(f"⏭️ PULANDO ordem {os_data.tag}: Desativação ativa já existente!")
+                self._registrar(os_data, "pulado")
+            else:
+                pendentes.append(os_data)
+        return pendentes
+
+    async def preparar_equipamento(self, aba: BrowserTab, grupo: GrupoTag) -> List[OrdemServico]:
+        """
+        Limpeza prévia, busca do ativo e verificação de duplicidade.
+        Retorna as ordens do grupo a abrir com a janela do equipamento já carregada
+        (desativações com histórico existente são puladas).
+        """
+        # Desativação já conhecida (cache persistente): pula sem tocar no navegador
+        conhecida = None
+        if grupo.tem_desativacao and self.cache_desativacao:
+            conhecida = self.cache_desativacao.positivo(grupo.tag)
+        if conhecida:
+            logger.info(f"🗃️ {grupo.tag}: desativação já registrada ('{conhecida['texto'][:80]}', vista em {conhecida['encontrado']})")
+            pendentes = self._pular_desativacoes(grupo)
+            if not pendentes:
+                self.log_status()
+                return pendentes
+
+        inicio = time.perf_counter()
+        pendentes = await self._preparar_no_navegador(aba, grupo, conhecida, pendentes if conhecida else None)
+        varredura = grupo.tem_desativacao and not conhecida
+        self.metricas.registrar_duracao(PREPARO_DESATIVACAO if varredura else PREPARO, time.perf_counter() - inicio)
+        return pendentes
+
+    async def _preparar_no_navegador(
+        self, aba: BrowserTab, grupo: GrupoTag, conhecida: Optional[dict], pendentes: Optional[List[OrdemServico]]
+    ) -> List[OrdemServico]:
+        """Parte de `preparar_equipamento` que usa o navegador (cronometrada para o histórico de tempos)."""
+        # ═══════════════════════════════════════════════════════════════
+        # MOMENTO 1: LIMPEZA PRÉVIA (Início de cada iteração)
+        # Remove resquícios da OS anterior antes de buscar novo ativo
+        # ═══════════════════════════════════════════════════════════════
+        logger.info(f"🧹 [MOMENTO 1] Limpeza prévia (aba {aba.nome}): removendo resquícios da iteração anterior...")
+        with self.metricas.fase(aba.nome, "limpeza"):
+            await aba.equipamento.fechar_janela()
+            await estabilizar(aba.page, 1, CONDICAO_JANELAS_LIMPAS)
+
+        # === PASSO 1: BUSCAR ATIVO ===
+        logger.info(f"🔍 Buscando ativo com TAG: {grupo.tag}")
+        async with self._passo_critico(aba, "busca", self._chave_busca(aba, grupo.tag)):
+            janela_confirmada = await aba.menu.buscar_ativo(grupo.tag)
+        if not janela_confirmada:
+            await estabilizar(aba.page, 2, CONDICAO_JANELA_EQUIPAMENTO)  # Aguarda sistema processar busca
+
+        # === PASSO 2: VERIFICAÇÃO DE DUPLICIDADE (Apenas para Desativações) ===
+        if not grupo.tem_desativacao:
+            logger.debug("ℹ️ Não é desativação. Pulando verificação de duplicidade.")
+            return list(grupo.ordens)
+        if conhecida:
+            self.log_status()
+            return pendentes
+        if self.cache_desativacao and self.cache_desativacao.negativo_recente(grupo.tag):
+            logger.info(f"🗃️ {grupo.tag}: histórico varrido há pouco sem desativação. Pulando a varredura.")
+            return list(grupo.ordens)
+
+        logger.info("🔎 Tipo identificado como DESATIVAÇÃO. Verificando duplicidade...")
+        with self.metricas.fase(aba.nome, "verificacao_desativacao"):
+            desativacao_existente = await aba.equipamento.verificar_desativacao_existente()
+        if self.cache_desativacao:
+            if desativacao_existente:
+                self.cache_desativacao.registrar_positivo(grupo.tag, desativacao_existente)
+            elif aba.equipamento.historico_completo:
+                self.cache_desativacao.registrar_negativo(grupo.tag)
+            else:
+                # Grid ausente ou ainda crescendo: a varredura pode ter perdido linhas
+                logger.debug(f"🗃️ {grupo.tag}: histórico não confirmado completo; negativo não guardado")
+        if not desativacao_existente:
+            return list(grupo.ordens)
+
+        pendentes = self._pular_desativacoes(grupo)
+        if not pendentes:
+            # ═══════════════════════════════════════════════════════════════
+            # MOMENTO 2: LIMPEZA AO PULAR (Condicional de duplicidade)
+            # Fecha janela de equipamento ao detectar duplicidade
+            # ═══════════════════════════════════════════════════════════════
+            logger.info("🧹 [MOMENTO 2] Fechando janela de equipamento (duplicidade)...")
+            await aba.equipamento.fechar_janela()
+            await estabilizar(aba.page, 1, CONDICAO_JANELAS_LIMPAS)
+
+        self.log_status()
+        return pendentes
+
+    async def abrir_e_salvar(self, aba: BrowserTab, os_data: OrdemServico):
+        """Abre a Nova OS a partir da janela do equipamento e preenche/salva o formulário."""
+        # === PASSO 3: ABRIR NOVA OS ===
+        logger.info(f"🆕 Abrindo formulário de Nova OS (aba {aba.nome})...")
+        async with self._passo_critico(aba, "abrir_os"):
+            await aba.equipamento.clicar_abrir_os()
+        await estabilizar(aba.page, 2, CONDICAO_FORM_OS_ABERTO)  # Aguarda iframe/modal carregar
+
+        # === PASSO 4: PREENCHER E SALVAR OS ===
+        logger.info("📝 Preenchendo formulário da OS...")
+        async with self._passo_critico(aba, "preencher_salvar"):
+            ao_clicar_salvar = (lambda: self.diario.registrar(os_data, SALVAR_CLICADO)) if self.diario else None
+            await aba.os.preencher_nova_os(materializar(os_data), ao_clicar_salvar)
+
+        self._registrar(os_data, "sucesso")
+        logger.success(f"✅ OS {os_data.tag} processada com sucesso!")
+        self.log_status()
+
+    async def tratar_erro(self, aba: BrowserTab, tag: str, erro: Exception, ordens: Sequence[OrdemServico]):
+        """
+        MOMENTO 3: LIMPEZA DE ERRO.
+        Garante que falhas não deixem janelas órfãs. `ordens` são as ordens perdidas
+        pela falha (o grupo inteiro, se a busca do ativo falhou).
+        """
+        for os_data in ordens:
+            self._registrar(os_data, "falha")
+            if self.cache_desativacao and is_desativacao(os_data):
+                # A falha pode ter vindo depois do Salvar: o negativo já não é confiável
+                self.cache_desativacao.invalidar(os_data.tag)
+        logger.error(f"❌ ERRO ao processar OS {tag}: {erro}")
+
+        # Screenshot de debug
+        try:
+            screenshot_path = os.path.join(settings.LOGS_DIR, f"erro_{tag}.png")
+            await aba.page.screenshot(path=screenshot_path)
+            logger.info(f"📸 Screenshot salvo: {screenshot_path}")
+        except Exception as e_screenshot:
+            logger.debug(f"Não foi possível capturar screenshot: {e_screenshot}")
+
+        # LIMPEZA DE EMERGÊNCIA
+        logger.warning("🧹 [MOMENTO 3] Limpeza de emergência após erro...")
+        with self.metricas.fase(aba.nome, "limpeza_erro"):
+            await self._limpeza_emergencia(aba)
+
+        self.log_status()
+
+    async def _limpeza_emergencia(self, aba: BrowserTab):
+        """Fecha a janela do equipamento; se falhar, remove as janelas extras via JavaScript."""
+        try:
+            await aba.equipamento.fechar_janela()
+            await estabilizar(aba.page, 2, CONDICAO_JANELAS_LIMPAS)  # Pausa maior para estabilização após erro
+        except Exception as e_cleanup:
+            logger.error(f"❌ Falha na limpeza de emergência: {e_cleanup}")
+
+            # Último recurso: força limpeza via JavaScript direto
+            try:
+                logger.warning("⚠️ Executando limpeza JavaScript direta (último recurso)...")
+                await aba.page.evaluate("""
+                    () => {
+                        const windows = document.querySelectorAll('nv-window');
+                        windows.forEach((win, idx) => {
+                            if (idx > 0) win.remove();
+                        });
+                    }
+                """)
+                await estabilizar(aba.page, 1, CONDICAO_JANELAS_LIMPAS)
+                logger.info("✅ Limpeza JavaScript concluída")
+            except Exception as e_js:
+                logger.error(f"❌ Falha crítica na limpeza JavaScript: {e_js}")
+
+    async def _preparar_seguro(self, aba: BrowserTab, grupo: GrupoTag) -> Optional[List[OrdemServico]]:
+        """`preparar_equipamento` com erro roteado para a limpeza (retorna None)."""
+        with contador_ida_volta.ordem(f"{grupo.tag} (preparo)"):
+            try:
+                return await self._com_prazo(aba, f"Preparo de {grupo.tag}", self.preparar_equipamento(aba, grupo))
+            except Exception as e_os:
+                await self.tratar_erro(aba, grupo.tag, e_os, grupo.ordens)
+                return None
+
+    async def _processar_ordem(self, aba: BrowserTab, grupo: GrupoTag, os_data: OrdemServico, reabrir: bool):
+        if reabrir:
+            # A limpeza de erro fechou a janela do equipamento
+            async with self._passo_critico(aba, "busca", self._chave_busca(aba, grupo.tag)):
+                janela_confirmada = await aba.menu.buscar_ativo(grupo.tag)
+            if not janela_confirmada:
+                await estabilizar(aba.page, 2, CONDICAO_JANELA_EQUIPAMENTO)
+        await self.abrir_e_salvar(aba, os_data)
+
+    async def _executar_grupo(self, aba: BrowserTab, grupo: GrupoTag, pendentes: Optional[List[OrdemServico]]):
+        """Abre uma OS por ordem pendente a partir da janela do equipamento já carregada."""
+        if not pendentes:
+            return
+
+        reabrir = False
+        for os_data in pendentes:
+            self._contador += 1
+            origem = f" | {os_data.procedencia}" if os_data.procedencia else ""
+            logger.info(f"📌 ORDEM {self._contador}/{self.total_ordens} | TAG: {os_data.tag}{origem}")
+            with contador_ida_volta.ordem(f"#{self._contador} {os_data.tag}"):
+                try:
+                    if self.perfil:
+                        await self.perfil.antes_da_ordem(self._contador, aba.page)
+                    descricao = f"Ordem {self._contador} ({os_data.tag})"
+                    inicio = time.perf_counter()
+                    await self._com_prazo(aba, descricao, self._processar_ordem(aba, grupo, os_data, reabrir))
+                    self.metricas.registrar_duracao(categoria_ordem(os_data), time.perf_counter() - inicio)
+                    reabrir = False
+                except Exception as e_os:
+                    await self.tratar_erro(aba, os_data.tag, e_os, [os_data])
+                    reabrir = True
+                finally:
+                    if self.perfil:
+                        await self.perfil.depois_da_ordem(self._contador)
+
+    def _log_cabecalho(self, num_grupo: int, total: int, grupo: GrupoTag):
+        logger.info(f"\n{'─' * 80}")
+        logger.info(f"🏷️ GRUPO {num_grupo}/{total} | TAG: {grupo.tag} | {len(grupo.ordens)} ordem(ns)")
+        logger.info(f"{'─' * 80}")
+
+    async def executar_sequencial(self, aba: BrowserTab, grupos: Sequence[GrupoTag]):
+        """Uma aba, um grupo por vez."""
+        for i, grupo in enumerate(grupos):
+            self._log_cabecalho(i + 1, len(grupos), grupo)
+
+            pendentes = await self._preparar_seguro(aba, grupo)
+            await self._executar_grupo(aba, grupo, pendentes)
+
+            # Pequena pausa entre iterações para estabilidade do sistema
+            await estabilizar(aba.page, 0.5)
+
+    async def executar_pipeline(self, aba_a: BrowserTab, aba_b: BrowserTab, grupos: Sequence[GrupoTag]):
+        """
+        Pipeline em duas abas do mesmo contexto autenticado: enquanto uma aba abre,
+        preenche e salva as ordens do grupo N, a outra já busca o equipamento do grupo
+        N+1 (incluindo a varredura de desativação). Os papéis se invertem a cada grupo.
+        """
+        if not grupos:
+            return
+
+        atual, proxima = aba_a, aba_b
+        preparo = asyncio.create_task(self._preparar_seguro(atual, grupos[0]))
+
+        for i, grupo in enumerate(grupos):
+            pendentes = await preparo
+            self._log_cabecalho(i + 1, len(grupos), grupo)
+
+            # Dispara o preparo do próximo grupo na outra aba antes do salvamento deste
+            if i + 1 < len(grupos):
+                preparo = asyncio.create_task(self._preparar_seguro(proxima, grupos[i + 1]))
+
+            await self._executar_grupo(atual, grupo, pendentes)
+
+            atual, proxima = proxima, atual
+
+    def relatorio_final(self, total: int):
+        stats = self.stats
+        logger.info(f"\n{'=' * 80}")
+        logger.info("📋 RELATÓRIO FINAL DE EXECUÇÃO")
+        logger.info(f"{'=' * 80}")
+        logger.success(f"✅ Ordens Processadas com Sucesso: {stats['sucesso']}")
+        logger.warning(f"⏭️ Ordens Puladas (Duplicidade):  {stats['pulado']}")
+        logger.error(f"❌ Ordens com Falha:               {stats['falha']}")
+        logger.info(f"📊 Total Processado:                {stats['sucesso'] + stats['pulado'] + stats['falha']}/{total}")
+        estabilizacao.log_resumo()
+        registro_seletores.log_resumo()
+        if self.cache_desativacao:
+            self.cache_desativacao.log_resumo()
+        if contador_ida_volta.ativo:
+            contador_ida_volta.log_resumo()
+            caminho = contador_ida_volta.salvar_csv(caminho_perfil(settings.LOGS_DIR, "ida_volta", "csv"))
+            logger.info(f"🔁 Tabela de chamadas por ordem: {caminho}")
+        if self.estouros_prazo:
+            logger.warning(f"⏰ Prazo por ordem ({self.prazo_ordem_s:.0f}s) esgotado {sum(self.estouros_prazo.values())}x, por passo: {self.estouros_prazo}")
+        if self.admissao:
+            logger.info(f"🚦 Limite de concorrência efetivo ao final: {self.admissao.limite} (taxa de erro {self.admissao.taxa_erro:.0%})")
+        logger.info(f"{'=' * 80}")
+
+        if stats['falha'] == 0:
+            logger.success("🎉 Automação concluída SEM FALHAS!")
+        else:
+            logger.warning(f"⚠️ Automação concluída com {stats['falha']} falha(s). Verifique os logs.")
@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence
+from loguru import logger
+from src.models import OrdemServico
+
+CHAVE_DUPLICIDADE_PADRAO = ["tag", "tipo_ordem", "data_inicio", "hora_inicio"]
+ORDENACAO_PADRAO = ["tipo_oficina", "tipo_ordem"]
+
+
+def is_desativacao(os_data: OrdemServico) -> bool:
+    return (
+        "DESATIV" in str(os_data.tipo_ordem).upper() or
+        "DESATIV" in str(os_data.tipo_oficina).upper()
+    )
+
+
+def is_fechamento_now(os_data: OrdemServico) -> bool:
+    """Fechamento 'NOW': o formulário usa o botão Agora em vez da data."""
+    return isinstance(os_data.data_fechamento, str) and os_data.data_fechamento.strip().upper() == "NOW"
+
+
+@dataclass
+class GrupoTag:
+    """Ordens de um mesmo equipamento: a janela do ativo é aberta uma única vez."""
+    tag: str
+    ordens: List[OrdemServico] = field(default_factory=list)
+
+    @property
+    def tem_desativacao(self) -> bool:
+        return any(is_desativacao(o) for o in self.ordens)
+
+
+@dataclass
+class Duplicata:
+    ordem: OrdemServico
+    motivo: str
+
+
+@dataclass
+class PlanoExecucao:
+    total_linhas: int
+    grupos: List[GrupoTag]
+    duplicatas: List[Duplicata]
+
+    @property
+    def total_ordens(self) -> int:
+        return sum(len(g.ordens) for g in self.grupos)
+
+    def ordens(self) -> List[OrdemServico]:
+        """Ordens na sequência de execução planejada."""
+        return [o for g in self.grupos for o in g.ordens]
+
+    def log_resumo(self):
+        logger.info(f"\n{'=' * 80}")
+        logger.info("🗺️ PLANO DE EXECUÇÃO")
+        logger.info(f"{'=' * 80}")
+        logger.info(f"📄 Linhas carregadas:       {self.total_linhas}")
+        logger.info(f"🏷️ Grupos (equipamentos):   {len(self.grupos)}")
+        logger.info(f"📌 Ordens a executar:       {self.total_ordens}")
+        logger.info(f"🗑️ Duplicatas removidas:    {len(self.duplicatas)}")
+        for dup in self.duplicatas:
+            logger.warning(f"   - {dup.ordem.tag}: {dup.motivo}")
+        logger.info(f"{'=' * 80}")
+
+
+def _normalizar(valor) -> str:
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return str(valor).strip().upper() if valor is not None else ""
+
+
+def chave_ordem(os_data: OrdemServico, campos: Sequence[str]) -> tuple:
+    return tuple(_normalizar(getattr(os_data, campo, None)) for campo in campos)
+
+
+def _chave_ordenacao(os_data: OrdemServico, campos: Sequence[str]) -> tuple:
+    # Desativação por último: as demais OS do equipamento entram antes de ele ser desativado
+    return (is_desativacao(os_data),) + chave_ordem(os_data, campos)
+
+
+def planejar_execucao(
+    ordens: Iterable[OrdemServico],
+    campos_chave: Optional[Sequence[str]] = None,
+    ordenar_por: Optional[Sequence[str]] = None,
+) -> PlanoExecucao:
+    """
+    Monta o plano antes da execução:
+    1. Remove duplicatas na planilha pela chave configurável e, pela regra absoluta,
+       qualquer segunda desativação da mesma TAG.
+    2. Agrupa por TAG (uma busca/janela de equipamento por grupo).
+    3. Ordena ordens e grupos para minimizar trocas de estado do formulário (ex.: oficina).
+    A ordem original da planilha é preservada em caso de empate.
+    """
+    campos_chave = list(campos_chave or CHAVE_DUPLICIDADE_PADRAO)
+    ordenar_por = list(ordenar_por or ORDENACAO_PADRAO)
+
+    total_linhas = 0
+    vistas: set[tuple] = set()
+    tags_desativadas: set[str] = set()
+    duplicatas: List[Duplicata] = []
+    grupos: dict[str, GrupoTag] = {}
+
+    for os_data in ordens:
+        total_linhas += 1
+
+        chave = chave_ordem(os_data, campos_chave)
+        if chave in vistas:
+            duplicatas.append(Duplicata(os_data, f"mesma chave ({', '.join(campos_chave)})"))
+            continue
+
+        if is_desativacao(os_data):
+            if os_data.tag in tags_desativadas:
+                duplicatas.append(Duplicata(os_data, "segunda desativação da mesma TAG na planilha"))
+                continue
+            tags_desativadas.add(os_data.tag)
+
+        vistas.add(chave)
+        grupos.setdefault(os_data.tag, GrupoTag(tag=os_data.tag)).ordens.append(os_data)
+
+    for grupo in grupos.values():
+        grupo.ordens.sort(key=lambda o: _chave_ordenacao(o, ordenar_por))
+
+    grupos_ordenados = sorted(grupos.values(), key=lambda g: chave_ordem(g.ordens[0], ordenar_por))
+
+    return PlanoExecucao(total_linhas=total_linhas, grupos=grupos_ordenados, duplicatas=duplicatas)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+from src.core.animations import CONDICAO_JANELA_EQUIPAMENTO, CONDICAO_JANELAS_LIMPAS, estabilizar
+from src.models import OrdemServico
+from src.services.planner import PlanoExecucao
+from src.services.watcher import hash_ordem
+
+# Estados do diário (o último registro de cada ordem vale)
+SALVAR_CLICADO = "salvar_clicado"
+CONCLUIDA = "concluida"
+RECONCILIADA = "reconciliada"
+REENFILEIRADA = "reenfileirada"
+
+HORA = re.compile(r"\b\d{2}:\d{2}\b")
+
+
+def _sem_acento(texto: str) -> str:
+    return unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii").upper()
+
+
+def _data(valor) -> str:
+    return valor.strftime("%d/%m/%Y") if hasattr(valor, "strftime") else str(valor)
+
+
+def _hora(valor) -> str:
+    return valor.strftime("%H:%M") if hasattr(valor, "strftime") else str(valor)[:5]
+
+
+class DiarioOrdens:
+    """
+    Diário JSONL (append-only) do estado de cada ordem, chaveado pelo hash do conteúdo
+    da linha. `salvar_clicado` é gravado (com fsync) imediatamente antes do clique em
+    Salvar e `concluida` ao fim da OS: se o processo ou o navegador morrer entre os dois,
+    a ordem fica incerta e é reconciliada na próxima execução.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._ultimo: Dict[str, dict] = {}
+        linhas = 0
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        continue  # linha truncada por uma queda no meio da escrita
+                    linhas += 1
+                    self._ultimo[registro["hash"]] = registro
+        if linhas > 2 * len(self._ultimo) + 1000:
+            self._compactar()
+
+    def _compactar(self):
+        """Reescreve o diário só com o último estado de cada ordem."""
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in self._ultimo.values())
+        os.replace(temporario, self.caminho)
+
+    def registrar(self, os_data: OrdemServico, estado: str, **extras) -> dict:
+        registro = {
+            "hash": hash_ordem(os_data),
+            "estado": estado,
+            "instante": time.time(),
+            "tag": os_data.tag,
+            "tipo_ordem": os_data.tipo_ordem,
+            "data_inicio": _data(os_data.data_inicio),
+            "hora_inicio": _hora(os_data.hora_inicio),
+            **extras,
+        }
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._ultimo[registro["hash"]] = registro
+        return registro
+
+    def estado(self, os_data: OrdemServico) -> Optional[str]:
+        registro = self._ultimo.get(hash_ordem(os_data))
+        return registro["estado"] if registro else None
+
+    def incertas(self) -> Dict[str, dict]:
+        """Ordens cujo último estado é 'Salvar clicado, sem confirmação'."""
+        return {h: r for h, r in self._ultimo.items() if r["estado"] == SALVAR_CLICADO}
+
+
+def casar_historico(linhas: List[str], ordens: List[OrdemServico]) -> Dict[int, str]:
+    """
+    Casa ordens com linhas do histórico do equipamento: a linha precisa conter a data de
+    início e o tipo da ordem (sem acento/caixa) e, se mostrar horários, a hora de início.
+    Cada linha confirma no máximo uma ordem. Retorna {índice da ordem: linha}.
+    """
+    normalizadas = [_sem_acento(linha) for linha in linhas]
+    usadas = set()
+    casadas = {}
+    for i, os_data in enumerate(ordens):
+        data, tipo, hora = _data(os_data.data_inicio), _sem_acento(os_data.tipo_ordem), _hora(os_data.hora_inicio)
+        for j, linha in enumerate(normalizadas):
+            if j in usadas or data not in linha or tipo not in linha:
+                continue
+            horas = HORA.findall(linha)
+            if horas and hora not in horas:
+                continue
+            usadas.add(j)
+            casadas[i] = linhas[j]
+            break
+    return casadas
+
+
+@dataclass
+class ResultadoReconciliacao:
+    salvas: List[OrdemServico] = field(default_factory=list)
+    reenfileiradas: List[OrdemServico] = field(default_factory=list)
+    nao_verificadas: List[OrdemServico] = field(default_factory=list)
+    fora_do_plano: int = 0
+
+    def log_resumo(self):
+        logger.info(
+            f"🧾 Reconciliação: {len(self.salvas)} já salva(s), {len(self.reenfileiradas)} reenfileirada(s), "
+            f"{len(self.nao_verificadas)} sem verificação"
+        )
+        for os_data in self.nao_verificadas:
+            logger.error(f"   ❌ {os_data.tag}: histórico não lido, ordem fica fora desta execução (continua incerta)")
+        if self.fora_do_plano:
+            logger.warning(f"⚠️ {self.fora_do_plano} ordem(ns) incerta(s) do diário não estão nesta planilha")
+
+
+async def _reconciliar_tag(aba, tag: str, ordens: List[OrdemServico], diario: DiarioOrdens, resultado: ResultadoReconciliacao):
+    try:
+        await aba.equipamento.fechar_janela()
+        await estabilizar(aba.page, 1, CONDICAO_JANELAS_LIMPAS)
+        if not await aba.menu.buscar_ativo(tag):
+            await estabilizar(aba.page, 2, CONDICAO_JANELA_EQUIPAMENTO)
+        linhas = await aba.equipamento.ler_historico()
+    except Exception as e:
+        logger.error(f"❌ Reconciliação de {tag} (aba {aba.nome}) falhou: {e}")
+        resultado.nao_verificadas.extend(ordens)
+        return
+
+    casadas = casar_historico(linhas, ordens)
+    for i, os_data in enumerate(ordens):
+        if i in casadas:
+            logger.success(f"🧾 {tag}: OS encontrada no histórico ('{casadas[i][:80]}'). Marcada como salva.")
+            diario.registrar(os_data, RECONCILIADA, evidencia=casadas[i][:200])
+            resultado.salvas.append(os_data)
+        else:
+            logger.info(f"🧾 {tag}: OS não consta no histórico ({len(linhas)} linha(s)). Reenfileirada.")
+            diario.registrar(os_data, REENFILEIRADA)
+            resultado.reenfileiradas.append(os_data)
+
+    try:
+        await aba.equipamento.fechar_janela()
+        await estabilizar(aba.page, 1, CONDICAO_JANELAS_LIMPAS)
+    except Exception as e:
+        logger.debug(f"Falha ao fechar o equipamento após a reconciliação: {e}")
+
+
+async def reconciliar(
+    plano: PlanoExecucao,
+    diario: DiarioOrdens,
+    abas: list,
+    nova_aba: Optional[Callable[[], Awaitable]] = None,
+    max_abas: int = 1,
+) -> ResultadoReconciliacao:
+    """
+    Antes das ordens: confere no histórico do equipamento cada ordem do plano que ficou
+    incerta numa execução anterior, uma TAG por aba em paralelo (abrindo até `max_abas`
+    com `nova_aba`; as abas extras ficam em `abas`). Salvas e não verificadas saem do
+    plano; as que não constam no histórico seguem para execução normal.
+    """
+    resultado = ResultadoReconciliacao()
+    incertas = diario.incertas()
+    if not incertas:
+        return resultado
+
+    por_tag: Dict[str, List[OrdemServico]] = {}
+    encontradas = set()
+    for os_data in plano.ordens():
+        h = hash_ordem(os_data)
+        if h in incertas:
+            encontradas.add(h)
+            por_tag.setdefault(os_data.tag, []).append(os_data)
+    resultado.fora_do_plano = len(incertas) - len(encontradas)
+    if not por_tag:
+        resultado.log_resumo()
+        return resultado
+
+    while nova_aba and len(abas) < min(max_abas, len(por_tag)):
+        abas.append(await nova_aba())
+    logger.info(f"🧾 {sum(map(len, por_tag.values()))} ordem(ns) com salvamento incerto em {len(por_tag)} equipamento(s). Reconciliando em {len(abas)} aba(s)...")
+    fila: asyncio.Queue = asyncio.Queue()
+    for item in por_tag.items():
+        fila.put_nowait(item)
+
+    async def trabalhador(aba):
+        while not fila.empty():
+            tag, ordens = fila.get_nowait()
+            await _reconciliar_tag(aba, tag, ordens, diario, resultado)
+
+    await asyncio.gather(*(trabalhador(aba) for aba in abas))
+
+    retiradas = {id(o) for o in resultado.salvas + resultado.nao_verificadas}
+    for grupo in plano.grupos:
+        grupo.ordens = [o for o in grupo.ordens if id(o) not in retiradas]
+    plano.grupos = [g for g in plano.grupos if g.ordens]
+    resultado.log_resumo()
+    return resultado
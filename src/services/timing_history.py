@@ -0,0 +1,256 @@
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from src.models import OrdemServico
+from src.services.planner import PlanoExecucao, is_desativacao, is_fechamento_now
+
+# Execuções mais recentes consideradas na previsão
+MAX_EXECUCOES = 30
+
+PREPARO = "preparo"
+PREPARO_DESATIVACAO = "preparo_desativacao"
+
+
+def categoria_ordem(os_data: OrdemServico) -> str:
+    """normal | desativacao, com sufixo _now quando o fechamento é pelo botão Agora."""
+    base = "desativacao" if is_desativacao(os_data) else "normal"
+    return f"{base}_now" if is_fechamento_now(os_data) else base
+
+
+def contar_desativacoes(plano: PlanoExecucao, tags_desativadas: Iterable[str] = ()) -> Tuple[int, int]:
+    """(desativações a verificar no histórico, desativações de TAGs já conhecidas como desativadas)."""
+    desativadas = {t.strip().upper() for t in tags_desativadas}
+    conhecidas = a_verificar = 0
+    for os_data in plano.ordens():
+        if is_desativacao(os_data):
+            if os_data.tag.strip().upper() in desativadas:
+                conhecidas += 1
+            else:
+                a_verificar += 1
+    return a_verificar, conhecidas
+
+
+def _formatar(segundos: float) -> str:
+    horas, resto = divmod(int(round(segundos)), 3600)
+    return f"{horas}h{resto // 60:02d}min" if horas else f"{resto // 60}min{resto % 60:02d}s"
+
+
+@dataclass
+class PrevisaoExecucao:
+    """Duração prevista de um plano a partir do histórico de execuções."""
+    ordens: int
+    grupos: int
+    mix: Dict[str, int]
+    puladas_esperadas: float
+    inicializacao_s: float
+    trabalho_s: float
+    execucoes_base: int
+    detalhe: Dict[str, float] = field(default_factory=dict)
+    pipeline: bool = False
+
+    @property
+    def segundos_por_ordem(self) -> float:
+        return self.trabalho_s / self.ordens if self.ordens else 0.0
+
+    def duracao_s(self, workers: int = 1) -> float:
+        """Inicialização + trabalho dividido entre `workers` sessões independentes."""
+        return self.inicializacao_s + self.trabalho_s / max(workers, 1)
+
+    def workers_para(self, meta_s: float) -> Optional[int]:
+        """Menor número de workers que termina dentro de `meta_s` (None se nem a inicialização cabe)."""
+        disponivel = meta_s - self.inicializacao_s
+        if disponivel <= 0:
+            return None
+        return max(1, math.ceil(self.trabalho_s / disponivel))
+
+    def como_dict(self) -> dict:
+        return {
+            "ordens": self.ordens,
+            "grupos": self.grupos,
+            "mix": self.mix,
+            "puladas_esperadas": round(self.puladas_esperadas, 1),
+            "inicializacao_s": round(self.inicializacao_s, 1),
+            "trabalho_s": round(self.trabalho_s, 1),
+            "segundos_por_ordem": round(self.segundos_por_ordem, 2),
+            "execucoes_base": self.execucoes_base,
+            "pipeline": self.pipeline,
+            "detalhe": {k: round(v, 2) for k, v in self.detalhe.items()},
+        }
+
+    def log(self, workers: int = 1, meta_s: Optional[float] = None):
+        modo = "pipeline" if self.pipeline else "sequencial"
+        logger.info(f"🔮 Previsão ({self.execucoes_base} execução(ões) no histórico, modo {modo}):")
+        logger.info(
+            f"   {self.ordens} ordem(ns) em {self.grupos} grupo(s) | mix: "
+            + ", ".join(f"{n} {categoria}" for categoria, n in sorted(self.mix.items()))
+        )
+        logger.info(f"   Desativações a pular (duplicidade esperada): {self.puladas_esperadas:.0f}")
+        logger.info(
+            f"   Duração com {workers} worker(s): {_formatar(self.duracao_s(workers))} "
+            f"(inicialização {_formatar(self.inicializacao_s)}, ~{self.segundos_por_ordem:.1f}s por ordem)"
+        )
+        if meta_s is not None:
+            necessarios = self.workers_para(meta_s)
+            if necessarios is None:
+                logger.warning(f"   ⚠️ Meta de {_formatar(meta_s)} menor que a inicialização")
+            elif necessarios <= workers:
+                logger.success(f"   ✅ Cabe na meta de {_formatar(meta_s)} com {workers} worker(s)")
+            else:
+                logger.warning(f"   ⚠️ Para caber em {_formatar(meta_s)} são necessários {necessarios} worker(s)")
+
+
+class HistoricoTempos:
+    """
+    Histórico local (JSONL, uma linha por execução) das durações por ordem, por
+    preparo de grupo e por fase. Alimenta a previsão de duração de uma planilha
+    antes da execução e o ponto de partida do ETA ao vivo.
+    """
+
+    def __init__(self, caminho: str, max_execucoes: int = MAX_EXECUCOES):
+        self.caminho = caminho
+        self.max_execucoes = max_execucoes
+        self.execucoes: List[dict] = []
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        self.execucoes.append(json.loads(linha))
+                    except ValueError:
+                        continue
+        self.execucoes = self.execucoes[-max_execucoes:]
+
+    def __len__(self) -> int:
+        return len(self.execucoes)
+
+    def registrar(
+        self,
+        metricas,
+        desativacoes: int = 0,
+        puladas: int = 0,
+        inicializacao_s: Optional[float] = None,
+        workers: int = 1,
+        parede_s: Optional[float] = None,
+        pipeline: bool = False,
+    ) -> dict:
+        """
+        Grava a execução (durações somadas por categoria e por fase) no histórico.
+        `desativacoes`/`puladas` contam só as desativações verificadas no histórico do
+        equipamento (as já conhecidas pelo cache não entram na taxa de duplicidade).
+        `parede_s` é o tempo de relógio das ordens: no pipeline o preparo do próximo
+        grupo corre junto da ordem atual, e a soma das durações passa do tempo real.
+        """
+        execucao = {
+            "instante": time.time(),
+            "workers": workers,
+            "pipeline": pipeline,
+            "inicializacao_s": inicializacao_s,
+            "parede_s": parede_s,
+            "ordens": dict(metricas.contadores),
+            "desativacoes": desativacoes,
+            "puladas": puladas,
+            "duracoes": {nome: [h.soma, h.total] for nome, h in metricas.duracoes.items()},
+            "fases": {nome: [h.soma, h.total] for nome, h in metricas.latencias.items()},
+        }
+        self.execucoes = (self.execucoes + [execucao])[-self.max_execucoes:]
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in self.execucoes)
+        os.replace(temporario, self.caminho)
+        logger.debug(f"⏱️ Execução gravada no histórico de tempos ({len(self.execucoes)} no total)")
+        return execucao
+
+    def _medias(self) -> Dict[str, float]:
+        somas: Dict[str, List[float]] = {}
+        for execucao in self.execucoes:
+            for nome, (soma, total) in execucao.get("duracoes", {}).items():
+                acumulado = somas.setdefault(nome, [0.0, 0])
+                acumulado[0] += soma
+                acumulado[1] += total
+        return {nome: soma / total for nome, (soma, total) in somas.items() if total}
+
+    def _custo_ordem(self, medias: Dict[str, float], categoria: str) -> Optional[float]:
+        """Média da categoria; senão a da mesma categoria com/sem o _now; senão a média das ordens."""
+        base = categoria.replace("_now", "")
+        for candidata in (categoria, base, f"{base}_now"):
+            if candidata in medias:
+                return medias[candidata]
+        ordens = [v for k, v in medias.items() if not k.startswith(PREPARO)]
+        return sum(ordens) / len(ordens) if ordens else None
+
+    def fator_paralelismo(self, pipeline: bool = False) -> float:
+        """
+        Tempo de relógio ÷ soma das durações (preparos + ordens) nas execuções do mesmo
+        modo. Perto de 1 no modo sequencial; abaixo de 1 no pipeline, onde o preparo se
+        sobrepõe às ordens. 1.0 se o modo ainda não tiver execução com tempo de relógio.
+        """
+        parede = soma = 0.0
+        for execucao in self.execucoes:
+            if execucao.get("parede_s") is None or bool(execucao.get("pipeline")) != pipeline:
+                continue
+            parede += execucao["parede_s"]
+            soma += sum(s for s, _ in execucao.get("duracoes", {}).values())
+        return parede / soma if parede and soma else 1.0
+
+    def taxa_pulo_desativacao(self) -> float:
+        """Fração das desativações puladas por duplicidade nas execuções anteriores."""
+        desativacoes = sum(e.get("desativacoes", 0) for e in self.execucoes)
+        puladas = sum(e.get("puladas", 0) for e in self.execucoes)
+        return min(puladas / desativacoes, 1.0) if desativacoes else 0.0
+
+    def prever(
+        self, plano: PlanoExecucao, tags_desativadas: Iterable[str] = (), pipeline: bool = False
+    ) -> Optional[PrevisaoExecucao]:
+        """
+        Soma o custo histórico de cada grupo (preparo, com ou sem varredura de
+        desativação) e de cada ordem pela sua categoria. Desativações de TAGs já
+        conhecidas como desativadas não custam nada; as demais são puladas na taxa
+        histórica. A soma é convertida em tempo de relógio pelo `fator_paralelismo`
+        do modo (sequencial ou pipeline). None se ainda não houver histórico de ordens.
+        """
+        medias = self._medias()
+        if self._custo_ordem(medias, "normal") is None:
+            return None
+
+        desativadas = {t.strip().upper() for t in tags_desativadas}
+        taxa_pulo = self.taxa_pulo_desativacao()
+        preparo = medias.get(PREPARO, 0.0)
+        preparo_desativacao = medias.get(PREPARO_DESATIVACAO, preparo)
+
+        mix: Dict[str, int] = {}
+        detalhe = {"preparo": 0.0, "ordens": 0.0}
+        puladas = 0.0
+        for grupo in plano.grupos:
+            conhecida = grupo.tag.strip().upper() in desativadas
+            restantes = [o for o in grupo.ordens if not (conhecida and is_desativacao(o))]
+            puladas += len(grupo.ordens) - len(restantes)
+            if restantes:
+                varre = grupo.tem_desativacao and not conhecida
+                detalhe["preparo"] += preparo_desativacao if varre else preparo
+            for os_data in grupo.ordens:
+                categoria = categoria_ordem(os_data)
+                mix[categoria] = mix.get(categoria, 0) + 1
+            for os_data in restantes:
+                custo = self._custo_ordem(medias, categoria_ordem(os_data))
+                if is_desativacao(os_data):
+                    puladas += taxa_pulo
+                    custo *= 1 - taxa_pulo
+                detalhe["ordens"] += custo
+
+        fator = self.fator_paralelismo(pipeline)
+        inicializacoes = [e["inicializacao_s"] for e in self.execucoes if e.get("inicializacao_s")]
+        return PrevisaoExecucao(
+            ordens=plano.total_ordens,
+            grupos=len(plano.grupos),
+            mix=mix,
+            puladas_esperadas=puladas,
+            inicializacao_s=sum(inicializacoes) / len(inicializacoes) if inicializacoes else 0.0,
+            trabalho_s=(detalhe["preparo"] + detalhe["ordens"]) * fator,
+            execucoes_base=len(self.execucoes),
+            detalhe={**detalhe, "fator_paralelismo": fator},
+            pipeline=pipeline,
+        )
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+from loguru import logger
+from src.models import OrdemServico
+from src.services.order_batch import materializar
+
+EXTENSOES_ENTRADA = (".xlsx", ".csv", ".parquet")
+
+
+def hash_ordem(os_data: OrdemServico) -> str:
+    """Hash do conteúdo normalizado da linha (após os validadores do modelo), sem a procedência."""
+    conteudo = materializar(os_data).model_dump(mode="json", exclude={"procedencia"})
+    return hashlib.sha256(json.dumps(conteudo, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class RegistroLinhas:
+    """
+    Conjunto persistente (append-only, um hash por linha) das linhas já concluídas
+    (sucesso ou pulada). Falhas não entram: voltam a ser enfileiradas no próximo arquivo.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._hashes: Set[str] = set()
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                self._hashes = {linha.strip() for linha in f if linha.strip()}
+        logger.debug(f"Registro de linhas carregado: {len(self._hashes)} hash(es) em {caminho}")
+
+    def __contains__(self, hash_linha: str) -> bool:
+        return hash_linha in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def marcar(self, hashes: Iterable[str]):
+        novos = [h for h in hashes if h not in self._hashes]
+        if not novos:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.writelines(f"{h}\n" for h in novos)
+        self._hashes.update(novos)
+
+    def filtrar_novas(self, ordens: Iterable[OrdemServico]) -> List[OrdemServico]:
+        """Mantém só as linhas nunca concluídas (e a primeira ocorrência dentro do arquivo)."""
+        novas, vistas = [], set()
+        for os_data in ordens:
+            h = hash_ordem(os_data)
+            if h in self._hashes or h in vistas:
+                continue
+            vistas.add(h)
+            novas.append(os_data)
+        return novas
+
+
+def arquivar(caminho: str, pasta_arquivo: str) -> str:
+    """Move o arquivo processado para a pasta de arquivo com prefixo de data/hora."""
+    os.makedirs(pasta_arquivo, exist_ok=True)
+    destino = os.path.join(pasta_arquivo, f"{datetime.now():%Y%m%d_%H%M%S}_{os.path.basename(caminho)}")
+    shutil.move(caminho, destino)
+    logger.info(f"🗄️ Arquivo arquivado: {destino}")
+    return destino
+
+
+def assinatura_arquivo(caminho: str) -> Optional[Tuple[int, float]]:
+    """(tamanho, mtime) do arquivo, ou None se ele não existir mais."""
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return estado.st_size, estado.st_mtime
+
+
+def reservar(caminho: str, assinatura: Optional[tuple], pasta_processando: str) -> Optional[str]:
+    """
+    Move o arquivo enfileirado para a pasta de processamento, mas só se ele ainda for a
+    versão vista pelo vigia (mesma assinatura). Uma versão mais nova re-depositada no
+    meio tempo fica na entrada e é enfileirada por conta própria. Retorna o novo caminho
+    (o único que será lido e arquivado) ou None.
+    """
+    atual = assinatura_arquivo(caminho)
+    if atual is None:
+        logger.info(f"ℹ️ {os.path.basename(caminho)} já não está na entrada (versão já reservada)")
+        return None
+    if assinatura is not None and tuple(assinatura) != atual:
+        logger.info(f"ℹ️ {os.path.basename(caminho)} mudou desde a detecção: aguardando a nova versão estabilizar")
+        return None
+    os.makedirs(pasta_processando, exist_ok=True)
+    destino = os.path.join(pasta_processando, f"{datetime.now():%Y%m%d_%H%M%S_%f}_{os.path.basename(caminho)}")
+    os.replace(caminho, destino)
+    return destino
+
+
+def listar_entradas(pasta: str) -> List[str]:
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(
+        os.path.join(pasta, nome)
+        for nome in os.listdir(pasta)
+        # "~$" = arquivo de bloqueio do Excel com a planilha aberta
+        if nome.lower().endswith(EXTENSOES_ENTRADA) and not nome.startswith("~$")
+    )
+
+
+async def vigiar_pasta(pasta: str, fila: asyncio.Queue, intervalo: float = 5.0):
+    """
+    Varre `pasta` periodicamente e enfileira (caminho, assinatura) de cada arquivo novo
+    quando ele estabiliza (mesmo tamanho e mtime em duas varreduras seguidas, ou seja,
+    terminou de ser copiado). O consumidor confere a assinatura com `reservar`.
+    """
+    logger.info(f"👀 Vigiando {pasta} (a cada {intervalo:.0f}s)...")
+    assinaturas: dict[str, tuple] = {}
+    enfileirados: Set[tuple] = set()
+
+    while True:
+        atuais = {}
+        for caminho in listar_entradas(pasta):
+            assinatura = assinatura_arquivo(caminho)
+            if assinatura is None:
+                continue
+            atuais[caminho] = assinatura
+
+            if assinaturas.get(caminho) == assinatura and (caminho, assinatura) not in enfileirados:
+                enfileirados.add((caminho, assinatura))
+                logger.info(f"📥 Novo arquivo detectado: {os.path.basename(caminho)}")
+                await fila.put((caminho, assinatura))
+
+        # Arquivo reservado (saiu da entrada): a mesma versão re-depositada volta a valer
+        enfileirados = {item for item in enfileirados if item[0] in atuais}
+        assinaturas = atuais
+        await asyncio.sleep(intervalo)
@@ -1,5 +1,8 @@
+import asyncio
 import time
+from contextlib import asynccontextmanager
 from functools import wraps
+from loguru import logger
 
 def time_execution(func):
     @wraps(func)
@@ -10,3 +13,72 @@ def time_execution(func):
         print(f"{func.__name__} took {end - start:.2f} seconds")
         return result
     return wrapper
+
+
+class LinhaDoTempo:
+    """
+    Linha do tempo da inicialização: etapas concorrentes (planilha, navegador, login)
+    com início/fim relativos ao começo da execução, e marcos pontuais (ex.: primeira OS).
+    """
+
+    def __init__(self):
+        self._inicio = time.monotonic()
+        self.etapas = {}
+        self.marcos = {}
+
+    def agora(self) -> float:
+        return time.monotonic() - self._inicio
+
+    @asynccontextmanager
+    async def etapa(self, nome: str):
+        inicio = self.agora()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = (inicio, self.agora())
+
+    def marcar(self, nome: str):
+        """Registra o marco na primeira vez (as seguintes são ignoradas)."""
+        if nome not in self.marcos:
+            self.marcos[nome] = self.agora()
+            logger.info(f"⏱️ {nome} em {self.marcos[nome]:.1f}s")
+
+    def log_resumo(self, largura: int = 40):
+        if not self.etapas:
+            return
+        total = max([fim for _, fim in self.etapas.values()] + list(self.marcos.values()))
+        escala = largura / total if total else 0
+        logger.info(f"⏱️ Linha do tempo da inicialização ({total:.1f}s):")
+        for nome, (inicio, fim) in sorted(self.etapas.items(), key=lambda item: item[1][0]):
+            barra = " " * int(inicio * escala) + "█" * max(1, int((fim - inicio) * escala))
+            logger.info(f"   {nome:<12} {barra:<{largura}} {inicio:>5.1f}s → {fim:>5.1f}s")
+        for nome, instante in self.marcos.items():
+            logger.info(f"   {nome:<12} {' ' * int(instante * escala)}▲ {instante:.1f}s")
+        sequencial = sum(fim - inicio for inicio, fim in self.etapas.values())
+        if sequencial > total:
+            logger.info(f"   Sobreposição economizou {sequencial - total:.1f}s (sequencial: {sequencial:.1f}s)")
+
+
+async def aguardar_entrada_e_sessao(entrada: asyncio.Task, sessao: asyncio.Task):
+    """
+    Espera a entrada (planilha) e a sessão (navegador + login) iniciadas em paralelo.
+    Assim que a entrada termina com erro ou vazia (None), a sessão ainda em andamento é
+    cancelada e aguardada: nenhum login é concluído à toa. Se a sessão falhar, a entrada
+    é cancelada. Retorna (resultado da entrada, resultado da sessão) ou None.
+    """
+    pendentes = {entrada, sessao}
+    while pendentes:
+        _, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+        if entrada.done() and (entrada.cancelled() or entrada.exception() or entrada.result() is None):
+            sessao.cancel()
+            await asyncio.gather(sessao, return_exceptions=True)
+            if not entrada.cancelled() and entrada.exception():
+                raise entrada.exception()
+            return None
+        if sessao.done() and (sessao.cancelled() or sessao.exception()):
+            entrada.cancel()  # a thread da planilha termina sozinha; o resultado é descartado
+            await asyncio.gather(entrada, return_exceptions=True)
+            if sessao.cancelled():
+                raise asyncio.CancelledError()
+            raise sessao.exception()
+    return entrada.result(), sessao.result()
@@ -0,0 +1,87 @@
+# tests/test_admission.py
+import asyncio
+import time
+import pytest
+from src.services.admission import ControleAdmissao, TokenBucket
+
+
+def test_aimd_reduz_com_latencia_e_recupera():
+    """Latência acima da tolerância corta o limite pela metade; passos saudáveis o aumentam de um em um."""
+    controle = ControleAdmissao(taxa_rps=0, limite_inicial=4, limite_max=4)
+    for _ in range(5):
+        controle.observar("preencher_salvar", 2.0)
+    assert controle.limite == 4
+
+    controle.observar("preencher_salvar", 20.0)
+    assert controle.limite == 2
+
+    # Servidor volta ao normal: a média cai e o limite sobe aditivamente
+    limites = []
+    for _ in range(20):
+        controle.observar("preencher_salvar", 2.0)
+        limites.append(controle.limite)
+    assert min(limites) >= 1 and limites[-1] == 4
+
+
+def test_aimd_reduz_com_erros_ate_o_minimo():
+    """Erros seguidos reduzem até o mínimo, respeitando o intervalo entre reduções."""
+    controle = ControleAdmissao(taxa_rps=0, limite_inicial=4, limite_min=1, limite_max=4)
+    controle.observar("busca", 1.0, erro=True)
+    assert controle.limite == 2
+    controle.observar("busca", 1.0, erro=True)
+    assert controle.limite == 2  # ainda no intervalo após a redução
+    for _ in range(4):
+        controle.observar("busca", 1.0, erro=True)
+    assert controle.limite == 1
+
+
+def test_variantes_da_busca_tem_referencias_proprias():
+    """Busca pela barra (lenta) não é comparada com a referência do acesso direto pelo índice."""
+    controle = ControleAdmissao(taxa_rps=0, limite_inicial=4, limite_max=4)
+    for _ in range(10):
+        controle.observar("busca_indice", 0.3)
+        controle.observar("busca_barra", 3.0)
+    assert controle.limite == 4
+    assert controle.referencia("busca_indice") == 0.3
+
+    misturada = ControleAdmissao(taxa_rps=0, limite_inicial=4, limite_max=4)
+    for _ in range(10):
+        misturada.observar("busca", 0.3)
+        misturada.observar("busca", 3.0)
+    assert misturada.limite < 4
+
+
+def test_slot_respeita_limite_e_conta_erro():
+    """Nunca há mais passos simultâneos que o limite; exceções alimentam a taxa de erro."""
+    async def cenario():
+        controle = ControleAdmissao(taxa_rps=0, limite_inicial=2, limite_max=2)
+        pico = 0
+
+        async def passo():
+            nonlocal pico
+            async with controle.slot("busca"):
+                pico = max(pico, controle.em_uso)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(passo() for _ in range(6)))
+        with pytest.raises(RuntimeError):
+            async with controle.slot("busca"):
+                raise RuntimeError("timeout do servidor")
+        return controle, pico
+
+    controle, pico = asyncio.run(cenario())
+    assert pico == 2
+    assert controle.em_uso == 0
+    assert controle.taxa_erro > 0
+
+
+def test_token_bucket_limita_taxa():
+    """Após a rajada, as aquisições seguem a taxa configurada."""
+    async def cenario():
+        bucket = TokenBucket(taxa=50, capacidade=2)
+        inicio = time.monotonic()
+        for _ in range(7):
+            await bucket.adquirir()
+        return time.monotonic() - inicio
+
+    assert asyncio.run(cenario()) >= 0.09
@@ -0,0 +1,51 @@
+# tests/test_animations.py
+import asyncio
+import time
+import pytest
+from src.core import animations
+from src.core.animations import CONDICAO_FORM_OS_FECHADO, Estabilizacao, estabilizar
+
+
+class PaginaFalsa:
+    """Registra as condições aguardadas; a condição 'demora' leva 20ms para se confirmar."""
+
+    def __init__(self):
+        self.condicoes = []
+
+    async def wait_for_function(self, condicao, arg=None, timeout=5000, polling=None):
+        self.condicoes.append((condicao, arg))
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+def modo(monkeypatch):
+    estado = Estabilizacao()
+    monkeypatch.setattr(animations, "estabilizacao", estado)
+    return estado
+
+
+def test_modo_normal_mantem_pausa_fixa(modo):
+    """Sem o modo sem animação, a espera continua sendo a pausa fixa."""
+    pagina = PaginaFalsa()
+    inicio = time.monotonic()
+    asyncio.run(estabilizar(pagina, 0.05, CONDICAO_FORM_OS_FECHADO))
+    assert time.monotonic() - inicio >= 0.05
+    assert pagina.condicoes == [] and modo.esperas == 0
+
+
+def test_modo_sem_animacao_usa_condicao_e_contabiliza(modo):
+    """No modo sem animação, uma condição do DOM substitui a pausa e a economia é contabilizada."""
+    modo.ativo = True
+    pagina = PaginaFalsa()
+
+    async def cenario():
+        await estabilizar(pagina, 3, CONDICAO_FORM_OS_FECHADO)
+        await estabilizar(pagina, 0.5)
+
+    inicio = time.monotonic()
+    asyncio.run(cenario())
+
+    assert time.monotonic() - inicio < 0.5
+    assert pagina.condicoes == [(CONDICAO_FORM_OS_FECHADO, None)]
+    assert modo.esperas == 2 and modo.fixo_s == 3.5
+    assert 3.0 < modo.como_dict()["economia_s"] <= 3.5
@@ -0,0 +1,80 @@
+# tests/test_asset_cache.py
+import asyncio
+from src.core.asset_cache import CacheRecursos, cacheavel
+
+URL = "https://neovero.exemplo/app/main.js"
+
+
+class RespostaFalsa:
+    def __init__(self, status, headers, corpo=b""):
+        self.status = status
+        self.headers = headers
+        self._corpo = corpo
+
+    async def body(self):
+        return self._corpo
+
+
+class RequisicaoFalsa:
+    def __init__(self, metodo="GET"):
+        self.method = metodo
+        self.url = URL
+        self.headers = {"accept": "*/*"}
+
+
+class RotaFalsa:
+    """Registra o que a rota fez; `fetch` devolve a próxima resposta do servidor simulado."""
+
+    def __init__(self, respostas, metodo="GET"):
+        self.request = RequisicaoFalsa(metodo)
+        self.respostas = list(respostas)
+        self.cabecalhos_enviados = None
+        self.resultado = None
+
+    async def fetch(self, headers=None):
+        self.cabecalhos_enviados = headers
+        return self.respostas.pop(0)
+
+    async def fulfill(self, response=None, status=None, headers=None, body=None):
+        self.resultado = ("servidor", response.status) if response else ("disco", status, body)
+
+    async def fallback(self):
+        self.resultado = ("fallback",)
+
+
+def _servir(cache, respostas, metodo="GET"):
+    rota = RotaFalsa(respostas, metodo)
+    asyncio.run(cache._interceptar(rota))
+    return rota
+
+
+def test_falta_acerto_e_revalidacao(tmp_path):
+    """1ª vez baixa e grava; depois serve do disco; vencida, revalida com ETag e aceita o 304."""
+    cache = CacheRecursos(str(tmp_path), ["**/*.js"], revalidar_s=3600)
+    original = RespostaFalsa(200, {"content-type": "text/javascript", "etag": '"v1"', "content-encoding": "gzip"}, b"x" * 100)
+
+    assert _servir(cache, [original]).resultado == ("servidor", 200)
+    rota = _servir(cache, [])
+    assert rota.resultado == ("disco", 200, b"x" * 100)
+
+    cache.revalidar_s = 0
+    rota = _servir(cache, [RespostaFalsa(304, {})])
+    assert rota.cabecalhos_enviados["if-none-match"] == '"v1"'
+    assert rota.resultado == ("disco", 200, b"x" * 100)
+    assert "content-encoding" not in cache.ler(URL)[0]["cabecalhos"]
+
+    assert cache.como_dict() == {
+        "acertos": 1, "revalidados": 1, "faltas": 1, "taxa_acerto": 0.667,
+        "bytes_economizados": 200, "bytes_baixados": 100,
+    }
+
+
+def test_nao_grava_privado_nem_post(tmp_path):
+    """Respostas no-store/com cookie não vão para o disco; métodos que não são GET seguem direto."""
+    cache = CacheRecursos(str(tmp_path), ["**/*.js"])
+    assert not cacheavel(200, {"cache-control": "no-store"})
+    assert not cacheavel(200, {"set-cookie": "sessao=1"})
+
+    _servir(cache, [RespostaFalsa(200, {"cache-control": "private"}, b"dados")])
+    assert cache.ler(URL) is None
+    assert _servir(cache, [], metodo="POST").resultado == ("fallback",)
@@ -0,0 +1,67 @@
+# tests/test_credentials.py
+import asyncio
+import json
+import pytest
+from src.core.credentials import Credencial, PoolCredenciais, carregar_credenciais
+from src.core.exceptions import CredenciaisEsgotadasError, CredenciaisNaoConfiguradasError
+
+
+def test_carrega_env_e_arquivo_sem_repetir(tmp_path):
+    """Principal + lista do .env + arquivo de segredos, sem usuários repetidos e sem expor a senha no repr."""
+    arquivo = tmp_path / "credenciais.json"
+    arquivo.write_text(json.dumps([{"usuario": "ana", "senha": "x"}, {"usuario": "bia", "senha": "y"}, {"nome": "?"}]))
+
+    credenciais = carregar_credenciais(Credencial("ana", "s0"), [{"usuario": "caio", "senha": "z"}], str(arquivo))
+
+    assert [c.usuario for c in credenciais] == ["ana", "caio", "bia"]
+    assert credenciais[0].senha == "s0"
+    assert "s0" not in repr(credenciais[0])
+
+
+def test_principal_vazia_fica_de_fora():
+    """Sem NEOVERO_USER/NEOVERO_PASS, o pool começa pela lista; sem nenhuma credencial, erro claro."""
+    credenciais = carregar_credenciais(Credencial("", ""), [{"usuario": "caio", "senha": "z"}, {"usuario": "dani", "senha": ""}])
+    assert [c.usuario for c in credenciais] == ["caio"]
+
+    with pytest.raises(CredenciaisNaoConfiguradasError):
+        carregar_credenciais(Credencial("ana", ""))
+
+
+def test_pool_respeita_sessoes_por_credencial():
+    """Cada credencial aceita N sessões; o próximo arrendamento espera uma liberação."""
+    async def cenario():
+        pool = PoolCredenciais([Credencial("ana", "1"), Credencial("bia", "2")], sessoes_por_credencial=1)
+        a = await pool.arrendar()
+        b = await pool.arrendar()
+        espera = asyncio.create_task(pool.arrendar())
+        await asyncio.sleep(0.01)
+        assert not espera.done()
+
+        await pool.liberar(a)
+        c = await asyncio.wait_for(espera, 1)
+        return a, b, c
+
+    a, b, c = asyncio.run(cenario())
+    assert {a.usuario, b.usuario} == {"ana", "bia"}
+    assert c == a
+
+
+def test_falha_de_login_nao_derruba_as_demais():
+    """Credencial recusada sai do pool; quem aguarda recebe outra ou erro quando todas falharem."""
+    async def cenario():
+        pool = PoolCredenciais([Credencial("ana", "1"), Credencial("bia", "2")])
+        ana = await pool.arrendar()
+        bia = await pool.arrendar()
+
+        await pool.marcar_falha(ana, "senha inválida")
+        await pool.liberar(ana)
+        await pool.liberar(bia)
+        assert (await pool.arrendar()).usuario == "bia"
+
+        await pool.marcar_falha(bia, "usuário bloqueado")
+        with pytest.raises(CredenciaisEsgotadasError):
+            await pool.arrendar()
+        return pool
+
+    pool = asyncio.run(cenario())
+    assert set(pool.falhas) == {"ana", "bia"}
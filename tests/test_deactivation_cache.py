@@ -0,0 +1,55 @@
+# tests/test_deactivation_cache.py
+import json
+import time
+from src.services.deactivation_cache import CacheDesativacao
+
+
+def test_positivo_e_permanente_com_primeira_evidencia(tmp_path):
+    """Um positivo sobrevive entre execuções, mantém a primeira evidência e derruba o negativo."""
+    caminho = str(tmp_path / "desativacoes.json")
+    cache = CacheDesativacao(caminho, ttl_negativo_s=600)
+    cache.registrar_negativo("tag-01")
+    cache.registrar_positivo(" TAG-01 ", "123 | DESATIVAÇÃO-INTERNA | Fechada")
+    cache.registrar_positivo("TAG-01", "outra linha")
+    cache.registrar_negativo("TAG-01")
+    cache.salvar()
+
+    reaberto = CacheDesativacao(caminho, ttl_negativo_s=600)
+    assert reaberto.positivo("tag-01")["texto"] == "123 | DESATIVAÇÃO-INTERNA | Fechada"
+    assert not reaberto.negativo_recente("TAG-01")
+    assert reaberto.positivo("TAG-02") is None
+    assert reaberto.acertos_positivos == 1
+
+
+def test_negativo_so_vale_dentro_do_ttl(tmp_path):
+    """Negativos recentes evitam a varredura; vencidos deixam de valer e saem do arquivo."""
+    caminho = str(tmp_path / "desativacoes.json")
+    cache = CacheDesativacao(caminho, ttl_negativo_s=60)
+    cache.registrar_negativo("TAG-01")
+    cache.registrar_negativo("TAG-02")
+    cache.negativos["TAG-02"] = time.time() - 120
+
+    assert cache.negativo_recente("TAG-01")
+    assert not cache.negativo_recente("TAG-02")
+
+    cache.salvar()
+    with open(caminho, encoding="utf-8") as f:
+        assert list(json.load(f)["negativos"]) == ["TAG-01"]
+
+
+def test_invalidar_descarta_o_negativo_e_persiste(tmp_path):
+    """Desativação que falhou após o Salvar derruba o negativo: a próxima tentativa varre o histórico."""
+    caminho = str(tmp_path / "desativacoes.json")
+    cache = CacheDesativacao(caminho, ttl_negativo_s=600)
+    cache.registrar_negativo("TAG-01")
+    cache.registrar_negativo("TAG-02")
+    cache.salvar()
+
+    cache.invalidar(" tag-01 ")
+    cache.invalidar("TAG-99")  # sem negativo: nada a fazer
+    assert not cache.negativo_recente("TAG-01")
+    cache.salvar()
+
+    reaberto = CacheDesativacao(caminho, ttl_negativo_s=600)
+    assert not reaberto.negativo_recente("TAG-01")
+    assert reaberto.negativo_recente("TAG-02")
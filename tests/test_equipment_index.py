@@ -0,0 +1,70 @@
+# tests/test_equipment_index.py
+import polars as pl
+from src.services.equipment_index import IndiceEquipamentos, extrair_equipamentos
+
+
+def test_extrai_so_os_equipamentos_da_resposta():
+    """Só os itens da busca contam (sem diferenciar maiúsculas); objetos aninhados e ids suspeitos ficam de fora."""
+    resposta = {
+        "itens": [
+            {"Tag": " tag-01 ", "ID": 123, "setor": {"tag": "UTI", "id": 9}},
+            {"tag": "TAG-02", "id": "abc"},
+            {"tag": "TAG-03", "id": "../admin#x"},
+            {"tag": "TAG-04", "id": True},
+        ],
+        "total": 4,
+    }
+    assert extrair_equipamentos(resposta) == {"TAG-01": "123", "TAG-02": "abc"}
+    assert extrair_equipamentos({"tag": "TAG-05", "id": 5, "ordens": [{"tag": "X", "id": 1}]}) == {"TAG-05": "5"}
+
+    # Com caminho configurado, só a lista desse caminho
+    aninhada = {"meta": {"usuario": {"tag": "LIXO", "id": 1}}, "dados": {"itens": [{"tag": "TAG-06", "id": 6}]}}
+    assert extrair_equipamentos(aninhada) == {}
+    assert extrair_equipamentos(aninhada, caminho="dados.itens") == {"TAG-06": "6"}
+
+
+def test_indice_persistente_com_link_direto(tmp_path):
+    """Entradas aprendidas sobrevivem entre execuções; a URL vem do modelo com o id."""
+    caminho = str(tmp_path / "cache" / "indice.json")
+    indice = IndiceEquipamentos(caminho, url_modelo="https://neovero/#/equipamentos/{id}")
+    indice.marcar_inexistente("TAG-99")
+    indice.aprender([{"tag": "TAG-01", "id": 7}])
+    indice.salvar()
+
+    recarregado = IndiceEquipamentos(caminho, url_modelo="https://neovero/#/equipamentos/{id}")
+    assert "tag-01" in recarregado
+    assert recarregado.url("TAG-01") == "https://neovero/#/equipamentos/7"
+    assert recarregado.verificar(["TAG-01", "TAG-02", "TAG-99", "tag-01"]) == (["TAG-01"], ["TAG-02"], ["TAG-99"])
+
+    # Encontrada depois: deixa de ser inexistente; link quebrado: sai do índice
+    recarregado.registrar("TAG-99", "8")
+    recarregado.esquecer("TAG-01")
+    assert recarregado.verificar(["TAG-01", "TAG-99"]) == (["TAG-99"], ["TAG-01"], [])
+
+
+def test_importacao_em_lote_de_exportacao(tmp_path):
+    """A exportação em CSV constrói o índice, respeitando a coluna URL quando existe."""
+    exportacao = tmp_path / "equipamentos.csv"
+    pl.DataFrame({"TAG": ["TAG-01", "TAG-02", "TAG-03", None], "Id": ["1", "2", "3", "4"], "URL": ["https://x/1", None, "javascript:x", None]}).write_csv(
+        exportacao, separator=";"
+    )
+
+    indice = IndiceEquipamentos(str(tmp_path / "indice.json"))
+    assert indice.importar_exportacao(str(exportacao)) == 3
+    assert indice.url("TAG-01") == "https://x/1"
+    assert indice.url("TAG-03") is None
+    assert indice.url("TAG-02") is None and indice.obter("TAG-02")["id"] == "2"
+
+
+def test_falhas_seguidas_persistem_ate_a_tag_ser_encontrada(tmp_path):
+    """Buscas inconclusivas são contadas entre execuções e zeradas quando a TAG aparece."""
+    caminho = str(tmp_path / "indice.json")
+    indice = IndiceEquipamentos(caminho)
+    assert indice.registrar_falha("tag-01") == 1
+    indice.salvar()
+
+    recarregado = IndiceEquipamentos(caminho)
+    assert recarregado.registrar_falha("TAG-01") == 2
+    assert recarregado.verificar(["TAG-01"]) == ([], ["TAG-01"], [])
+    recarregado.registrar("TAG-01", "1")
+    assert recarregado.falhas == {} and recarregado.registrar_falha("TAG-01") == 0
@@ -0,0 +1,62 @@
+# tests/test_har.py
+from src.core.har import redigir_har, substituir_segredos, USUARIO_REDIGIDO, SENHA_REDIGIDA, VALOR_REDIGIDO
+
+def criar_har_mock():
+    return {
+        "log": {
+            "entries": [
+                {
+                    "request": {
+                        "method": "POST",
+                        "url": "https://orbis.neovero.com/login",
+                        "headers": [
+                            {"name": "Cookie", "value": "sessao=abc123"},
+                            {"name": "Accept", "value": "text/html"},
+                        ],
+                        "cookies": [{"name": "sessao", "value": "abc123"}],
+                        "postData": {"text": "login=joao.silva&senha=p%40ss+w0rd", "mimeType": "application/x-www-form-urlencoded"},
+                    },
+                    "response": {
+                        "headers": [{"name": "Set-Cookie", "value": "sessao=xyz"}],
+                        "content": {"text": "<span>Bem-vindo joao.silva</span>"},
+                    },
+                },
+                {
+                    "request": {"method": "GET", "url": "https://orbis.neovero.com/logo.png", "headers": []},
+                    "response": {"headers": [], "content": {"text": "am9hby5zaWx2YQ==", "encoding": "base64"}},
+                },
+            ]
+        }
+    }
+
+def test_redacao_remove_credenciais_e_sessao():
+    """Credenciais viram marcadores fixos e cabeçalhos/cookies de sessão são apagados."""
+    har = redigir_har(criar_har_mock(), "joao.silva", "p@ss w0rd")
+    entrada = har["log"]["entries"][0]
+
+    assert entrada["request"]["postData"]["text"] == f"login={USUARIO_REDIGIDO}&senha={SENHA_REDIGIDA}"
+    assert entrada["request"]["headers"][0]["value"] == VALOR_REDIGIDO
+    assert entrada["request"]["headers"][1]["value"] == "text/html"
+    assert entrada["request"]["cookies"][0]["value"] == VALOR_REDIGIDO
+    assert entrada["response"]["headers"][0]["value"] == VALOR_REDIGIDO
+    assert "joao.silva" not in entrada["response"]["content"]["text"]
+
+def test_redacao_preserva_conteudo_binario():
+    """Corpos em base64 não são tocados."""
+    har = redigir_har(criar_har_mock(), "joao.silva", "p@ss w0rd")
+    assert har["log"]["entries"][1]["response"]["content"]["text"] == "am9hby5zaWx2YQ=="
+
+def test_substituicao_no_post_de_reproducao():
+    """O corpo do login real casa com o corpo gravado após a substituição."""
+    corpo = substituir_segredos('{"login":"joao.silva","senha":"p@ss w0rd"}', {"p@ss w0rd": SENHA_REDIGIDA, "joao.silva": USUARIO_REDIGIDO})
+    assert corpo == f'{{"login":"{USUARIO_REDIGIDO}","senha":"{SENHA_REDIGIDA}"}}'
+
+def test_redacao_de_todas_as_credenciais_da_sessao():
+    """Credenciais trocadas durante a gravação também são redigidas, não só a última."""
+    har = criar_har_mock()
+    har["log"]["entries"][0]["response"]["content"]["text"] = "antes: maria / s3nha-velha"
+    har = redigir_har(har, "joao.silva", "p@ss w0rd", outras=[("maria", "s3nha-velha")])
+    entrada = har["log"]["entries"][0]
+
+    assert entrada["request"]["postData"]["text"] == f"login={USUARIO_REDIGIDO}&senha={SENHA_REDIGIDA}"
+    assert entrada["response"]["content"]["text"] == f"antes: {USUARIO_REDIGIDO} / {SENHA_REDIGIDA}"
@@ -47,4 +47,95 @@ def test_leitura_excel_com_now(tmp_path):
     # Verifica a OS 2 (NOW)
     os2 = lista_os[1]
     assert os2.tag == "TAG-02"
-    assert os2.is_closing_now is True 
\ No newline at end of file
+    assert os2.is_closing_now is True 
+
+def test_leitura_multiplos_arquivos_e_abas(tmp_path):
+    """Todas as abas de vários arquivos viram um único lote ordenado, com procedência."""
+    import xlsxwriter
+    from src.services.excel_loader import carregar_planilhas
+
+    base = pl.read_excel(criar_excel_mock(tmp_path))
+    caminho_abas = str(tmp_path / "duas_abas.xlsx")
+    with xlsxwriter.Workbook(caminho_abas) as wb:
+        base.head(1).write_excel(wb, worksheet="Janeiro")
+        base.tail(1).write_excel(wb, worksheet="Fevereiro")
+
+    lote = carregar_planilhas([caminho_abas, str(tmp_path / "teste_os.xlsx")], abas="todas")
+
+    assert [o.tag for o in lote] == ["TAG-01", "TAG-02", "TAG-01", "TAG-02"]
+    origem = lote[1].procedencia
+    assert (origem.arquivo, origem.aba, origem.linha) == ("duas_abas.xlsx", "Fevereiro", 2)
+    assert lote[3].para_modelo().procedencia.linha == 3
+
+def test_leitura_csv_parquet_com_filtros(tmp_path):
+    """CSV e Parquet são lidos de forma preguiçosa, com filtros de TAG, data e intervalo de linhas."""
+    from src.services.excel_loader import FiltroEntrada, carregar_planilhas
+
+    base = pl.read_excel(criar_excel_mock(tmp_path))
+    caminho_parquet = str(tmp_path / "ordens.parquet")
+    base.write_parquet(caminho_parquet)
+    caminho_csv = str(tmp_path / "ordens.csv")
+    base.with_columns(
+        pl.col("Data Início").dt.strftime("%d/%m/%Y"),
+        pl.col("Check Mão de Obra").replace_strict({True: "SIM", False: "NÃO"}, return_dtype=pl.String),
+    ).write_csv(caminho_csv, separator=";")
+
+    lote = carregar_planilhas([caminho_csv, caminho_parquet], filtro=FiltroEntrada(tags=["tag-02"]))
+    assert [(o.procedencia.aba, o.procedencia.linha) for o in lote] == [("csv", 3), ("parquet", 3)]
+    assert lote[0].mao_de_obra_finalizada is False and lote[0].is_closing_now is True
+
+    lote = carregar_planilhas([caminho_csv], filtro=FiltroEntrada(data_ate=date(2026, 1, 20)))
+    assert [o.tag for o in lote] == ["TAG-01"]
+    assert lote[0].data_inicio == date(2026, 1, 20) and lote[0].mao_de_obra_finalizada is True
+
+    lote = carregar_planilhas([caminho_parquet], filtro=FiltroEntrada(linha_inicio=3, linha_fim=3))
+    assert [o.procedencia.linha for o in lote] == [3]
+
+def test_cache_de_entrada(tmp_path):
+    """Planilha inalterada vem do cache (com filtros e rejeitadas); conteúdo alterado invalida a entrada."""
+    import os
+    from src.services.excel_loader import FiltroEntrada, carregar_planilhas
+    from src.services.input_cache import CacheEntrada, hash_arquivo
+
+    caminho = criar_excel_mock(tmp_path)
+    base = pl.read_excel(caminho)
+    pl.concat([base, base.head(1).with_columns(pl.lit(None, dtype=pl.String).alias("Tag"))]).write_excel(caminho)
+    pasta = str(tmp_path / "cache")
+
+    primeiro = carregar_planilhas([caminho], pasta_cache=pasta)
+    assert len(os.listdir(pasta)) == 2  # válidas + rejeitadas
+
+    cache = CacheEntrada(pasta)
+    validas, rejeitadas = cache.obter(caminho, 0, hash_arquivo(caminho))
+    assert validas.equals(primeiro.df) and rejeitadas.get_column("_linha").to_list() == [4]
+
+    lote = carregar_planilhas([caminho], filtro=FiltroEntrada(tags=["tag-02"]), pasta_cache=pasta)
+    assert [(o.tag, o.procedencia.linha, o.is_closing_now) for o in lote] == [("TAG-02", 3, True)]
+    lote = carregar_planilhas([caminho], filtro=FiltroEntrada(linha_fim=2, data_ate=date(2026, 1, 20)), pasta_cache=pasta)
+    assert [o.tag for o in lote] == ["TAG-01"]
+
+    base.head(1).write_excel(caminho)
+    assert [o.tag for o in carregar_planilhas([caminho], pasta_cache=pasta)] == ["TAG-01"]
+    assert len(os.listdir(pasta)) == 2  # entrada antiga removida
+
+
+def test_cache_de_entrada_mesmo_nome_em_pastas_diferentes(tmp_path):
+    """Duas planilhas com o mesmo nome em pastas diferentes têm entradas próprias, sem apagar uma à outra."""
+    import os
+    from src.services.excel_loader import carregar_planilhas
+    from src.services.input_cache import CacheEntrada, hash_arquivo
+
+    (tmp_path / "entrada").mkdir()
+    (tmp_path / "arquivo").mkdir()
+    entrada = criar_excel_mock(tmp_path / "entrada")
+    arquivo = criar_excel_mock(tmp_path / "arquivo")
+    pl.read_excel(arquivo).head(1).write_excel(arquivo)
+    pasta = str(tmp_path / "cache")
+
+    carregar_planilhas([entrada], pasta_cache=pasta)
+    carregar_planilhas([arquivo], pasta_cache=pasta)
+    assert len(os.listdir(pasta)) == 4
+
+    cache = CacheEntrada(pasta)
+    assert cache.obter(entrada, 0, hash_arquivo(entrada)) is not None
+    assert cache.obter(arquivo, 0, hash_arquivo(arquivo)) is not None
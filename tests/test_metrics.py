@@ -0,0 +1,60 @@
+# tests/test_metrics.py
+import asyncio
+import json
+from src.services.metrics import Histograma, MetricasExecucao, ServidorMetricas
+
+
+def test_contadores_fila_e_fases():
+    """Status concluídos reduzem a fila; a fase do worker volta ao estado anterior ao sair."""
+    metricas = MetricasExecucao(total_ordens=3)
+    with metricas.fase("A", "busca"):
+        assert metricas.fases["A"] == "busca"
+        metricas.registrar("sucesso")
+    metricas.registrar("falha")
+
+    dados = metricas.como_dict()
+    assert dados["ordens"] == {"sucesso": 1, "pulado": 0, "falha": 1}
+    assert dados["fila"] == 1
+    assert dados["fases"] == {"A": "ocioso"}
+    assert dados["latencia_fases"]["busca"]["total"] == 1
+    assert dados["ordens_por_minuto"] > 0 and dados["eta_segundos"] is not None
+
+
+def test_formato_prometheus():
+    """Histograma com buckets cumulativos, +Inf, soma e contagem."""
+    metricas = MetricasExecucao(total_ordens=1)
+    metricas.latencias["preencher_salvar"] = Histograma()
+    metricas.latencias["preencher_salvar"].observar(3)
+    texto = metricas.prometheus()
+
+    assert 'neovero_ordens_total{status="sucesso"} 0' in texto
+    assert 'neovero_fase_segundos_bucket{fase="preencher_salvar",le="2"} 0' in texto
+    assert 'neovero_fase_segundos_bucket{fase="preencher_salvar",le="5"} 1' in texto
+    assert 'neovero_fase_segundos_bucket{fase="preencher_salvar",le="+Inf"} 1' in texto
+    assert "neovero_fila_ordens 1" in texto
+
+
+def test_servidor_http_no_mesmo_loop():
+    """O endpoint responde /metrics e /metrics.json sem bloquear o event loop."""
+    async def cenario():
+        metricas = MetricasExecucao(total_ordens=2)
+        metricas.registrar("pulado")
+        servidor = ServidorMetricas(metricas, porta=0)
+        await servidor.iniciar()
+        try:
+            respostas = {}
+            for caminho in ("/metrics", "/metrics.json"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", servidor.porta)
+                writer.write(f"GET {caminho} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                await writer.drain()
+                respostas[caminho] = (await reader.read()).decode("utf-8")
+                writer.close()
+            return respostas
+        finally:
+            await servidor.parar()
+
+    respostas = asyncio.run(cenario())
+    assert respostas["/metrics"].startswith("HTTP/1.1 200 OK")
+    assert 'neovero_ordens_total{status="pulado"} 1' in respostas["/metrics"]
+    corpo = respostas["/metrics.json"].split("\r\n\r\n", 1)[1]
+    assert json.loads(corpo)["fila"] == 1
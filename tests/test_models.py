@@ -3,8 +3,16 @@ from datetime import date, time
 import pytest
 from pydantic import ValidationError
 from src.models import OrdemServico
+from src.services.order_batch import OrdemBatch
 
-def test_criacao_os_valida():
+# Os testes rodam contra o modelo Pydantic e contra a visão do lote colunar
+@pytest.fixture(params=["modelo", "view"])
+def construir(request):
+    if request.param == "modelo":
+        return lambda dados: OrdemServico(**dados)
+    return lambda dados: OrdemBatch.de_registros([dados])[0]
+
+def test_criacao_os_valida(construir):
     """Testa se conseguimos criar uma OS com dados perfeitos e se a limpeza funciona."""
     dados = {
         "tag": "  tag-123  ",  # Testando espaços extras
@@ -25,14 +33,14 @@ def test_criacao_os_valida():
         "servico_executado": "troca de peça"
     }
 
-    os = OrdemServico(**dados)
+    os = construir(dados)
     
     assert os.tag == "TAG-123"          # Deve estar maiúsculo e sem espaço
     assert os.padrao == "PREVENTIVA"    # Deve estar maiúsculo
     assert os.tecnico == "MARIA SOUZA"  # Deve estar maiúsculo
     assert os.is_closing_now is False   # Não é NOW
 
-def test_logica_now():
+def test_logica_now(construir):
     """Testa se a flag is_closing_now ativa quando passamos 'NOW'."""
     dados = {
         "tag": "TAG-999",
@@ -51,7 +59,7 @@ def test_logica_now():
         "servico_executado": "SERV"
     }
 
-    os = OrdemServico(**dados)
+    os = construir(dados)
     assert os.is_closing_now is True
 
 def test_falha_campo_obrigatorio():
@@ -63,4 +71,22 @@ def test_falha_campo_obrigatorio():
 
     # Esperamos que levante um erro de validação
     with pytest.raises(ValidationError):
-        OrdemServico(**dados_incompletos)
\ No newline at end of file
+        OrdemServico(**dados_incompletos)
+
+def test_view_materializa_modelo_equivalente():
+    """A visão vira o mesmo OrdemServico que o construtor direto produziria."""
+    dados = {
+        "tag": "tag-7", "padrao": "prev",
+        "data_inicio": "20/01/2026", "hora_inicio": "08:30",
+        "data_fechamento": "now",
+        "tipo_oficina": "clinica", "tipo_ordem": "corretiva", "complexidade": "baixa",
+        "reclamante": "user", "tipo_ocorrencia": "erro", "causa_ocorrencia": "dano",
+        "mao_de_obra_finalizada": True, "tecnico": "tec", "servico_executado": "serv",
+    }
+    modelo = OrdemBatch.de_registros([dados])[0].para_modelo()
+
+    assert isinstance(modelo, OrdemServico)
+    assert modelo.tag == "TAG-7"
+    assert modelo.data_inicio == date(2026, 1, 20)
+    assert modelo.hora_inicio == time(8, 30)
+    assert modelo.is_closing_now is True
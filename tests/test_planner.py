@@ -0,0 +1,45 @@
+# tests/test_planner.py
+from datetime import date, time
+from src.models import OrdemServico
+from src.services.planner import planejar_execucao
+
+def criar_os(tag, tipo_ordem="CORRETIVA", oficina="CLINICA", hora=time(8, 0)):
+    return OrdemServico(
+        tag=tag, padrao="PREV",
+        data_inicio=date(2026, 1, 20), hora_inicio=hora, data_fechamento="NOW",
+        tipo_oficina=oficina, tipo_ordem=tipo_ordem, complexidade="BAIXA",
+        reclamante="USER", tipo_ocorrencia="FALHA", causa_ocorrencia="USO",
+        mao_de_obra_finalizada=True, tecnico="TEC", servico_executado="SERV",
+    )
+
+def test_remove_duplicatas_pela_chave():
+    """Linhas repetidas (mesma TAG, tipo, data e hora) entram uma única vez."""
+    plano = planejar_execucao([criar_os("TAG-01"), criar_os("tag-01 "), criar_os("TAG-01", hora=time(9, 0))])
+
+    assert plano.total_linhas == 3
+    assert plano.total_ordens == 2
+    assert len(plano.duplicatas) == 1
+
+def test_segunda_desativacao_da_mesma_tag_e_removida():
+    """Regra absoluta: uma desativação por TAG, mesmo com datas/horas diferentes."""
+    plano = planejar_execucao([
+        criar_os("TAG-01", tipo_ordem="DESATIVAÇÃO-INTERNA", hora=time(8, 0)),
+        criar_os("TAG-01", tipo_ordem="DESATIVAÇÃO-INTERNA", hora=time(10, 0)),
+    ])
+
+    assert plano.total_ordens == 1
+    assert "desativação" in plano.duplicatas[0].motivo
+
+def test_agrupa_por_tag_e_ordena_por_oficina():
+    """Um grupo por TAG; grupos ordenados por oficina; desativação por último no grupo."""
+    plano = planejar_execucao([
+        criar_os("TAG-01", oficina="MECANICA"),
+        criar_os("TAG-02", oficina="ELETRICA", tipo_ordem="DESATIVAÇÃO"),
+        criar_os("TAG-02", oficina="ELETRICA", tipo_ordem="CORRETIVA"),
+        criar_os("TAG-01", oficina="MECANICA", hora=time(9, 0)),
+    ])
+
+    assert [g.tag for g in plano.grupos] == ["TAG-02", "TAG-01"]
+    assert [o.tipo_ordem for o in plano.grupos[0].ordens] == ["CORRETIVA", "DESATIVAÇÃO"]
+    assert len(plano.grupos[1].ordens) == 2
+    assert plano.grupos[0].tem_desativacao
@@ -0,0 +1,48 @@
+# tests/test_profiler.py
+import asyncio
+import time
+from src.core.profiler import AmostradorPython, ativar_debug_loop
+
+
+def test_amostrador_atribui_tempo_a_task(tmp_path):
+    """Pilhas em formato collapsed, com a task asyncio de origem na raiz."""
+    def trabalho_pesado():
+        fim = time.perf_counter() + 0.15
+        while time.perf_counter() < fim:
+            pass
+
+    async def cenario():
+        amostrador = AmostradorPython(asyncio.get_running_loop(), intervalo_s=0.002)
+        amostrador.iniciar()
+        await asyncio.create_task(_ocupar(trabalho_pesado), name="processar_ordem")
+        amostrador.parar()
+        return amostrador
+
+    async def _ocupar(funcao):
+        funcao()
+
+    amostrador = asyncio.run(cenario())
+    caminho = amostrador.salvar(str(tmp_path / "perfil.collapsed"))
+    linhas = open(caminho, encoding="utf-8").read().splitlines()
+
+    assert linhas
+    assert all(linha.rsplit(" ", 1)[1].isdigit() for linha in linhas)
+    assert any(linha.startswith("task:processar_ordem;") and "trabalho_pesado" in linha for linha in linhas)
+
+
+def test_callback_lento_e_reportado():
+    """Com o debug ativo, um passo que bloqueia o loop gera aviso do asyncio."""
+    from loguru import logger
+    avisos = []
+    id_sink = logger.add(lambda msg: avisos.append(str(msg)), level="WARNING")
+
+    async def bloqueia():
+        ativar_debug_loop(asyncio.get_running_loop(), limite_s=0.01)
+        await asyncio.sleep(0)
+        time.sleep(0.05)
+
+    try:
+        asyncio.run(bloqueia())
+    finally:
+        logger.remove(id_sink)
+    assert any("[asyncio]" in aviso for aviso in avisos)
@@ -0,0 +1,56 @@
+# tests/test_reconciliation.py
+from datetime import date, time
+from src.models import OrdemServico
+from src.services.reconciliation import (
+    CONCLUIDA,
+    REENFILEIRADA,
+    SALVAR_CLICADO,
+    DiarioOrdens,
+    casar_historico,
+)
+
+
+def criar_os(tag, tipo="CORRETIVA", dia=20, hora=time(8, 0)):
+    return OrdemServico(
+        tag=tag, padrao="PREV",
+        data_inicio=date(2026, 1, dia), hora_inicio=hora, data_fechamento="NOW",
+        tipo_oficina="CLINICA", tipo_ordem=tipo, complexidade="BAIXA",
+        reclamante="USER", tipo_ocorrencia="FALHA", causa_ocorrencia="USO",
+        mao_de_obra_finalizada=True, tecnico="TEC", servico_executado="SERV",
+    )
+
+
+def test_diario_sobrevive_a_queda(tmp_path):
+    """Só fica incerta a ordem cujo último estado é 'Salvar clicado'; linha truncada é ignorada."""
+    caminho = str(tmp_path / "diario.jsonl")
+    diario = DiarioOrdens(caminho)
+    concluida, incerta, reenfileirada = criar_os("TAG-01"), criar_os("TAG-02"), criar_os("TAG-03")
+    for os_data in (concluida, incerta, reenfileirada):
+        diario.registrar(os_data, SALVAR_CLICADO)
+    diario.registrar(concluida, CONCLUIDA)
+    diario.registrar(reenfileirada, REENFILEIRADA)
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write('{"hash": "trunc')  # queda no meio da escrita
+
+    reaberto = DiarioOrdens(caminho)
+    assert [r["tag"] for r in reaberto.incertas().values()] == ["TAG-02"]
+    assert reaberto.estado(concluida) == CONCLUIDA
+    assert reaberto.estado(criar_os("TAG-99")) is None
+
+
+def test_casa_historico_por_data_tipo_e_hora():
+    """A linha precisa ter data e tipo (sem acento) e, se tiver horário, a mesma hora; cada linha vale uma vez."""
+    linhas = [
+        "1021  20/01/2026 08:00  CORRETIVA  Aberta",
+        "1022  20/01/2026 09:30  Desativação-Interna  Fechada",
+        "1023  21/01/2026  PREVENTIVA",
+    ]
+    ordens = [
+        criar_os("TAG-01"),                                    # casa com a 1ª
+        criar_os("TAG-01"),                                    # mesma chave: 1ª linha já usada
+        criar_os("TAG-01", tipo="DESATIVAÇÃO-INTERNA", hora=time(9, 30)),
+        criar_os("TAG-01", tipo="DESATIVAÇÃO-INTERNA", hora=time(10, 0)),  # hora diferente
+        criar_os("TAG-01", tipo="PREVENTIVA", dia=21, hora=time(7, 0)),    # linha sem horário
+    ]
+
+    assert casar_historico(linhas, ordens) == {0: linhas[0], 2: linhas[1], 4: linhas[2]}
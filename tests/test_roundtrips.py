@@ -0,0 +1,107 @@
+# tests/test_roundtrips.py
+import asyncio
+import csv
+from src.core.animations import estabilizar
+from src.core.roundtrips import FORA_DE_PASSO, ContadorIdaVolta, metodo_em_andamento
+
+
+class LocatorFalso:
+    async def count(self):
+        await asyncio.sleep(0)
+        return 1
+
+    async def inner_text(self):
+        return "texto"
+
+    def nth(self, indice):
+        return self
+
+
+class PaginaFalsa:
+    """Page object mínimo: cada método faz um número conhecido de chamadas."""
+
+    def __init__(self):
+        self.locator = LocatorFalso()
+
+    async def fechar_janela(self):
+        await self.locator.count()
+        await self.locator.nth(0).inner_text()
+
+    async def preencher(self, campos):
+        for _ in range(campos):
+            await self.locator.count()
+
+
+def test_conta_por_passo_ordem_e_origem():
+    """Cada chamada assíncrona entra no passo, na ordem e no método que a fez; as síncronas não contam."""
+    contador = ContadorIdaVolta()
+    contador.instalar(classes=[LocatorFalso])
+    pagina = PaginaFalsa()
+
+    async def rodar():
+        with contador.ordem("#1 TAG-01"):
+            with contador.passo("limpeza"):
+                await pagina.fechar_janela()
+            with contador.passo("preencher_salvar"):
+                await pagina.preencher(3)
+            await pagina.locator.count()
+
+    try:
+        asyncio.run(rodar())
+    finally:
+        contador.ativo = False
+
+    assert contador.passos["limpeza"].chamadas == 2
+    assert contador.passos["preencher_salvar"].maximo == 3
+    assert {passo: c for passo, (c, _) in contador.ordens["#1 TAG-01"].items()} == {
+        "limpeza": 2, "preencher_salvar": 3, FORA_DE_PASSO: 1,
+    }
+    assert contador.origens["(externo)"]["LocatorFalso.count"][0] == 5
+    assert contador.origens["(externo)"]["LocatorFalso.inner_text"][0] == 1
+
+
+def test_orcamento_estourado_e_tabela_por_ordem(tmp_path):
+    """Execuções acima do orçamento viram estouros; o CSV tem uma linha por ordem."""
+    contador = ContadorIdaVolta()
+    contador.instalar({"preencher_salvar": 4}, classes=[LocatorFalso])
+    pagina = PaginaFalsa()
+
+    async def ordem(numero, campos):
+        with contador.ordem(f"#{numero} TAG"):
+            with contador.passo("preencher_salvar"):
+                await pagina.preencher(campos)
+
+    async def rodar():
+        # Ordens concorrentes (pipeline) não misturam os contadores
+        await asyncio.gather(ordem(1, 3), ordem(2, 6), ordem(3, 4))
+
+    try:
+        asyncio.run(rodar())
+    finally:
+        contador.ativo = False
+
+    assert contador.estouros == {"preencher_salvar": 1}
+    assert contador.como_dict()["passos"]["preencher_salvar"]["media"] == 4.3
+
+    caminho = contador.salvar_csv(str(tmp_path / "ida_volta.csv"))
+    with open(caminho, encoding="utf-8") as f:
+        linhas = {linha["ordem"]: linha for linha in csv.DictReader(f, delimiter=";")}
+    assert linhas["#2 TAG"]["chamadas"] == "6"
+    assert linhas["#3 TAG"]["preencher_salvar"] == "4"
+
+
+def test_metodo_em_andamento_segue_a_cadeia_de_awaits():
+    """Uma tarefa presa é atribuída ao método mais interno do projeto em que está suspensa."""
+
+    async def ordem():
+        await estabilizar(None, 30)
+
+    async def rodar():
+        tarefa = asyncio.ensure_future(ordem())
+        await asyncio.sleep(0)
+        metodo = metodo_em_andamento(tarefa)
+        tarefa.cancel()
+        await asyncio.gather(tarefa, return_exceptions=True)
+        return metodo, tarefa.cancelled()
+
+    assert asyncio.run(rodar()) == ("estabilizar", True)
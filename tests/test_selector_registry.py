@@ -0,0 +1,78 @@
+# tests/test_selector_registry.py
+import asyncio
+from src.core.selector_registry import RegistroSeletores, nome_frame
+
+
+class LocatorFalso:
+    def __init__(self, total):
+        self.total = total
+        self.first = self
+
+    async def count(self):
+        return self.total
+
+
+class FrameFalso:
+    """Frame com um conjunto fixo de seletores presentes."""
+
+    def __init__(self, nome, presentes=(), principal=False):
+        self.name = nome
+        self.url = f"https://neovero/{nome}.aspx"
+        self.parent_frame = None if principal else object()
+        self.presentes = set(presentes)
+        self.consultas = []
+
+    def locator(self, seletor):
+        self.consultas.append(seletor)
+        return LocatorFalso(1 if seletor in self.presentes else 0)
+
+
+def test_ordena_candidatos_por_acerto():
+    """O candidato que mais acerta passa a ser testado primeiro; empates mantêm a ordem original."""
+    registro = RegistroSeletores()
+    for _ in range(3):
+        with registro.sonda("fechar", "#a"):
+            pass
+        with registro.sonda("fechar", "#b") as sonda:
+            sonda.acerto(FrameFalso("main", principal=True))
+
+    assert registro.ordenar("fechar", ["#a", "#b", "#c"]) == ["#b", "#c", "#a"]
+    assert registro.ordenar("outro", ["#x", "#y"]) == ["#x", "#y"]
+
+
+def test_localizar_aprende_frame_e_seletor():
+    """`localizar` encontra o controle no iframe e, na próxima vez, começa pelo seletor e frame certos."""
+    registro = RegistroSeletores()
+    principal = FrameFalso("main", principal=True)
+    iframe = FrameFalso("frmOS", presentes={"text=Abrir OS"})
+
+    frame, _ = asyncio.run(registro.localizar("abrir_os", ["#btnAbrirOS", "text=Abrir OS"], [principal, iframe]))
+    assert frame is iframe
+    assert registro.controles["abrir_os"]["text=Abrir OS"].frames == {"frmOS": 1}
+
+    principal.consultas.clear()
+    iframe.consultas.clear()
+    asyncio.run(registro.localizar("abrir_os", ["#btnAbrirOS", "text=Abrir OS"], [principal, iframe]))
+    assert iframe.consultas == ["text=Abrir OS"] and principal.consultas == []
+
+
+def test_nome_frame():
+    """Frame principal vira 'main'; iframe sem nome usa o último trecho da URL."""
+    assert nome_frame(FrameFalso("qualquer", principal=True)) == "main"
+    assert nome_frame(FrameFalso("", principal=False)) == ".aspx"
+
+
+def test_persistencia(tmp_path):
+    """As estatísticas sobrevivem entre execuções."""
+    caminho = str(tmp_path / "cache" / "seletores.json")
+    registro = RegistroSeletores()
+    registro.carregar(caminho)
+    with registro.sonda("fechar", "#b") as sonda:
+        sonda.acerto(FrameFalso("frmOS"))
+    registro.salvar()
+
+    novo = RegistroSeletores()
+    novo.carregar(caminho)
+    estatistica = novo.controles["fechar"]["#b"]
+    assert (estatistica.tentativas, estatistica.acertos) == (1, 1)
+    assert estatistica.frames == {"frmOS": 1}
@@ -0,0 +1,59 @@
+# tests/test_soak.py
+import asyncio
+from benchmarks.drift import Amostra, LimitesDeriva, inclinacao, relatorio_deriva
+from benchmarks.stub_neovero import ServidorStubNeovero
+
+
+def _amostras(heap_por_ordem: float, latencia_final: float):
+    return [
+        Amostra(ordem=n, js_heap_mb=10 + heap_por_ordem * n, nos_dom=800, frames=2,
+                segundos_por_ordem=None if n == 100 else (1.0 if n == 200 else latencia_final),
+                latencias={"busca": 0.5 if n <= 200 else latencia_final / 2})
+        for n in (100, 200, 300, 400)
+    ]
+
+
+def test_inclinacao():
+    """Reta de mínimos quadrados; com um ponto só, inclinação zero."""
+    assert inclinacao([0, 1, 2], [1, 3, 5]) == 2
+    assert inclinacao([5], [7]) == 0
+
+
+def test_soak_estavel_aprovado():
+    """Memória e DOM estáveis e latência constante: aprovado."""
+    relatorio = relatorio_deriva(_amostras(0.0, 1.0), LimitesDeriva())
+    assert relatorio["aprovado"] and relatorio["violacoes"] == []
+    assert relatorio["latencias"]["ordem"]["razao"] == 1.0
+    assert relatorio["crescimento"]["nos_dom"]["por_mil_ordens"] == 0
+
+
+def test_soak_com_deriva_reprovado():
+    """Heap crescendo e ordem final mais lenta que o limite: reprovado com as violações."""
+    relatorio = relatorio_deriva(_amostras(0.05, 2.0), LimitesDeriva())
+    assert not relatorio["aprovado"]
+    assert relatorio["crescimento"]["js_heap_mb"]["por_mil_ordens"] == 50
+    assert any("js_heap_mb" in v for v in relatorio["violacoes"])
+    assert any("'ordem'" in v for v in relatorio["violacoes"])
+    assert any("'busca'" in v for v in relatorio["violacoes"])
+
+
+def test_stub_historico_cresce():
+    """O stub serve as telas e o histórico da TAG cresce a cada OS salva."""
+    async def cenario():
+        stub = ServidorStubNeovero()
+        await stub.iniciar()
+        try:
+            respostas = []
+            for caminho in ("/api/salvar?tag=soak-1", "/api/equipamento?tag=SOAK-1", "/app"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", stub.porta)
+                writer.write(f"GET {caminho} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                await writer.drain()
+                respostas.append((await reader.read()).decode("utf-8"))
+            return respostas
+        finally:
+            await stub.parar()
+
+    salvar, equipamento, app = asyncio.run(cenario())
+    assert '"numero": 1' in salvar
+    assert '"tag": "SOAK-1"' in equipamento and '"historico": [{"numero": 1' in equipamento
+    assert 'id="side-menu"' in app and "const VAZAMENTO = false" in app
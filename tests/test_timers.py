@@ -0,0 +1,78 @@
+# tests/test_timers.py
+import asyncio
+import pytest
+from src.utils.timers import LinhaDoTempo, aguardar_entrada_e_sessao
+
+
+def test_linha_do_tempo_registra_etapas_concorrentes():
+    """Etapas em paralelo se sobrepõem na linha do tempo; marcos só valem na primeira vez."""
+    linha = LinhaDoTempo()
+
+    async def etapa(nome, segundos):
+        async with linha.etapa(nome):
+            await asyncio.sleep(segundos)
+
+    async def rodar():
+        await asyncio.gather(etapa("planilha", 0.05), etapa("navegador", 0.1))
+        linha.marcar("pronto")
+        await asyncio.sleep(0.02)
+        linha.marcar("pronto")
+
+    asyncio.run(rodar())
+
+    inicio_planilha, fim_planilha = linha.etapas["planilha"]
+    inicio_navegador, fim_navegador = linha.etapas["navegador"]
+    assert inicio_navegador < fim_planilha and inicio_planilha < fim_navegador
+    assert fim_navegador <= linha.marcos["pronto"] < fim_navegador + 0.02
+    linha.log_resumo()
+
+
+def _sessao_lenta(estado):
+    async def sessao():
+        estado["iniciada"] = True
+        await asyncio.sleep(5)
+        estado["concluida"] = True
+        return "page"
+    return sessao()
+
+
+@pytest.mark.parametrize("falha", [False, True])
+def test_entrada_vazia_ou_com_erro_cancela_a_sessao_em_andamento(falha):
+    """Planilha vazia (ou com erro) cancela o login em andamento sem esperar que ele termine."""
+    estado = {}
+
+    async def entrada():
+        await asyncio.sleep(0.01)
+        if falha:
+            raise ValueError("planilha inválida")
+        return None
+
+    async def rodar():
+        sessao = asyncio.create_task(_sessao_lenta(estado))
+        inicio = asyncio.get_running_loop().time()
+        if falha:
+            with pytest.raises(ValueError):
+                await aguardar_entrada_e_sessao(asyncio.create_task(entrada()), sessao)
+        else:
+            assert await aguardar_entrada_e_sessao(asyncio.create_task(entrada()), sessao) is None
+        assert sessao.cancelled()
+        return asyncio.get_running_loop().time() - inicio
+
+    decorrido = asyncio.run(rodar())
+    assert estado == {"iniciada": True}
+    assert decorrido < 1
+
+
+def test_entrada_e_sessao_validas_retornam_os_dois_resultados():
+    """Com as duas etapas bem-sucedidas, o resultado de cada uma é devolvido."""
+    async def entrada():
+        return ("plano", "indice")
+
+    async def sessao():
+        await asyncio.sleep(0.01)
+        return "page"
+
+    async def rodar():
+        return await aguardar_entrada_e_sessao(asyncio.create_task(entrada()), asyncio.create_task(sessao()))
+
+    assert asyncio.run(rodar()) == (("plano", "indice"), "page")
@@ -0,0 +1,125 @@
+# tests/test_timing_history.py
+from datetime import date, time
+from src.models import OrdemServico
+from src.services.metrics import MetricasExecucao
+from src.services.planner import planejar_execucao
+from src.services.timing_history import PREPARO, PREPARO_DESATIVACAO, HistoricoTempos, categoria_ordem
+
+
+def criar_os(tag, tipo="CORRETIVA", fechamento="NOW", hora=time(8, 0)):
+    return OrdemServico(
+        tag=tag, padrao="PREV",
+        data_inicio=date(2026, 1, 20), hora_inicio=hora, data_fechamento=fechamento,
+        hora_fechamento=time(10, 0), tipo_oficina="CLINICA", tipo_ordem=tipo, complexidade="BAIXA",
+        reclamante="USER", tipo_ocorrencia="FALHA", causa_ocorrencia="USO",
+        mao_de_obra_finalizada=True, tecnico="TEC", servico_executado="SERV",
+    )
+
+
+def metricas_de_execucao(duracoes, pulado=0):
+    metricas = MetricasExecucao()
+    for categoria, valores in duracoes.items():
+        for valor in valores:
+            metricas.registrar_duracao(categoria, valor)
+    metricas.contadores["pulado"] = pulado
+    return metricas
+
+
+def test_categoria_separa_desativacao_e_now():
+    """A categoria distingue desativação de ordem normal e o fechamento pelo botão Agora."""
+    assert categoria_ordem(criar_os("TAG-01")) == "normal_now"
+    assert categoria_ordem(criar_os("TAG-01", fechamento=date(2026, 1, 20))) == "normal"
+    assert categoria_ordem(criar_os("TAG-01", tipo="DESATIVACAO")) == "desativacao_now"
+
+
+def test_previsao_pelo_mix_da_planilha(tmp_path):
+    """Soma preparo por grupo e custo por categoria; desativações são descontadas pela taxa de pulo."""
+    historico = HistoricoTempos(str(tmp_path / "historico.jsonl"))
+    assert historico.prever(planejar_execucao([criar_os("TAG-01")])) is None
+
+    historico.registrar(
+        metricas_de_execucao({
+            "normal_now": [10, 10], "desativacao_now": [20],
+            PREPARO: [4, 4], PREPARO_DESATIVACAO: [8],
+        }),
+        desativacoes=4, puladas=1, inicializacao_s=30,
+    )
+    historico = HistoricoTempos(str(tmp_path / "historico.jsonl"))
+    plano = planejar_execucao([
+        criar_os("TAG-01"), criar_os("TAG-01", hora=time(9, 0)),
+        criar_os("TAG-02", tipo="DESATIVACAO"),
+        criar_os("TAG-03", fechamento=date(2026, 1, 20)),  # sem média própria: usa 'normal_now'
+    ])
+    previsao = historico.prever(plano)
+
+    assert previsao.mix == {"normal_now": 2, "desativacao_now": 1, "normal": 1}
+    assert previsao.detalhe["preparo"] == 4 + 8 + 4
+    assert previsao.detalhe["ordens"] == 10 + 10 + 20 * 0.75 + 10
+    assert previsao.puladas_esperadas == 0.25
+    assert previsao.duracao_s(2) == 30 + previsao.trabalho_s / 2
+
+
+def test_desativacao_conhecida_nao_custa_nada(tmp_path):
+    """TAG já desativada (cache) conta como pulada e sem varredura do histórico."""
+    historico = HistoricoTempos(str(tmp_path / "historico.jsonl"))
+    historico.registrar(metricas_de_execucao({"normal_now": [10], "desativacao_now": [20], PREPARO: [5], PREPARO_DESATIVACAO: [9]}))
+    plano = planejar_execucao([criar_os("TAG-02", tipo="DESATIVACAO"), criar_os("TAG-02", hora=time(9, 0))])
+
+    previsao = historico.prever(plano, tags_desativadas={"tag-02"})
+    assert previsao.puladas_esperadas == 1
+    assert previsao.trabalho_s == 5 + 10
+
+
+def test_workers_para_cumprir_a_meta(tmp_path):
+    """Workers = trabalho dividido pelo tempo que sobra da meta após a inicialização."""
+    historico = HistoricoTempos(str(tmp_path / "historico.jsonl"))
+    historico.registrar(metricas_de_execucao({"normal": [60]}), inicializacao_s=60)
+    plano = planejar_execucao([criar_os(f"TAG-{i:02d}", fechamento=date(2026, 1, 20)) for i in range(10)])
+    previsao = historico.prever(plano)
+
+    assert previsao.trabalho_s == 600
+    assert previsao.workers_para(60 + 600) == 1
+    assert previsao.workers_para(60 + 250) == 3
+    assert previsao.workers_para(30) is None
+
+
+def test_pipeline_usa_o_tempo_de_relogio_do_proprio_modo(tmp_path):
+    """No pipeline o preparo corre junto da ordem: a previsão segue o relógio, não a soma das durações."""
+    historico = HistoricoTempos(str(tmp_path / "historico.jsonl"))
+    # Sequencial: 10 ordens de 10s + 10 preparos de 5s em 150s de relógio
+    historico.registrar(metricas_de_execucao({"normal": [10] * 10, PREPARO: [5] * 10}), parede_s=150)
+    # Pipeline: mesmas durações somadas, mas os preparos ficaram escondidos atrás das ordens
+    historico.registrar(metricas_de_execucao({"normal": [10] * 10, PREPARO: [5] * 10}), parede_s=105, pipeline=True)
+    plano = planejar_execucao([criar_os(f"TAG-{i:02d}", fechamento=date(2026, 1, 20)) for i in range(4)])
+
+    sequencial = historico.prever(plano)
+    pipeline = historico.prever(plano, pipeline=True)
+    assert sequencial.trabalho_s == 4 * (10 + 5)
+    assert pipeline.trabalho_s == 4 * (10 + 5) * 105 / 150
+    assert pipeline.detalhe["fator_paralelismo"] == 0.7
+    assert pipeline.workers_para(40) == 2 and sequencial.workers_para(40) == 2
+    assert pipeline.workers_para(45) == 1 and sequencial.workers_para(45) == 2
+
+
+def test_historico_guarda_so_as_ultimas_execucoes(tmp_path):
+    """O arquivo é reescrito com as N execuções mais recentes."""
+    caminho = str(tmp_path / "historico.jsonl")
+    historico = HistoricoTempos(caminho, max_execucoes=2)
+    for segundos in (10, 20, 30):
+        historico.registrar(metricas_de_execucao({"normal": [segundos]}))
+
+    reaberto = HistoricoTempos(caminho)
+    assert [e["duracoes"]["normal"][0] for e in reaberto.execucoes] == [20, 30]
+
+
+def test_eta_parte_da_previsao_e_converge_para_a_taxa_real():
+    """Sem ordens concluídas o ETA é a previsão; com progresso, pesa a taxa real."""
+    metricas = MetricasExecucao(total_ordens=100)
+    assert metricas.eta_segundos() is None
+    metricas.segundos_previstos_por_ordem = 30
+    assert metricas.eta_segundos() == 100 * 30
+
+    for _ in range(10):
+        metricas.registrar("sucesso")
+    # Peso 10/(10+10): metade previsão (30s), metade taxa real (quase instantânea)
+    assert 90 * 15 <= metricas.eta_segundos() < 90 * 16
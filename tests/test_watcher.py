@@ -0,0 +1,52 @@
+# tests/test_watcher.py
+from datetime import date, time
+from src.models import OrdemServico
+import os
+from src.services.watcher import RegistroLinhas, assinatura_arquivo, hash_ordem, reservar
+
+def criar_os(tag, reclamante="USER"):
+    return OrdemServico(
+        tag=tag, padrao="PREV",
+        data_inicio=date(2026, 1, 20), hora_inicio=time(8, 0), data_fechamento="NOW",
+        tipo_oficina="CLINICA", tipo_ordem="CORRETIVA", complexidade="BAIXA",
+        reclamante=reclamante, tipo_ocorrencia="FALHA", causa_ocorrencia="USO",
+        mao_de_obra_finalizada=True, tecnico="TEC", servico_executado="SERV",
+    )
+
+def test_hash_usa_conteudo_normalizado():
+    """Espaços e caixa não mudam o hash; qualquer campo diferente muda."""
+    assert hash_ordem(criar_os("TAG-01")) == hash_ordem(criar_os(" tag-01 "))
+    assert hash_ordem(criar_os("TAG-01")) != hash_ordem(criar_os("TAG-01", reclamante="OUTRO"))
+
+def test_registro_filtra_linhas_ja_concluidas(tmp_path):
+    """Só linhas novas passam, e o registro sobrevive entre execuções."""
+    caminho = str(tmp_path / "linhas.txt")
+    registro = RegistroLinhas(caminho)
+    primeiro_arquivo = [criar_os("TAG-01"), criar_os("TAG-02")]
+
+    assert len(registro.filtrar_novas(primeiro_arquivo)) == 2
+    registro.marcar(hash_ordem(o) for o in primeiro_arquivo)
+
+    # Arquivo re-depositado com uma linha nova no final (e uma repetida)
+    segundo_arquivo = primeiro_arquivo + [criar_os("TAG-03"), criar_os("TAG-03")]
+    novas = RegistroLinhas(caminho).filtrar_novas(segundo_arquivo)
+
+    assert [o.tag for o in novas] == ["TAG-03"]
+
+def test_reserva_so_a_versao_vista_pelo_vigia(tmp_path):
+    """Arquivo re-depositado depois da detecção fica na entrada; só a versão detectada é reservada."""
+    entrada = tmp_path / "dados.xlsx"
+    entrada.write_bytes(b"v1")
+    assinatura = assinatura_arquivo(str(entrada))
+    processando = str(tmp_path / "processando")
+
+    # Nova versão (maior) copiada antes de a fila chegar na antiga
+    entrada.write_bytes(b"v1 + linhas novas")
+    assert reservar(str(entrada), assinatura, processando) is None
+    assert entrada.exists()
+
+    reservado = reservar(str(entrada), assinatura_arquivo(str(entrada)), processando)
+    assert not entrada.exists()
+    assert os.path.dirname(reservado) == processando
+    assert open(reservado, "rb").read() == b"v1 + linhas novas"
+    assert reservar(str(entrada), assinatura, processando) is None